@@ -30,7 +30,20 @@ DEFAULT_VALUES = {
     "model_proofreading": "gemini/gemini-2.5-flash-lite",
     "gemini_api_key": "",
     "show_status_bar": "True",
-    "show_pdf_preview": "True"
+    "show_pdf_preview": "True",
+    "preview_workspace_budget_mb": "256",
+    "preview_preamble_cache": "True",
+    "preview_result_cache_mb": "64",
+    "preview_render_cache_mb": "192",
+    "preview_prefetch_pages": "3",
+    "preview_dark_mode": "invert",
+    "preview_min_delay": "0.1",
+    "preview_cpu_budget": "25",
+    "compile_server_workers": "2",
+    "latex_engine": "pdflatex",
+    "preview_engine_policy": "same",
+    "preview_draft_graphics": "False",
+    "snippet_preview": "True"
 }
 
 def load_config():
@@ -127,7 +140,7 @@ def _normalize_settings(settings_dict):
     normalized = dict(settings_dict)
     
     # convert booleans to strings for config file
-    bool_keys = ["show_status_bar", "show_pdf_preview"]
+    bool_keys = ["show_status_bar", "show_pdf_preview", "preview_preamble_cache", "preview_draft_graphics", "snippet_preview"]
     for key in bool_keys:
         if key in normalized:
             normalized[key] = str(bool(get_bool(normalized[key])))
@@ -190,6 +203,25 @@ def _notify_config_changed(updates_dict):
             if hasattr(state, 'zoom_manager') and state.zoom_manager:
                 state.zoom_manager.update_font_family(updates_dict["editor_font_family"])
         
+        # keep preview settings live so the preview manager picks them up immediately
+        preview_keys = [k for k in updates_dict if k.startswith("preview_")]
+        if preview_keys:
+            from app import state
+            for key in preview_keys:
+                state._app_config[key] = str(updates_dict[key])
+            # the viewer keeps its dark mode decision until told that it may have changed
+            if "preview_dark_mode" in updates_dict:
+                manager = getattr(state.pdf_preview_interface, 'preview_manager', None)
+                if manager and manager.viewer:
+                    manager.viewer.refresh_theme()
+        
+        # snippet previews keep their on/off state instead of reading the config on every mouse move
+        if "snippet_preview" in updates_dict:
+            from app import state
+            from editor import math_preview
+            state._app_config["snippet_preview"] = str(updates_dict["snippet_preview"])
+            math_preview.set_enabled(get_bool(updates_dict["snippet_preview"]))
+        
         # update llm model settings
         model_keys = [k for k in updates_dict if k.startswith("model_")]
         if model_keys:
@@ -24,7 +24,6 @@ class MonacoUpdateController:
     def __init__(self, app_state):
         self.state = app_state
         self._update_pending = False
-        self._last_pdf_update = 0.0
         self._last_outline_update = 0.0
 
     def bind_tab(self, tab):
@@ -98,11 +97,10 @@ class MonacoUpdateController:
         editor_widget.edit_modified(False)
         current_tab.update_tab_title()
 
+        # The preview debounces on its own; forwarding every edit keeps the last one
         pdf_interface = getattr(self.state, "pdf_preview_interface", None)
-        now = time.time()
-        if pdf_interface and now - self._last_pdf_update > 0.5:
+        if pdf_interface:
             pdf_interface.on_editor_content_change()
-            self._last_pdf_update = now
 
         self._schedule_update()
         return None
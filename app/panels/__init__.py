@@ -21,7 +21,8 @@ from .helpers import (
     show_snippets_panel,
     show_metrics_panel,
     show_table_insertion_panel,
-    show_settings_panel
+    show_settings_panel,
+    show_batch_build_panel
 )
 
 __all__ = [
@@ -39,5 +40,6 @@ __all__ = [
     'show_snippets_panel',
     'show_metrics_panel',
     'show_table_insertion_panel',
-    'show_settings_panel'
+    'show_settings_panel',
+    'show_batch_build_panel'
 ]
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Integrated batch build panel for the left sidebar.
+Compiles every root document matching a pattern and shows a live progress table.
+"""
+
+import os
+import threading
+import tkinter as tk
+from tkinter import ttk
+from typing import Optional
+from .base_panel import BasePanel
+from .panel_factory import PanelStyle, StandardComponents
+from latex.batch_build import BatchBuild, DEFAULT_BATCH_WORKERS, expand_roots
+from utils import logs_console
+
+
+class BatchBuildPanel(BasePanel):
+    """
+    Batch build panel: pick documents with a glob pattern, build them in parallel
+    and follow each one's status, duration and first errors.
+    """
+
+    def __init__(self, parent_container: tk.Widget, theme_getter,
+                 directory: str = None, on_close_callback=None):
+        super().__init__(parent_container, theme_getter, on_close_callback)
+
+        self.directory = directory or os.getcwd()
+        self.batch: Optional[BatchBuild] = None
+        self._thread: Optional[threading.Thread] = None
+        self._rows = {}  # root -> tree item
+
+        # UI components
+        self.pattern_entry: Optional[ttk.Entry] = None
+        self.workers_spinbox: Optional[ttk.Spinbox] = None
+        self.publish_var: Optional[tk.BooleanVar] = None
+        self.job_tree: Optional[ttk.Treeview] = None
+        self.status_label: Optional[ttk.Label] = None
+        self.detail_label: Optional[ttk.Label] = None
+
+    def get_panel_title(self) -> str:
+        return "Batch Build"
+
+    def get_layout_style(self) -> PanelStyle:
+        return PanelStyle.SIMPLE
+
+    def get_critical_action_buttons(self) -> list:
+        return [
+            ("Build All", self._start_batch, "primary"),
+            ("Cancel", self._cancel_batch, "secondary"),
+        ]
+
+    def create_content(self):
+        """Create the pattern, options and progress sections."""
+        documents_section = StandardComponents.create_section(self.main_container, "Documents")
+        documents_section.pack(fill="x", pady=(0, StandardComponents.SECTION_SPACING))
+
+        StandardComponents.create_info_label(
+            documents_section,
+            "Files, directories or glob patterns, separated by ';'. Chapters build their root document.",
+            "small"
+        ).pack(anchor="w", pady=(0, StandardComponents.ELEMENT_SPACING))
+
+        self.pattern_entry = ttk.Entry(documents_section, font=StandardComponents.BODY_FONT)
+        self.pattern_entry.insert(0, os.path.join(self.directory, "**", "*.tex"))
+        self.pattern_entry.pack(fill="x")
+        self.pattern_entry.bind("<Return>", lambda e: self._find_documents())
+        self.main_widget = self.pattern_entry
+
+        options = ttk.Frame(documents_section)
+        options.pack(fill="x", pady=(StandardComponents.ELEMENT_SPACING, 0))
+        StandardComponents.create_label_input(options, "Parallel builds:").pack(side="left")
+        self.workers_spinbox = ttk.Spinbox(options, from_=1, to=max(1, os.cpu_count() or 1), width=4)
+        self.workers_spinbox.set(DEFAULT_BATCH_WORKERS)
+        self.workers_spinbox.pack(side="left", padx=(StandardComponents.ELEMENT_SPACING, 0))
+        self.publish_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options, text="Copy PDFs next to documents", variable=self.publish_var).pack(side="left", padx=(StandardComponents.PADDING, 0))
+        StandardComponents.create_button_input(options, "Find", self._find_documents, width=8).pack(side="right")
+
+        progress_section = StandardComponents.create_section(self.main_container, "Progress")
+        progress_section.pack(fill="both", expand=True)
+
+        tree_frame = ttk.Frame(progress_section)
+        tree_frame.pack(fill="both", expand=True)
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+
+        columns = ("document", "status", "time", "errors")
+        self.job_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=12)
+        for column, heading, width, anchor in zip(
+            columns, ("Document", "Status", "Time", "Errors"), (170, 80, 60, 50), (tk.W, tk.W, tk.E, tk.E)
+        ):
+            self.job_tree.heading(column, text=heading)
+            self.job_tree.column(column, width=width, anchor=anchor, minwidth=40)
+        self.job_tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.job_tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.job_tree.config(yscrollcommand=scrollbar.set)
+        self.job_tree.tag_configure("failed", foreground="#c0392b")
+        self.job_tree.bind("<<TreeviewSelect>>", lambda e: self._show_selected_detail())
+        self.job_tree.bind("<Double-1>", lambda e: self._open_selected_document())
+
+        self.status_label = StandardComponents.create_info_label(progress_section, "No documents selected.", "small")
+        self.status_label.pack(anchor="w", pady=(StandardComponents.ELEMENT_SPACING, 0))
+        self.detail_label = StandardComponents.create_info_label(progress_section, "", "small")
+        self.detail_label.pack(anchor="w", fill="x")
+
+        self._find_documents()
+
+    def focus_main_widget(self):
+        if self.pattern_entry:
+            self.pattern_entry.focus_set()
+
+    def destroy(self):
+        """Cancel a running batch when the panel closes."""
+        if self.batch:
+            self.batch.cancel()
+        super().destroy()
+
+    def _patterns(self):
+        return [part.strip() for part in self.pattern_entry.get().split(';') if part.strip()]
+
+    def _find_documents(self):
+        """List the root documents matching the patterns as queued jobs."""
+        if self._is_running():
+            return
+        roots = expand_roots(self._patterns())
+        self.batch = None
+        self._rows = {}
+        self.job_tree.delete(*self.job_tree.get_children())
+        for root in roots:
+            self._rows[root] = self.job_tree.insert("", tk.END, values=(os.path.basename(root), "queued", "", ""))
+        self.status_label.config(text=f"{len(roots)} root documents found." if roots else "No documents match.")
+        self.detail_label.config(text="")
+
+    def _start_batch(self):
+        if self._is_running():
+            return
+        self._find_documents()
+        if not self._rows:
+            return
+        try:
+            workers = int(self.workers_spinbox.get())
+        except ValueError:
+            workers = DEFAULT_BATCH_WORKERS
+        self.batch = BatchBuild(
+            list(self._rows), workers=workers, publish=self.publish_var.get(),
+            on_progress=self._on_job_progress,
+        )
+        batch = self.batch
+        logs_console.log(f"Batch build of {len(batch.jobs)} documents with {batch.workers} workers", level='ACTION')
+        self.status_label.config(text=f"Building {len(batch.jobs)} documents...")
+        self._thread = threading.Thread(target=self._run_batch, args=(batch,), daemon=True)
+        self._thread.start()
+
+    def _run_batch(self, batch):
+        """Background thread: run the batch, then report the summary on the main thread."""
+        batch.run()
+        self._schedule(self._on_batch_finished, batch)
+
+    def _on_job_progress(self, job):
+        """Called from build threads whenever a job changes state."""
+        self._schedule(self._update_row, job)
+
+    def _schedule(self, callback, *args):
+        frame = self.panel_frame
+        if frame:
+            try:
+                frame.after(0, callback, *args)
+            except tk.TclError:
+                pass  # the panel was closed
+
+    def _cancel_batch(self):
+        if self._is_running() and not self.batch.cancelled:
+            self.batch.cancel()
+            self.status_label.config(text="Cancelling...")
+
+    def _is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _update_row(self, job):
+        item = self._rows.get(job.root)
+        if not item or not self.job_tree or not self.job_tree.exists(item):
+            return
+        status = "up to date" if job.up_to_date and job.status == "ok" else job.status
+        self.job_tree.item(
+            item,
+            values=(job.name, status, f"{job.duration:.1f}s" if job.finished else "", len(job.errors) if job.finished else ""),
+            tags=("failed",) if job.status == "failed" else (),
+        )
+        if item in self.job_tree.selection():
+            self._show_selected_detail()
+
+    def _on_batch_finished(self, batch):
+        if batch is not self.batch or not self.status_label:
+            return
+        counts = batch.summary()
+        text = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        self.status_label.config(text=f"Batch finished: {text}.")
+        logs_console.log(f"Batch build finished: {text}", level='SUCCESS' if not counts.get('failed') else 'WARNING')
+
+    def _selected_job(self):
+        selection = self.job_tree.selection()
+        if not selection or not self.batch:
+            return None
+        for root, item in self._rows.items():
+            if item == selection[0]:
+                return next((job for job in self.batch.jobs if job.root == root), None)
+        return None
+
+    def _show_selected_detail(self):
+        job = self._selected_job()
+        if not job:
+            self.detail_label.config(text="")
+            return
+        lines = [job.root]
+        if job.message:
+            lines.append(job.message)
+        for error in job.errors[:5]:
+            location = f"l.{error.line_number}: " if error.line_number else ""
+            lines.append(f"{location}{error.message}")
+        self.detail_label.config(text="\n".join(lines))
+
+    def _open_selected_document(self):
+        selection = self.job_tree.selection()
+        for root, item in self._rows.items():
+            if selection and item == selection[0]:
+                from app import interface
+                interface.create_new_tab(file_path=root)
+                return
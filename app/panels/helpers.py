@@ -5,6 +5,7 @@ These functions provide easy-to-use interfaces for showing different types
 of panels in the left sidebar, replacing the original dialog functions.
 """
 
+import os
 from app import state
 from .proofreading import ProofreadingPanel
 from .keywords import KeywordsPanel
@@ -19,6 +20,7 @@ from .image_details import ImageDetailsPanel
 from .global_prompts import GlobalPromptsPanel
 from .style_intensity import StyleIntensityPanel
 from .settings import SettingsPanel
+from .batch_build import BatchBuildPanel
 
 
 def show_style_intensity_panel(last_intensity=5, on_confirm_callback=None, on_cancel_callback=None):
@@ -295,4 +297,26 @@ def show_settings_panel():
         theme_getter=state.get_theme_setting
     )
     
-    state.panel_manager.show_panel(panel)
\ No newline at end of file
+    state.panel_manager.show_panel(panel)
+
+
+def show_batch_build_panel():
+    """
+    Show the batch build panel in the left sidebar.
+    """
+    if not state.panel_manager:
+        return
+
+    # Start from the directory of the current document
+    directory = None
+    current_tab = state.get_current_tab()
+    if current_tab and getattr(current_tab, 'file_path', None):
+        directory = os.path.dirname(current_tab.file_path)
+
+    panel = BatchBuildPanel(
+        parent_container=None,  # Will be set by panel manager
+        theme_getter=state.get_theme_setting,
+        directory=directory
+    )
+
+    state.panel_manager.show_panel(panel)
@@ -10,6 +10,8 @@ from .panel_factory import PanelStyle, StandardComponents
 from utils import screen, logs_console
 from app import config as app_config
 from llm import api_client
+from latex.engines import ENGINES, PREVIEW_SAME, PREVIEW_FASTEST
+from pdf_preview.image_processor import DARK_MODE_INVERT, DARK_MODE_SMART
 
 
 class SettingsPanel(BasePanel):
@@ -32,6 +34,12 @@ class SettingsPanel(BasePanel):
         self.editor_font_var: Optional[tk.StringVar] = None
         self.show_status_bar_var: Optional[tk.BooleanVar] = None
         self.show_pdf_preview_var: Optional[tk.BooleanVar] = None
+        self.preview_preamble_cache_var: Optional[tk.BooleanVar] = None
+        self.preview_cpu_budget_var: Optional[tk.StringVar] = None
+        self.latex_engine_var: Optional[tk.StringVar] = None
+        self.preview_engine_policy_var: Optional[tk.StringVar] = None
+        self.preview_draft_graphics_var: Optional[tk.BooleanVar] = None
+        self.preview_dark_mode_var: Optional[tk.StringVar] = None
         self.gemini_api_key_var: Optional[tk.StringVar] = None
         self.model_vars: Dict[str, tk.StringVar] = {}
         self.model_comboboxes: Dict[str, ttk.Combobox] = {}
@@ -134,6 +142,42 @@ class SettingsPanel(BasePanel):
         show_pdf_preview_check = ttk.Checkbutton(interface_frame, variable=self.show_pdf_preview_var)
         show_pdf_preview_check.grid(row=3, column=1, sticky="w", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
         
+        ttk.Label(interface_frame, text="Precompile Preamble:", font=StandardComponents.BODY_FONT).grid(row=4, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.preview_preamble_cache_var = tk.BooleanVar(value=app_config.get_bool(self.current_config.get("preview_preamble_cache", "True")))
+        preview_preamble_cache_check = ttk.Checkbutton(interface_frame, variable=self.preview_preamble_cache_var)
+        preview_preamble_cache_check.grid(row=4, column=1, sticky="w", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
+        ttk.Label(interface_frame, text="Preview CPU Budget (%):", font=StandardComponents.BODY_FONT).grid(row=5, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.preview_cpu_budget_var = tk.StringVar(value=self.current_config.get("preview_cpu_budget", "25"))
+        preview_cpu_budget_entry = StandardComponents.create_entry_input(interface_frame)
+        preview_cpu_budget_entry.configure(textvariable=self.preview_cpu_budget_var)
+        preview_cpu_budget_entry.grid(row=5, column=1, sticky="ew", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
+        # TeX engine used when a document has no magic comment or engine setting
+        ttk.Label(interface_frame, text="Default TeX Engine:", font=StandardComponents.BODY_FONT).grid(row=6, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.latex_engine_var = tk.StringVar(value=self.current_config.get("latex_engine", "pdflatex"))
+        latex_engine_combo = StandardComponents.create_combobox_input(interface_frame, list(ENGINES))
+        latex_engine_combo.configure(textvariable=self.latex_engine_var)
+        latex_engine_combo.grid(row=6, column=1, sticky="ew", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
+        ttk.Label(interface_frame, text="Preview Engine:", font=StandardComponents.BODY_FONT).grid(row=7, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.preview_engine_policy_var = tk.StringVar(value=self.current_config.get("preview_engine_policy", PREVIEW_SAME))
+        preview_engine_combo = StandardComponents.create_combobox_input(interface_frame, [PREVIEW_SAME, PREVIEW_FASTEST])
+        preview_engine_combo.configure(textvariable=self.preview_engine_policy_var)
+        preview_engine_combo.grid(row=7, column=1, sticky="ew", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
+        ttk.Label(interface_frame, text="Draft Images in Preview:", font=StandardComponents.BODY_FONT).grid(row=8, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.preview_draft_graphics_var = tk.BooleanVar(value=app_config.get_bool(self.current_config.get("preview_draft_graphics", "False")))
+        preview_draft_graphics_check = ttk.Checkbutton(interface_frame, variable=self.preview_draft_graphics_var)
+        preview_draft_graphics_check.grid(row=8, column=1, sticky="w", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
+        # "smart" keeps embedded photos in their own colors when pages are inverted for dark themes
+        ttk.Label(interface_frame, text="Preview Dark Mode:", font=StandardComponents.BODY_FONT).grid(row=9, column=0, sticky="w", padx=(0, StandardComponents.ELEMENT_SPACING), pady=2)
+        self.preview_dark_mode_var = tk.StringVar(value=self.current_config.get("preview_dark_mode", DARK_MODE_INVERT))
+        preview_dark_mode_combo = StandardComponents.create_combobox_input(interface_frame, [DARK_MODE_INVERT, DARK_MODE_SMART])
+        preview_dark_mode_combo.configure(textvariable=self.preview_dark_mode_var)
+        preview_dark_mode_combo.grid(row=9, column=1, sticky="ew", padx=(StandardComponents.ELEMENT_SPACING, 0), pady=2)
+        
     def _create_llm_api_section(self, parent):
         """Create the LLM and API configuration section (bottom)."""
         llm_frame = ttk.Frame(parent)
@@ -276,6 +320,12 @@ class SettingsPanel(BasePanel):
                 "editor_font_family": self.editor_font_var.get(),
                 "show_status_bar": self.show_status_bar_var.get(),
                 "show_pdf_preview": self.show_pdf_preview_var.get(),
+                "preview_preamble_cache": self.preview_preamble_cache_var.get(),
+                "preview_cpu_budget": self.preview_cpu_budget_var.get(),
+                "latex_engine": self.latex_engine_var.get(),
+                "preview_engine_policy": self.preview_engine_policy_var.get(),
+                "preview_draft_graphics": self.preview_draft_graphics_var.get(),
+                "preview_dark_mode": self.preview_dark_mode_var.get(),
                 "gemini_api_key": self.gemini_api_key_var.get(),
             }
             
@@ -324,6 +374,12 @@ class SettingsPanel(BasePanel):
             self.editor_font_var.set(self.current_config.get("editor_font_family", "Consolas"))
             self.show_status_bar_var.set(app_config.get_bool(self.current_config.get("show_status_bar", "True")))
             self.show_pdf_preview_var.set(app_config.get_bool(self.current_config.get("show_pdf_preview", "True")))
+            self.preview_preamble_cache_var.set(app_config.get_bool(self.current_config.get("preview_preamble_cache", "True")))
+            self.preview_cpu_budget_var.set(self.current_config.get("preview_cpu_budget", "25"))
+            self.latex_engine_var.set(self.current_config.get("latex_engine", "pdflatex"))
+            self.preview_engine_policy_var.set(self.current_config.get("preview_engine_policy", PREVIEW_SAME))
+            self.preview_draft_graphics_var.set(app_config.get_bool(self.current_config.get("preview_draft_graphics", "False")))
+            self.preview_dark_mode_var.set(self.current_config.get("preview_dark_mode", DARK_MODE_INVERT))
             self.gemini_api_key_var.set(self.current_config.get("gemini_api_key", ""))
             
             # Update model variables
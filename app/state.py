@@ -88,3 +88,17 @@ def get_active_file_path():
     current_tab = get_current_tab()
     return getattr(current_tab, "file_path", None) if current_tab else None
 
+
+def get_open_buffers():
+    """Return {file path: (content, has unsaved changes)} for every saved-to-disk tab."""
+    buffers = {}
+    for tab in list(tabs.values()):
+        file_path = getattr(tab, "file_path", None)
+        if not file_path:
+            continue
+        try:
+            content = tab.get_content()
+        except TclError:
+            continue
+        buffers[file_path] = (content, content != tab.last_saved_content)
+    return buffers
@@ -17,7 +17,8 @@ StatusCallback = Callable[[str, Optional[int]], None]
 
 def close_current_tab(save_current_file: Callable[[], bool], create_tab: Callable[..., None]):
     """Close the active tab, delegating prompts to tab_operations."""
-    return interface_tabops.close_current_tab(
+    closing_tab = state.get_current_tab()
+    result = interface_tabops.close_current_tab(
         state.get_current_tab,
         state.root,
         state.notebook,
@@ -27,6 +28,12 @@ def close_current_tab(save_current_file: Callable[[], bool], create_tab: Callabl
         state._closed_tabs_stack,
     )
 
+    # the user may have cancelled; only release resources of tabs actually removed
+    pdf_interface = getattr(state, "pdf_preview_interface", None)
+    if closing_tab is not None and pdf_interface and closing_tab not in state.tabs.values():
+        pdf_interface.on_tab_closed(closing_tab)
+    return result
+
 
 def create_new_tab(
     file_path: Optional[str],
@@ -14,7 +14,7 @@ from llm import rephrase as llm_rephrase
 from editor import snippets as editor_snippets
 from app import settings_window
 from utils.animations import move_widget
-from app.panels import show_metrics_panel, show_settings_panel
+from app.panels import show_metrics_panel, show_settings_panel, show_batch_build_panel
 from editor import search as editor_search
 
 def _log_action(action_name):
@@ -177,6 +177,7 @@ def create_top_buttons_frame(root):
     tools_menu.add_command(label="Insert Table (Ctrl+Shift+B)", command=lambda: [_log_action("Tools: Insert Table"), interface.insert_table()])
     tools_menu.add_separator()
     tools_menu.add_command(label="Clean Project Directory", command=lambda: [_log_action("Tools: Clean Project"), latex_compiler.clean_project_directory()])
+    tools_menu.add_command(label="Batch Build...", command=lambda: [_log_action("Tools: Batch Build"), show_batch_build_panel()])
     tools_menu.add_separator()
     tools_menu.add_command(label="Usage Metrics", command=lambda: [_log_action("Tools: Usage Metrics"), show_metrics_panel()])
 
@@ -0,0 +1,193 @@
+"""
+Hover preview for math and TikZ in the editor.
+When the mouse rests on a formula or picture, render it through the shared
+snippet renderer and show the image in a small popup. Renders run on one
+background worker that only ever compiles the latest hover.
+"""
+
+import os
+import threading
+import tkinter as tk
+from PIL import Image, ImageTk
+from utils import logs_console
+from pdf_preview.snippet_preview import build_snippet_document, find_snippet, get_snippet_renderer, snippet_preamble
+
+# Milliseconds the mouse must rest on a formula before it is rendered
+HOVER_DELAY_MS = 350
+
+# Largest popup image, in pixels
+MAX_PREVIEW_SIZE = (600, 400)
+
+# The "snippet_preview" setting, read on first hover and updated by set_enabled()
+_enabled = None
+
+
+def set_enabled(enabled):
+    """Turn snippet previews on or off for every editor, after the setting changed."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def _is_enabled():
+    global _enabled
+    if _enabled is None:
+        try:
+            from app import state
+            from app.config import get_bool
+            _enabled = get_bool((state.get_app_config() or {}).get("snippet_preview", "True"))
+        except ImportError:
+            _enabled = True
+    return _enabled
+
+
+class MathPreview(tk.Toplevel):
+    """Popup showing the rendered math environment or tikzpicture under the mouse."""
+
+    def __init__(self, parent, file_path_getter=None):
+        super().__init__(parent)
+        # Setting: make window frameless and tooltip-like
+        self.overrideredirect(True)
+
+        self.label = tk.Label(self, background="white", borderwidth=1, relief="solid",
+                              justify="left", wraplength=MAX_PREVIEW_SIZE[0])
+        self.label.pack()
+        self.withdraw()
+
+        self.parent = parent
+        self.file_path_getter = file_path_getter
+        self.editor = None
+        self.photo = None
+
+        self._hover_timer_id = None
+        self._shown_span = None  # (start index, end index) of the displayed snippet
+        self._request = 0  # newest hover; older renders are dropped when they finish
+        # Latest hover waiting for the worker; a newer hover replaces it before it is compiled
+        self._pending = None
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def attach_to_editor(self, editor):
+        """Attach snippet preview to a text editor widget, next to its other hover handlers."""
+        self.editor = editor
+        editor.bind("<Motion>", self._on_mouse_motion, add="+")
+        editor.bind("<Leave>", lambda e: self.hide(), add="+")
+        editor.bind("<Key>", lambda e: self.hide(), add="+")
+
+    def _on_mouse_motion(self, event):
+        if self._hover_timer_id:
+            self.after_cancel(self._hover_timer_id)
+            self._hover_timer_id = None
+        index = self.editor.index(f"@{event.x},{event.y}")
+        if self._shown_span:
+            start, end = self._shown_span
+            if self.editor.compare(index, ">=", start) and self.editor.compare(index, "<", end):
+                return
+            self.hide()
+        if _is_enabled():
+            self._hover_timer_id = self.after(HOVER_DELAY_MS, self._preview_at, index, event.x_root, event.y_root)
+
+    def _preview_at(self, index, x_root, y_root):
+        """Find the snippet at a text index and show it, rendering it in the background if needed."""
+        self._hover_timer_id = None
+        content = self.editor.get("1.0", "end-1c")
+        line, column = (int(part) for part in index.split('.'))
+        lines = content.split('\n')
+        offset = sum(len(text) + 1 for text in lines[:line - 1]) + column
+        snippet = find_snippet(content, offset)
+        if not snippet:
+            return
+
+        document, engine, source_dir = self._snippet_document(snippet, content)
+        self._shown_span = (f"1.0+{snippet.start}c", f"1.0+{snippet.end}c")
+        self._request += 1
+        request = self._request
+        position = (x_root + 12, y_root + 16)
+
+        renderer = get_snippet_renderer()
+        cached = renderer.cached(document, engine, source_dir)
+        if cached:
+            self._show_result(request, cached, position)
+            return
+        self._show_text("Rendering...", position)
+        with self._worker_lock:
+            self._pending = (request, document, engine, source_dir, position)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._render_pending, daemon=True)
+                self._worker.start()
+
+    def _snippet_document(self, snippet, content):
+        """Standalone source for a snippet, with the preamble of the document's root."""
+        file_path = self.file_path_getter() if self.file_path_getter else None
+        root_path, root_content = file_path, content
+        if file_path:
+            from latex.project_graph import get_project_graph
+            graph = get_project_graph()
+            root_path = graph.find_root(file_path)
+            if root_path != os.path.abspath(file_path):
+                root_content = graph.read(root_path) or content
+
+        from latex.engines import DEFAULT_ENGINE, select_engine
+        try:
+            from app import state
+            config = state.get_app_config() or {}
+        except ImportError:
+            config = {}
+        selection = select_engine(root_content, root_path, default=config.get("latex_engine", DEFAULT_ENGINE),
+                                  preview_policy=config.get("preview_engine_policy", "same"))
+        source_dir = os.path.dirname(root_path) if root_path else None
+        return build_snippet_document(snippet, snippet_preamble(root_content)), selection.preview.name, source_dir
+
+    def _render_pending(self):
+        """Worker thread: render the latest hover until none is waiting, handing results to the main thread."""
+        while True:
+            with self._worker_lock:
+                job, self._pending = self._pending, None
+                if job is None:
+                    self._worker = None
+                    return
+            request, document, engine, source_dir, position = job
+            if request != self._request:
+                continue  # the popup was hidden or moved on while this hover waited
+            result = get_snippet_renderer().render(document, engine, source_dir)
+            try:
+                self.after(0, self._show_result, request, result, position)
+            except (RuntimeError, tk.TclError):
+                with self._worker_lock:
+                    self._worker = None
+                return  # the editor was closed
+
+    def _show_result(self, request, result, position):
+        if request != self._request or not self._shown_span:
+            return
+        if not result.ok:
+            self._show_text(result.error, position)
+            return
+        try:
+            image = Image.open(result.png_path)
+            image.thumbnail(MAX_PREVIEW_SIZE, Image.Resampling.LANCZOS)
+            self.photo = ImageTk.PhotoImage(image)
+        except OSError as e:
+            logs_console.log(f"Could not load snippet image: {e}", level='WARNING')
+            self.hide()
+            return
+        self.label.config(image=self.photo, text="")
+        self._place(position)
+
+    def _show_text(self, text, position):
+        self.label.config(image="", text=text)
+        self.photo = None
+        self._place(position)
+
+    def _place(self, position):
+        self.geometry(f"+{position[0]}+{position[1]}")
+        self.deiconify()
+        self.lift()
+
+    def hide(self):
+        """Hide the popup and forget the displayed snippet."""
+        if self._hover_timer_id:
+            self.after_cancel(self._hover_timer_id)
+            self._hover_timer_id = None
+        self._shown_span = None
+        self._request += 1
+        self.withdraw()
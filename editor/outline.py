@@ -5,6 +5,7 @@ import hashlib
 from utils import logs_console
 from app.config import get_treeview_font_settings
 from editor.highlight_manager import show_navigation_highlight
+from editor.structure import find_section_lines
 
 class Outline:
     """
@@ -426,31 +427,7 @@ class Outline:
     
     def _find_sections_fast(self, content):
         """Ultra-fast section finding - Monaco optimized."""
-        sections = []
-        lines = content.split('\n')
-        
-        # Only check lines that might contain sections
-        for line_num, line in enumerate(lines):
-            line_stripped = line.strip()
-            
-            # Quick checks first
-            if not line_stripped or not line_stripped.startswith('\\'):
-                continue
-                
-            # Fast section detection
-            if line_stripped.startswith('\\section{'):
-                title = self._extract_title_fast(line_stripped, '\\section{')
-                if title:
-                    sections.append(("section", title, line_num + 1, []))
-            elif line_stripped.startswith('\\subsection{'):
-                title = self._extract_title_fast(line_stripped, '\\subsection{')
-                if title:
-                    sections.append(("subsection", title, line_num + 1, []))
-            elif line_stripped.startswith('\\subsubsection{'):
-                title = self._extract_title_fast(line_stripped, '\\subsubsection{')
-                if title:
-                    sections.append(("subsubsection", title, line_num + 1, []))
-        
+        sections = [(section_type, title, line_num, []) for section_type, title, line_num in find_section_lines(content)]
         return self._organize_sections_fast(sections)
     
     def _extract_title_fast(self, line, prefix):
@@ -81,3 +81,43 @@ def extract_section_structure(content, position_index):
             current_subsubsection = match.group(1).strip()
 
     return current_section, current_subsection, current_subsubsection
+
+
+# Sectioning commands recognised by the outline, from outermost to innermost
+SECTION_PREFIXES = (
+    ("section", "\\section{"),
+    ("subsection", "\\subsection{"),
+    ("subsubsection", "\\subsubsection{"),
+)
+
+
+def find_section_lines(content):
+    """
+    Finds sectioning commands in a LaTeX document, line by line.
+
+    Only lines that start with a sectioning command are considered, which keeps the
+    scan fast enough to run on every outline refresh.
+
+    Args:
+        content (str): The full text content of the LaTeX document.
+
+    Returns:
+        list: (section_type, title, line_number) tuples in document order, with
+              1-based line numbers and titles truncated to 50 characters.
+    """
+    sections = []
+    for line_num, line in enumerate(content.split('\n')):
+        line_stripped = line.strip()
+
+        # Quick checks first
+        if not line_stripped or not line_stripped.startswith('\\'):
+            continue
+
+        for section_type, prefix in SECTION_PREFIXES:
+            if line_stripped.startswith(prefix):
+                end = line_stripped.find('}', len(prefix))
+                title = line_stripped[len(prefix):end].strip() if end != -1 else ""
+                if title:
+                    sections.append((section_type, title[:50], line_num + 1))
+                break
+    return sections
@@ -7,6 +7,7 @@ import os
 from tkinter import messagebox
 from utils import logs_console
 from editor.image_preview import ImagePreview
+from editor.math_preview import MathPreview
 from editor.shortcuts import setup_editor_shortcuts # Correct import
 
 class LineNumbers(tk.Canvas):
@@ -266,6 +267,10 @@ class EditorTab(ttk.Frame):
         self.image_preview = ImagePreview(self, lambda: self.file_path)
         self.image_preview.attach_to_editor(self.editor)
 
+        # Rendered preview of the formula or tikzpicture under the mouse
+        self.math_preview = MathPreview(self, lambda: self.file_path)
+        self.math_preview.attach_to_editor(self.editor)
+
         # Setup all editor shortcuts from the dedicated module
         setup_editor_shortcuts(self.editor)
         
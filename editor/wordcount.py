@@ -3,13 +3,37 @@ This module provides functionality for calculating and displaying the word count
 It aims to provide a more accurate word count by filtering out LaTeX commands and comments.
 """
 
-import tkinter as tk
 import re
 
 # global variable to store the last calculated word count
 # initialized to -1 to ensure the word count is updated on the first call
 _last_word_count = -1
 
+def count_words(content):
+    """
+    Counts the words of LaTeX source, ignoring comments and commands.
+
+    Args:
+        content (str): LaTeX source text.
+
+    Returns:
+        int: The number of words.
+    """
+    # --- pre-processing content for accurate word count ---
+    # 1. remove latex comments (lines starting with % or % followed by anything until newline)
+    content = re.sub(r"%.*?\n", "", content) 
+    # 2. remove latex commands (e.g., \section{}, \includegraphics[]{})
+    # this regex matches \ followed by one or more letters/symbols, optionally followed by
+    # match square brackets for optional arguments and curly braces for mandatory arguments
+    content = re.sub(r"\\[a-zA-Z@]+(?:\\[^\\]*\\)?(?:\{[^}]*\})?", "", content)
+    # 3. replace remaining latex structural characters (brackets, braces, asterisks) with spaces
+    # this helps in correctly splitting words that might be adjacent to these characters
+    content = re.sub(r"\\[\\[\\]{}*]", " ", content)
+    
+    # split the cleaned content by whitespace to get a list of words
+    words = content.split()
+    return len(words) # calculate the number of words
+
 def update_word_count(editor, status_label):
     """
     Calculates the word count of the text in the provided editor widget and updates a status label.
@@ -31,22 +55,7 @@ def update_word_count(editor, status_label):
         return 0 # return 0 if widgets are not available
 
     # retrieve the entire content from the editor
-    content = editor.get("1.0", tk.END)
-    
-    # --- pre-processing content for accurate word count ---
-    # 1. remove latex comments (lines starting with % or % followed by anything until newline)
-    content = re.sub(r"%.*?\n", "", content) 
-    # 2. remove latex commands (e.g., \section{}, \includegraphics[]{})
-    # this regex matches \ followed by one or more letters/symbols, optionally followed by
-    # match square brackets for optional arguments and curly braces for mandatory arguments
-    content = re.sub(r"\\[a-zA-Z@]+(?:\\[^\\]*\\)?(?:\{[^}]*\})?", "", content)
-    # 3. replace remaining latex structural characters (brackets, braces, asterisks) with spaces
-    # this helps in correctly splitting words that might be adjacent to these characters
-    content = re.sub(r"\\[\\[\\]{}*]", " ", content)
-    
-    # split the cleaned content by whitespace to get a list of words
-    words = content.split()
-    word_count = len(words) # calculate the number of words
+    word_count = count_words(editor.get("1.0", "end"))
 
     # update the status label only if the word count has changed
     if word_count != _last_word_count:
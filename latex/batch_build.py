@@ -0,0 +1,270 @@
+"""
+Batch compilation of many root documents.
+Each document is built by its own BuildEngine in a private build directory, with
+at most `workers` builds (and so TeX processes) running at once. Progress is
+reported per document so the editor and the command line can show a live table.
+"""
+
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+from latex.build_engine import BuildEngine, DEFAULT_MAX_PASSES
+from latex.engines import get_engine, select_engine
+from latex.project_graph import get_project_graph
+from latex_debug_system.stream_parser import StreamingLogParser
+from utils import logs_console
+
+DEFAULT_BATCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Seconds allowed for all passes of one document
+DEFAULT_BATCH_TIMEOUT = 300
+
+# Job states in the order a job goes through them
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'ok', 'failed', 'cancelled'
+
+
+@dataclass
+class BatchJob:
+    """Progress and outcome of one document in a batch."""
+    root: str
+    build_dir: str
+    status: str = QUEUED
+    duration: float = 0.0
+    returncode: Optional[int] = None
+    up_to_date: bool = False
+    passes: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    abort_reason: str = ""
+    message: str = ""
+    pdf_path: Optional[str] = None
+    engine: str = ""
+
+    @property
+    def name(self):
+        return os.path.basename(self.root)
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+
+def expand_roots(patterns, graph=None):
+    """
+    Turn files, directories and glob patterns into the root documents to build.
+
+    Every .tex file found is mapped to its root with the project graph, so a
+    directory of chapters builds its main document once.
+    """
+    graph = graph or get_project_graph()
+    candidates = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for directory, subdirectories, files in os.walk(match):
+                    subdirectories[:] = sorted(
+                        name for name in subdirectories if not name.startswith('.') and not name.endswith('.cache')
+                    )
+                    candidates.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith('.tex'))
+            elif match.endswith('.tex') and os.path.isfile(match):
+                candidates.append(match)
+
+    roots = []
+    for path in candidates:
+        root = graph.find_root(path)
+        if root not in roots and os.path.isfile(root):
+            roots.append(root)
+    return roots
+
+
+def default_build_root():
+    return os.path.join(tempfile.gettempdir(), "noctern_batch")
+
+
+def build_directory_for(root, build_root):
+    """Private build directory of a document; stable so unchanged documents are not rebuilt."""
+    stem = os.path.splitext(os.path.basename(root))[0]
+    digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:10]
+    return os.path.join(build_root, f"{stem}-{digest}")
+
+
+def _publish(source, target):
+    """Copy a build product next to its document without exposing a partial file."""
+    temporary = target + ".tmp"
+    shutil.copyfile(source, temporary)
+    os.replace(temporary, target)
+
+
+class BatchBuild:
+    """
+    Build a list of root documents on a bounded pool.
+
+    `run()` blocks until every document is built or the batch is cancelled;
+    `on_progress(job)` is called from worker threads whenever a job changes state.
+    With `publish`, the PDF (and SyncTeX file) of each successful build is copied
+    next to its document, as a normal compile would leave it. Without `engine`,
+    each document is built with the engine its magic comment, settings or
+    packages select.
+    """
+
+    def __init__(self, roots, workers=DEFAULT_BATCH_WORKERS, engine=None, extra_args=None,
+                 timeout=DEFAULT_BATCH_TIMEOUT, max_passes=DEFAULT_MAX_PASSES, build_root=None,
+                 publish=True, on_progress=None):
+        self.workers = max(1, workers)
+        self.engine = engine
+        self.extra_args = list(extra_args or [])
+        self.timeout = timeout
+        self.max_passes = max_passes
+        self.build_root = build_root or default_build_root()
+        self.publish = publish
+        self.on_progress = on_progress
+        self.jobs: List[BatchJob] = [BatchJob(root, build_directory_for(root, self.build_root)) for root in roots]
+        self._engines = {}
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """Skip queued documents and kill the running builds."""
+        with self._lock:
+            self._cancelled = True
+            engines = list(self._engines.values())
+        for engine in engines:
+            engine.kill()
+
+    def run(self):
+        """Build every document. Returns the jobs in their original order."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-build") as executor:
+            for job in self.jobs:
+                executor.submit(self._run_job, job)
+        return self.jobs
+
+    def summary(self):
+        counts = {}
+        for job in self.jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def _run_job(self, job):
+        """Worker thread: build one document in its own directory."""
+        if self._cancelled:
+            self._update(job, status=CANCELLED)
+            return
+        start_time = time.time()
+        profile = self._select_engine(job)
+        job.engine = profile.name
+        parser = StreamingLogParser(fatal_markers=profile.fatal_markers)
+        engine = BuildEngine(
+            os.path.dirname(job.root), os.path.basename(job.root),
+            engine=profile.name, extra_args=self.extra_args, timeout=self.timeout,
+            max_passes=self.max_passes, output_dir=job.build_dir,
+        )
+        engine.on_line = lambda line: parser.feed(line) and engine.kill()
+        with self._lock:
+            if self._cancelled:
+                engine.kill()
+            self._engines[id(job)] = engine
+        self._update(job, status=RUNNING)
+
+        try:
+            result = engine.run()
+        except FileNotFoundError:
+            self._update(job, status=FAILED, duration=time.time() - start_time,
+                         message=f"TeX engine '{job.engine}' not found")
+            return
+        except Exception as e:
+            logs_console.log(f"Batch build of {job.root} failed: {e}", level='ERROR')
+            self._update(job, status=FAILED, duration=time.time() - start_time, message=str(e))
+            return
+        finally:
+            with self._lock:
+                self._engines.pop(id(job), None)
+
+        parser.finish()
+        result = parser.aborted_result(result)
+        if result.cancelled:
+            status, message = CANCELLED, ""
+        elif result.timed_out:
+            status, message = FAILED, f"Timed out after {self.timeout:.0f}s"
+        elif result.returncode != 0:
+            status, message = FAILED, result.abort_reason or f"{job.engine} exited with code {result.returncode}"
+        else:
+            status, message = SUCCEEDED, ""
+
+        pdf_path = None
+        if status == SUCCEEDED:
+            pdf_path = self._publish_products(job)
+        self._update(
+            job, status=status, duration=time.time() - start_time, returncode=result.returncode,
+            up_to_date=result.up_to_date, passes=list(result.passes), errors=list(parser.errors),
+            abort_reason=result.abort_reason, message=message, pdf_path=pdf_path,
+        )
+
+    def _select_engine(self, job):
+        """Profile of the engine building a document: the batch's own, or the document's choice."""
+        if self.engine:
+            return get_engine(self.engine)
+        try:
+            with open(job.root, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            content = ""
+        return select_engine(content, job.root).build
+
+    def _publish_products(self, job):
+        """Return the PDF path, copying it next to the document when publishing."""
+        jobname = os.path.splitext(job.name)[0]
+        built_pdf = os.path.join(job.build_dir, jobname + '.pdf')
+        if not os.path.exists(built_pdf):
+            return None
+        if not self.publish:
+            return built_pdf
+        source_dir = os.path.dirname(job.root)
+        try:
+            for extension in ('.pdf', '.synctex.gz'):
+                built = os.path.join(job.build_dir, jobname + extension)
+                if os.path.exists(built):
+                    _publish(built, os.path.join(source_dir, jobname + extension))
+        except OSError as e:
+            logs_console.log(f"Could not copy the PDF of {job.name}: {e}", level='WARNING')
+            return built_pdf
+        return os.path.join(source_dir, jobname + '.pdf')
+
+    def _update(self, job, **changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        if self.on_progress:
+            try:
+                self.on_progress(job)
+            except Exception as e:
+                logs_console.log(f"Batch progress callback failed: {e}", level='WARNING')
+
+
+def format_table(jobs):
+    """Render jobs as a plain-text progress table."""
+    rows = [("Document", "Status", "Time", "Errors", "Detail")]
+    for job in jobs:
+        status = "up to date" if job.up_to_date and job.status == SUCCEEDED else job.status
+        duration = f"{job.duration:.1f}s" if job.finished else ""
+        detail = job.message
+        if job.errors:
+            first = job.errors[0]
+            location = f"l.{first.line_number}: " if first.line_number else ""
+            detail = f"{location}{first.message}"
+        rows.append((job.name, status, duration, str(len(job.errors)) if job.finished else "", detail))
+    widths = [max(len(row[column]) for row in rows) for column in range(4)]
+    lines = []
+    for row in rows:
+        cells = [row[column].ljust(widths[column]) for column in range(4)] + [row[4]]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
@@ -0,0 +1,447 @@
+"""
+Dependency-aware multi-pass LaTeX build engine.
+Run the TeX engine with -recorder, track the files it reads and the auxiliary
+files it writes, and only repeat passes or run bibtex/biber when something
+they depend on actually changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from latex.engines import get_engine
+from latex.process_runner import ProcessResult, StreamingProcess
+from utils import logs_console
+
+DEFAULT_MAX_PASSES = 5
+
+# Files the engine reads back on the next pass
+_FEEDBACK_EXTENSIONS = ('.aux', '.toc', '.lof', '.lot', '.out', '.nav', '.snm')
+
+# Requests for another TeX pass; biblatex's "Please (re)run Biber/BibTeX" is a
+# request for the bibliography tool, which _run_bibliography_if_needed handles
+_RERUN_PATTERN = re.compile(
+    r'(Rerun to get|Please rerun LaTeX|Rerun LaTeX|Label\(s\) may have changed|'
+    r'Table widths have changed|rerun to get)',
+)
+_AUX_INPUT = re.compile(r'\\@input\{([^}]+)\}')
+_AUX_BIB_LINE = re.compile(r'^\\(citation|bibdata|bibstyle)\{([^}]*)\}', re.MULTILINE)
+_BCF_DATASOURCE = re.compile(r'<bcf:datasource[^>]*>([^<]+)</bcf:datasource>')
+_CROSS_REFERENCE = re.compile(
+    r'\\(ref|eqref|pageref|autoref|cref|Cref|cite\w*|tableofcontents|listoffigures|'
+    r'listoftables|bibliography|addbibresource|printbibliography)\b'
+)
+
+_STATE_SUFFIX = '.fdb_noctern'
+
+
+@dataclass
+class BuildResult(ProcessResult):
+    """Outcome of a multi-pass build."""
+    passes: list = field(default_factory=list)
+    up_to_date: bool = False
+
+
+def needs_rerun(log_content):
+    """Check whether a TeX log asks for another pass."""
+    return bool(_RERUN_PATTERN.search(log_content or ""))
+
+
+def parse_fls(fls_path):
+    """
+    Parse a -recorder .fls file.
+
+    Returns:
+        tuple: (inputs, outputs) as sets of absolute paths.
+    """
+    inputs, outputs = set(), set()
+    cwd = os.path.dirname(os.path.abspath(fls_path))
+    try:
+        with open(fls_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                kind, _, path = line.rstrip('\r\n').partition(' ')
+                if kind == 'PWD':
+                    cwd = path
+                elif kind in ('INPUT', 'OUTPUT'):
+                    full_path = os.path.normpath(os.path.join(cwd, path))
+                    (inputs if kind == 'INPUT' else outputs).add(full_path)
+    except OSError:
+        pass
+    return inputs, outputs
+
+
+def mirror_source_directories(source_dir, output_dir):
+    """
+    Create `output_dir` and the subdirectories of `source_dir` that hold .tex files.
+
+    TeX writes the .aux file of `\\include{chapters/intro}` to
+    `chapters/intro.aux` below its output directory and fails if that
+    directory does not exist.
+    """
+    source_dir, output_dir = os.path.abspath(source_dir), os.path.abspath(output_dir)
+    for directory, subdirectories, files in os.walk(source_dir):
+        # The output directory, or one holding it, is not part of the sources
+        subdirectories[:] = [
+            name for name in subdirectories
+            if not name.startswith('.') and not _contains(os.path.join(directory, name), output_dir)
+        ]
+        if directory == source_dir or any(name.endswith('.tex') for name in files):
+            relative = os.path.relpath(directory, source_dir)
+            os.makedirs(os.path.join(output_dir, relative), exist_ok=True)
+
+
+def _contains(directory, path):
+    return path == directory or path.startswith(directory + os.sep)
+
+
+def hash_file(path):
+    """Return the MD5 of a file, or None if it cannot be read."""
+    digest = hashlib.md5()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class BuildEngine:
+    """
+    Build one document with as few engine passes as possible.
+
+    State from the previous build (input hashes, bibliography signature) is
+    stored next to the document in `<job>.fdb_noctern`, so an unchanged document
+    is not rebuilt and bibtex/biber only run when citations or .bib files change.
+    With `output_dir`, the PDF, auxiliary files and build state are written
+    there instead of next to the document.
+    The object has the same run()/kill()/on_line interface as StreamingProcess.
+    """
+
+    def __init__(self, source_dir, file_name, engine="pdflatex", extra_args=None,
+                 timeout=120, max_passes=DEFAULT_MAX_PASSES, on_line=None, env=None, output_dir=None):
+        self.source_dir = os.path.abspath(source_dir)
+        self.output_dir = os.path.abspath(output_dir) if output_dir else self.source_dir
+        self.file_name = file_name
+        self.jobname = os.path.splitext(file_name)[0]
+        self.engine = engine
+        self.profile = get_engine(engine)
+        self.extra_args = list(extra_args or [])
+        self.timeout = timeout
+        self.max_passes = max_passes
+        self.on_line = on_line
+        self.env = env
+        self._process = None
+        self._cancelled = False
+        self._deadline = None
+        self._bibliography_error = None  # why the bibliography tool failed, which ends the build
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def kill(self):
+        """Cancel the build, killing the current process."""
+        self._cancelled = True
+        process = self._process
+        if process:
+            process.kill()
+
+    def run(self):
+        """
+        Run the build to completion in the calling thread.
+
+        Raises:
+            FileNotFoundError: If the TeX engine does not exist.
+        """
+        start_time = time.time()
+        self._deadline = start_time + self.timeout if self.timeout else None
+        state = self._load_state()
+        output = []
+
+        if self._is_up_to_date(state):
+            self._emit(output, f"{self.file_name}: all inputs unchanged, PDF is up to date")
+            return BuildResult(returncode=state.get('returncode', 0), output="\n".join(output),
+                               duration=time.time() - start_time, up_to_date=True)
+
+        if self.output_dir != self.source_dir:
+            self._prepare_output_dir()
+        passes = []
+        draft = self._predict_rerun()
+        reason = "initial pass"
+        result = None
+        engine_passes = 0
+
+        while True:
+            if engine_passes >= self.max_passes:
+                logs_console.log(f"Build stopped after {self.max_passes} passes without converging", level='WARNING')
+                break
+            if engine_passes == self.max_passes - 1:
+                draft = False  # the last allowed pass must write the PDF
+
+            engine_passes += 1
+            feedback_before = self._feedback_signature()
+            result = self._run_pass(draft, reason, output)
+            passes.append(f"{self.engine}{' (draft)' if draft else ''}: {reason}")
+            if result.cancelled or result.timed_out or result.returncode != 0:
+                if draft and not (result.cancelled or result.timed_out):
+                    # In nonstopmode TeX still writes a PDF for a document with errors; a draft pass writes none
+                    result = self._run_pass(False, "write PDF despite errors", output)
+                    passes.append(f"{self.engine}: write PDF despite errors")
+                break
+
+            bibliography_changed = self._run_bibliography_if_needed(state, output)
+            if self._cancelled:
+                result = self._finish(result, output, passes, start_time, cancelled=True)
+                return result
+            if self._bibliography_error:
+                # More passes cannot fix the citations; write the PDF once and report the failure
+                if draft:
+                    result = self._run_pass(False, "write PDF", output)
+                    passes.append(f"{self.engine}: write PDF")
+                self._emit(output, self._bibliography_error)
+                return self._finish(result, output, passes, start_time, abort_reason=self._bibliography_error)
+            if bibliography_changed:
+                passes.append("bibliography")
+
+            log_content = self._read_text(self._job_path('.log'))
+            if bibliography_changed:
+                reason, draft = "bibliography changed", True
+            elif needs_rerun(log_content):
+                reason, draft = "log requested rerun", False
+            elif self._feedback_changed(feedback_before):
+                reason, draft = "auxiliary files changed", False
+            elif draft:
+                # Everything converged during draft passes; one more pass writes the PDF
+                reason, draft = "write PDF", False
+            else:
+                break
+
+        if result.returncode == 0 and not result.cancelled:
+            self._save_state(state, result.returncode)
+        return self._finish(result, output, passes, start_time)
+
+    def _finish(self, result, output, passes, start_time, cancelled=False, abort_reason=""):
+        return BuildResult(
+            returncode=result.returncode or (1 if abort_reason else 0),
+            output="\n".join(output),
+            duration=time.time() - start_time,
+            cancelled=cancelled or result.cancelled,
+            timed_out=result.timed_out,
+            abort_reason=abort_reason or result.abort_reason,
+            passes=passes,
+        )
+
+    def _run_pass(self, draft, reason, output):
+        """Run one engine pass."""
+        self._emit(output, f"=== {self.engine} pass{' (draft)' if draft else ''}: {reason} ===")
+        extra_args = ["-recorder"]
+        if self.output_dir != self.source_dir:
+            extra_args.append(f"-output-directory={self.output_dir}")
+        command = self.profile.command(self.file_name, draft=draft, extra_args=extra_args + self.extra_args)
+        return self._run_command(command, output)
+
+    def _run_command(self, command, output, cwd=None, env=None):
+        remaining = None
+        if self._deadline:
+            remaining = max(1, self._deadline - time.time())
+        self._process = StreamingProcess(command, cwd=cwd or self.source_dir, timeout=remaining,
+                                         on_line=lambda line: self._emit(output, line), env=env or self.env)
+        if self._cancelled:
+            self._process.kill()
+        try:
+            return self._process.run()
+        finally:
+            self._process = None
+
+    def _emit(self, output, line):
+        output.append(line)
+        if self.on_line:
+            self.on_line(line)
+
+    def _job_path(self, extension):
+        return os.path.join(self.output_dir, self.jobname + extension)
+
+    def _prepare_output_dir(self):
+        """Create the output directory and mirror the source subdirectories into it."""
+        mirror_source_directories(self.source_dir, self.output_dir)
+
+    # --- Change detection ---------------------------------------------------
+
+    def _feedback_signature(self):
+        """Hash the auxiliary files that the next pass would read back."""
+        return {ext: hash_file(self._job_path(ext)) for ext in _FEEDBACK_EXTENSIONS}
+
+    def _feedback_changed(self, before):
+        after = self._feedback_signature()
+        if before.get('.aux') is None:
+            # First build: only rerun if the new files actually carry cross-reference data
+            aux = self._read_text(self._job_path('.aux'))
+            if any(marker in aux for marker in ('\\newlabel', '\\bibcite', '\\@writefile')):
+                return True
+            return any(self._read_text(self._job_path(ext)).strip()
+                       for ext in _FEEDBACK_EXTENSIONS if ext != '.aux' and after[ext])
+        return after != before
+
+    def _predict_rerun(self):
+        """Guess whether a second pass will be needed, so the first can skip the PDF."""
+        if not self.profile.draft_flag or os.path.exists(self._job_path('.aux')):
+            return False
+        return bool(_CROSS_REFERENCE.search(self._read_text(os.path.join(self.source_dir, self.file_name))))
+
+    def _is_up_to_date(self, state):
+        """Check whether the PDF was built from exactly the current inputs, engine and options."""
+        inputs = state.get('inputs')
+        if not inputs or state.get('returncode') != 0 or not os.path.exists(self._job_path('.pdf')):
+            return False
+        if state.get('options') != self._build_options():
+            return False
+        for path, (mtime, size, digest) in inputs.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if stat.st_mtime == mtime and stat.st_size == size:
+                continue
+            if hash_file(path) != digest:
+                return False
+        return True
+
+    def _build_options(self):
+        """Settings besides the inputs that change the PDF, as stored in the build state."""
+        return {'engine': self.engine, 'extra_args': self.extra_args, 'output_dir': self.output_dir}
+
+    def _recorded_inputs(self):
+        """Collect the files read by the last pass, minus files it also wrote."""
+        inputs, outputs = parse_fls(self._job_path('.fls'))
+        recorded = {}
+        for path in sorted(inputs - outputs):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            recorded[path] = [stat.st_mtime, stat.st_size, hash_file(path)]
+        return recorded
+
+    # --- Bibliography -------------------------------------------------------
+
+    def _bibliography_tool(self):
+        """Return 'biber', 'bibtex' or None depending on what the last pass asked for."""
+        _, outputs = parse_fls(self._job_path('.fls'))
+        if self._job_path('.bcf') in outputs:
+            return 'biber'
+        if '\\bibdata' in self._collect_aux_text():
+            return 'bibtex'
+        return None
+
+    def _collect_aux_text(self, aux_name=None, seen=None):
+        """Read the main aux file and the aux files of \\include'd chapters."""
+        seen = seen if seen is not None else set()
+        aux_name = aux_name or self.jobname + '.aux'
+        if aux_name in seen:
+            return ""
+        seen.add(aux_name)
+        text = self._read_text(os.path.join(self.output_dir, aux_name))
+        parts = [text]
+        for child in _AUX_INPUT.findall(text):
+            parts.append(self._collect_aux_text(child, seen))
+        return "\n".join(parts)
+
+    def _bibliography_signature(self, tool):
+        """Hash citations, styles and database files that the bibliography depends on."""
+        digest = hashlib.md5(tool.encode('utf-8'))
+        if tool == 'biber':
+            bcf = self._read_text(self._job_path('.bcf'))
+            digest.update(bcf.encode('utf-8'))
+            databases = _BCF_DATASOURCE.findall(bcf)
+        else:
+            databases = []
+            for kind, value in _AUX_BIB_LINE.findall(self._collect_aux_text()):
+                digest.update(f"{kind}:{value}\n".encode('utf-8'))
+                if kind == 'bibdata':
+                    databases.extend(name.strip() for name in value.split(','))
+                elif kind == 'bibstyle':
+                    databases.append(value.strip() + '.bst')
+        for name in databases:
+            path = os.path.join(self.source_dir, name)
+            if not os.path.exists(path) and not os.path.splitext(name)[1]:
+                path += '.bib'
+            digest.update(f"{name}:{hash_file(path)}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _run_bibliography_if_needed(self, state, output):
+        """
+        Run bibtex or biber when citations or databases changed.
+
+        A missing tool or one that reports errors sets `_bibliography_error`.
+
+        Returns:
+            bool: True if the .bbl file changed, so the engine must run again.
+        """
+        tool = self._bibliography_tool()
+        if not tool:
+            return False
+        signature = self._bibliography_signature(tool)
+        bbl_path = self._job_path('.bbl')
+        if signature == state.get('bibliography') and os.path.exists(bbl_path):
+            return False
+
+        bbl_before = hash_file(bbl_path)
+        self._emit(output, f"=== {tool}: citations or bibliography databases changed ===")
+        command, cwd, env = [tool, self.jobname], None, None
+        if self.output_dir != self.source_dir:
+            if tool == 'biber':
+                # biber reads the .bcf from the output directory and data sources from the document's
+                command.insert(1, f"--output-directory={self.output_dir}")
+            else:
+                # bibtex runs beside the .aux file and finds .bib/.bst files through the search path
+                cwd = self.output_dir
+                env = dict(self.env if self.env is not None else os.environ)
+                for variable in ('BIBINPUTS', 'BSTINPUTS'):
+                    search_path = [part for part in env.get(variable, '').split(os.pathsep) if part]
+                    env[variable] = os.pathsep.join(search_path + [self.source_dir, ''])
+        try:
+            result = self._run_command(command, output, cwd=cwd, env=env)
+        except FileNotFoundError:
+            self._bibliography_error = f"{tool} not found; citations could not be resolved"
+            logs_console.log(self._bibliography_error, level='WARNING')
+            return False
+        if result.cancelled or result.timed_out:
+            return False
+        # bibtex exits with 1 for warnings only, such as a missing field
+        if result.returncode > (1 if tool == 'bibtex' else 0):
+            self._bibliography_error = f"{tool} reported errors (see {self.jobname}.blg)"
+            logs_console.log(self._bibliography_error, level='WARNING')
+            return False
+        state['bibliography'] = signature
+        return hash_file(bbl_path) != bbl_before
+
+    # --- Persistence --------------------------------------------------------
+
+    def _load_state(self):
+        try:
+            with open(self._job_path(_STATE_SUFFIX), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state, returncode):
+        state['inputs'] = self._recorded_inputs()
+        state['returncode'] = returncode
+        state['options'] = self._build_options()
+        try:
+            with open(self._job_path(_STATE_SUFFIX), 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+        except OSError as e:
+            logs_console.log(f"Could not save build state: {e}", level='WARNING')
+
+    @staticmethod
+    def _read_text(path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except OSError:
+            return ""
@@ -0,0 +1,314 @@
+"""
+Client side of the compile server.
+Start the server process on demand and expose its jobs as runners with the same
+interface as StreamingProcess, so callers work the same with or without it.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from latex.build_engine import BuildEngine, BuildResult, DEFAULT_MAX_PASSES
+from latex.compile_server import encode_message
+from latex.process_runner import ProcessResult, StreamingProcess
+from utils import logs_console
+
+# Seconds to wait before starting a server again after it died
+RESTART_INTERVAL = 30.0
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CompileServerClient:
+    """Own one compile server process and route its messages to pending jobs."""
+
+    def __init__(self, workers, python_executable=None):
+        self.workers = workers
+        self.python_executable = python_executable or sys.executable
+        self._process = None
+        self._jobs = {}  # job id -> (on_line, on_result)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def is_alive(self):
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def start(self):
+        """Launch the server process. Returns False if it could not be started."""
+        try:
+            self._process = subprocess.Popen(
+                [self.python_executable, "-m", "latex.compile_server", str(self.workers)],
+                cwd=_PROJECT_ROOT,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1,
+            )
+        except OSError as e:
+            logs_console.log(f"Could not start compile server: {e}", level='WARNING')
+            self._process = None
+            return False
+        threading.Thread(target=self._read_loop, args=(self._process,), daemon=True).start()
+        logs_console.log(f"Compile server started with {self.workers} workers (pid {self._process.pid})", level='DEBUG')
+        return True
+
+    def submit(self, job, on_line, on_result):
+        """
+        Queue a job on the server.
+
+        Args:
+            job (dict): Job description, see latex.compile_server.
+            on_line (callable): Called from the reader thread with each output line.
+            on_result (callable): Called once with the result message, or with None
+                if the server died before answering.
+
+        Returns:
+            int: The job id, or None if the server is not running.
+        """
+        job_id = next(self._ids)
+        with self._lock:
+            self._jobs[job_id] = (on_line, on_result)
+        if not self._send({'type': 'compile', 'id': job_id, 'job': job}):
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            return None
+        return job_id
+
+    def cancel(self, job_id):
+        self._send({'type': 'cancel', 'id': job_id})
+
+    def close(self):
+        """Stop the server; running jobs are killed and reported as lost."""
+        process = self._process
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            process.kill()
+
+    def _send(self, message):
+        process = self._process
+        if process is None or process.poll() is not None:
+            return False
+        with self._write_lock:
+            try:
+                process.stdin.write(encode_message(message))
+                process.stdin.flush()
+                return True
+            except (OSError, ValueError):
+                return False
+
+    def _read_loop(self, process):
+        """Reader thread: dispatch server messages until the server exits."""
+        for raw_line in process.stdout:
+            try:
+                message = json.loads(raw_line)
+            except ValueError:
+                continue
+            job_id = message.get('id')
+            if message.get('type') == 'line':
+                with self._lock:
+                    handlers = self._jobs.get(job_id)
+                if handlers:
+                    handlers[0](message.get('line', ''))
+            elif message.get('type') == 'result':
+                with self._lock:
+                    handlers = self._jobs.pop(job_id, None)
+                if handlers:
+                    handlers[1](message)
+
+        process.wait()
+        with self._lock:
+            lost = list(self._jobs.values())
+            self._jobs.clear()
+        if lost:
+            logs_console.log(f"Compile server exited with code {process.returncode}; {len(lost)} jobs lost", level='WARNING')
+        for _, on_result in lost:
+            on_result(None)
+
+
+class RemoteRunner:
+    """
+    Run a job on the compile server with the StreamingProcess interface.
+
+    `run()` blocks until the server answers and returns a ProcessResult, or a
+    BuildResult for build jobs. When the server is disabled or dies, the job
+    runs in this process through `local_factory` instead.
+    After a remote run, `artifacts` maps 'pdf', 'synctex' and 'log' to the files
+    produced and `queue_time` is the time the job waited for a free worker.
+    """
+
+    def __init__(self, job, local_factory, on_line=None):
+        self.job = job
+        self.local_factory = local_factory
+        self.on_line = on_line
+        self.artifacts = {}
+        self.queue_time = 0.0
+        self._client = None
+        self._job_id = None
+        self._local = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def kill(self):
+        with self._lock:
+            self._cancelled = True
+            client, job_id, local = self._client, self._job_id, self._local
+        if local:
+            local.kill()
+        elif client and job_id is not None:
+            client.cancel(job_id)
+
+    def run(self):
+        """
+        Run the job to completion in the calling thread.
+
+        Raises:
+            FileNotFoundError: If the TeX executable does not exist.
+        """
+        if self._cancelled:
+            return self._make_result({'returncode': -1, 'cancelled': True}, "")
+
+        client = get_compile_client()
+        if client is None:
+            return self._run_local()
+
+        output_lines = []
+        done = threading.Event()
+        response = {}
+
+        def on_line(line):
+            output_lines.append(line)
+            callback = self.on_line
+            if callback:
+                callback(line)
+
+        def on_result(message):
+            response['message'] = message
+            done.set()
+
+        job_id = client.submit(self.job, on_line, on_result)
+        if job_id is None:
+            return self._run_local()
+        with self._lock:
+            self._client, self._job_id = client, job_id
+            cancelled = self._cancelled
+        if cancelled:
+            client.cancel(job_id)
+        done.wait()
+
+        message = response['message']
+        if message is None:
+            if self._cancelled:
+                return self._make_result({'returncode': -1, 'cancelled': True}, "")
+            return self._run_local()
+        if message.get('error') == 'not_found':
+            raise FileNotFoundError(message.get('message', ''))
+        if message.get('error'):
+            raise RuntimeError(message.get('message', 'compile server job failed'))
+
+        self.artifacts = message.get('artifacts', {})
+        self.queue_time = message.get('queued', 0.0)
+        return self._make_result(message, "\n".join(output_lines))
+
+    def _run_local(self):
+        with self._lock:
+            if self._cancelled:
+                return self._make_result({'returncode': -1, 'cancelled': True}, "")
+            self._local = self.local_factory(self.on_line)
+        return self._local.run()
+
+    def _make_result(self, message, output):
+        fields = dict(
+            returncode=message.get('returncode', -1),
+            output=output,
+            duration=message.get('duration', 0.0),
+            cancelled=message.get('cancelled', False),
+            timed_out=message.get('timed_out', False),
+        )
+        if self.job.get('kind') == 'build':
+            return BuildResult(passes=message.get('passes', []), up_to_date=message.get('up_to_date', False), **fields)
+        return ProcessResult(**fields)
+
+
+_client = None
+_workers = 0
+_last_failure = 0.0
+_client_lock = threading.Lock()
+
+
+def configure_compile_server(workers):
+    """Set the size of the server worker pool; 0 disables the server."""
+    global _workers, _client
+    with _client_lock:
+        if workers == _workers:
+            return
+        _workers = max(0, workers)
+        previous, _client = _client, None
+    if previous:
+        previous.close()
+
+
+def get_compile_client():
+    """Return the running server client, starting it if needed, or None when unavailable."""
+    global _client, _last_failure
+    with _client_lock:
+        if _workers <= 0:
+            return None
+        if _client is not None and _client.is_alive:
+            return _client
+        if time.time() - _last_failure < RESTART_INTERVAL:
+            return None
+        _client = CompileServerClient(_workers)
+        if not _client.start():
+            _client = None
+            _last_failure = time.time()
+            return None
+        return _client
+
+
+def shutdown_compile_server():
+    """Stop the server process if one is running."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, None
+    if previous:
+        previous.close()
+
+
+atexit.register(shutdown_compile_server)
+
+
+def create_process(command, cwd=None, timeout=120, env=None):
+    """Return a runner executing a single command, on the server when it is enabled."""
+    job = {'kind': 'run', 'command': list(command), 'cwd': cwd, 'timeout': timeout, 'env': env}
+    return RemoteRunner(job, lambda on_line: StreamingProcess(command, cwd=cwd, on_line=on_line, timeout=timeout, env=env))
+
+
+def create_build(source_dir, file_name, engine="pdflatex", extra_args=None, timeout=120,
+                 max_passes=DEFAULT_MAX_PASSES, env=None, output_dir=None):
+    """Return a runner building a document with BuildEngine, on the server when it is enabled."""
+    job = {
+        'kind': 'build', 'cwd': source_dir, 'file_name': file_name, 'engine': engine,
+        'extra_args': list(extra_args or []), 'timeout': timeout, 'max_passes': max_passes, 'env': env,
+        'output_dir': output_dir,
+    }
+    return RemoteRunner(job, lambda on_line: BuildEngine(
+        source_dir, file_name, engine=engine, extra_args=extra_args,
+        timeout=timeout, max_passes=max_passes, on_line=on_line, env=env, output_dir=output_dir,
+    ))
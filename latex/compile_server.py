@@ -0,0 +1,183 @@
+"""
+Compile server process.
+Run as `python -m latex.compile_server` to own a pool of compile workers and a
+job queue. Jobs and results are exchanged as JSON lines over stdin/stdout, so
+several documents can build in parallel outside the editor process.
+
+Messages from the editor:
+    {"type": "compile", "id": ..., "job": {...}}   start a job
+    {"type": "cancel", "id": ...}                  kill a queued or running job
+Messages to the editor:
+    {"type": "line", "id": ..., "line": ...}       one line of TeX output
+    {"type": "result", "id": ..., ...}             final outcome with timing and artifacts
+
+A job is either {"kind": "run", "command": [...], "cwd": ..., "timeout": ...}
+for a single process, or {"kind": "build", "cwd": ..., "file_name": ...,
+"engine": ..., "extra_args": [...], "timeout": ..., "max_passes": ...,
+"output_dir": ...} for a multi-pass BuildEngine build. Either may carry an
+"env" mapping for the process.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 2
+
+# Files reported back to the editor after a job, by key
+ARTIFACT_EXTENSIONS = {'pdf': '.pdf', 'synctex': '.synctex.gz', 'log': '.log'}
+
+
+def encode_message(message):
+    """Serialize one protocol message as a single line."""
+    return json.dumps(message, ensure_ascii=False) + "\n"
+
+
+def job_artifacts(cwd, jobname):
+    """Return the paths of the outputs a job produced, by artifact key."""
+    artifacts = {}
+    for key, extension in ARTIFACT_EXTENSIONS.items():
+        path = os.path.join(cwd, jobname + extension)
+        if os.path.exists(path):
+            artifacts[key] = path
+    return artifacts
+
+
+class CompileServer:
+    """Dispatch compile jobs read from a stream to a pool of worker threads."""
+
+    def __init__(self, output_stream, max_workers=DEFAULT_WORKERS):
+        self._out = output_stream
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compile")
+        self._runners = {}
+        self._cancelled = set()  # ids of pending jobs cancelled before or while they run
+        self._pending = set()  # ids of jobs submitted and not yet finished
+        self._futures = set()  # submitted jobs that have not finished
+        self._lock = threading.Lock()
+
+    def serve(self, input_stream):
+        """Process messages until the input stream closes."""
+        for raw_line in input_stream:
+            raw_line = raw_line.strip()
+            if not raw_line:
+                continue
+            try:
+                message = json.loads(raw_line)
+            except ValueError:
+                continue
+            self.handle(message)
+        self.shutdown()
+
+    def handle(self, message):
+        kind = message.get('type')
+        job_id = message.get('id')
+        if kind == 'compile':
+            queued_at = time.time()
+            with self._lock:
+                self._pending.add(job_id)
+            future = self._executor.submit(self._run_job, job_id, message.get('job', {}), queued_at)
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._forget_future)
+        elif kind == 'cancel':
+            with self._lock:
+                # A cancel racing a job's completion must not leave its id behind
+                if job_id not in self._pending:
+                    return
+                self._cancelled.add(job_id)
+                runner = self._runners.get(job_id)
+            if runner:
+                runner.kill()
+
+    def shutdown(self, cancel=True):
+        """Stop the pool, killing running jobs unless `cancel` is False."""
+        if cancel:
+            # Executor.shutdown(cancel_futures=...) needs Python 3.9; queued jobs are cancelled here instead
+            with self._lock:
+                futures = list(self._futures)
+                runners = list(self._runners.values())
+            for future in futures:
+                future.cancel()
+            for runner in runners:
+                runner.kill()
+        self._executor.shutdown(wait=True)
+
+    def _forget_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _send(self, message):
+        with self._write_lock:
+            try:
+                self._out.write(encode_message(message))
+                self._out.flush()
+            except (OSError, ValueError):
+                pass  # the editor went away
+
+    def _create_runner(self, job, on_line):
+        if job.get('kind') == 'build':
+            from latex.build_engine import BuildEngine, DEFAULT_MAX_PASSES
+            return BuildEngine(
+                job['cwd'], job['file_name'],
+                engine=job.get('engine', 'pdflatex'),
+                extra_args=job.get('extra_args'),
+                timeout=job.get('timeout', 120),
+                max_passes=job.get('max_passes', DEFAULT_MAX_PASSES),
+                on_line=on_line,
+                env=job.get('env'),
+                output_dir=job.get('output_dir'),
+            )
+        from latex.process_runner import StreamingProcess
+        return StreamingProcess(job['command'], cwd=job.get('cwd'), on_line=on_line,
+                                timeout=job.get('timeout', 120), env=job.get('env'))
+
+    def _run_job(self, job_id, job, queued_at):
+        """Worker thread: run one job and report its result."""
+        started_at = time.time()
+        response = {'type': 'result', 'id': job_id, 'queued': started_at - queued_at}
+        try:
+            runner = self._create_runner(job, lambda line: self._send({'type': 'line', 'id': job_id, 'line': line}))
+            with self._lock:
+                self._runners[job_id] = runner
+                if job_id in self._cancelled:
+                    runner.kill()
+            result = runner.run()
+            response.update(
+                returncode=result.returncode,
+                duration=result.duration,
+                cancelled=result.cancelled,
+                timed_out=result.timed_out,
+                passes=getattr(result, 'passes', []),
+                up_to_date=getattr(result, 'up_to_date', False),
+            )
+            cwd = job.get('output_dir') or job.get('cwd') or os.getcwd()
+            jobname = os.path.splitext(job.get('file_name') or os.path.basename(job['command'][-1]))[0]
+            response['artifacts'] = job_artifacts(cwd, jobname)
+        except FileNotFoundError as e:
+            response.update(error='not_found', message=str(e))
+        except Exception as e:
+            response.update(error='failed', message=str(e))
+        finally:
+            with self._lock:
+                self._runners.pop(job_id, None)
+                self._cancelled.discard(job_id)
+                self._pending.discard(job_id)
+        response['elapsed'] = time.time() - started_at
+        self._send(response)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    workers = int(argv[0]) if argv else DEFAULT_WORKERS
+    # stdout carries the protocol; keep log output away from it
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    CompileServer(protocol_out, max_workers=max(1, workers)).serve(sys.stdin)
+
+
+if __name__ == '__main__':
+    main()
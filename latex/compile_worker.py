@@ -0,0 +1,176 @@
+"""
+Background worker for full LaTeX compilation.
+Run pdflatex off the Tk main thread and deliver streamed output, progress
+and the final result back to the main thread through root.after.
+"""
+
+import re
+import threading
+from collections import deque
+from latex.process_runner import StreamingProcess
+from latex_debug_system.stream_parser import StreamingLogParser
+from utils import logs_console
+
+# pdflatex prints "[<page>" when a page is shipped out
+_SHIPOUT_PATTERN = re.compile(r'\[(\d+)(?=[\]\s{<]|$)')
+
+# Banner printed at the start of every engine run ("This is pdfTeX, Version ...")
+_BANNER_PREFIX = "This is "
+
+# Interval between flushes of streamed output to the UI (ms)
+_DRAIN_INTERVAL_MS = 100
+
+
+class PageCounter:
+    """Track shipped-out pages from streamed pdflatex output."""
+
+    def __init__(self):
+        self.pages = 0
+
+    def feed(self, line):
+        """Consume one output line and return True if the page count changed."""
+        if line.startswith(_BANNER_PREFIX):
+            # a new pass of a multi-pass build starts counting from page 1 again
+            self.pages = 0
+            return True
+        advanced = False
+        for match in _SHIPOUT_PATTERN.finditer(line):
+            page = int(match.group(1))
+            # pages ship out sequentially, which filters out bracketed numbers in messages
+            if page == self.pages + 1:
+                self.pages = page
+                advanced = True
+        return advanced
+
+
+class CompileWorker:
+    """
+    Run one compile job at a time on a background thread.
+
+    Output lines are buffered by the worker thread and flushed to `on_output`
+    on the main thread at a fixed interval, so a chatty log cannot flood the
+    Tk event queue. All callbacks run on the main thread.
+    """
+
+    def __init__(self, root_widget):
+        self.root = root_widget
+        self._process = None
+        self._thread = None
+        self._pending_lines = deque()
+        self._page_counter = None
+        self._last_reported_pages = 0
+        self._log_parser = None
+        self._pending_errors = deque()
+        self._result = None
+        self._callbacks = {}
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, command, cwd, timeout=120, on_output=None, on_progress=None, on_complete=None, on_error=None):
+        """
+        Start a compile job.
+
+        Args:
+            command (list): Command line to execute.
+            cwd (str): Working directory for the process.
+            timeout (int): Seconds before the process is killed.
+            on_output (callable): Receives a list of new output lines.
+            on_progress (callable): Receives the number of pages shipped out so far.
+            on_complete (callable): Receives the ProcessResult, or an exception instance.
+            on_error (callable): Receives a list of new LaTeXErrors parsed from the output.
+
+        Returns:
+            bool: False if a job is already running.
+        """
+        return self.start_runner(StreamingProcess(command, cwd=cwd, timeout=timeout),
+                                 on_output, on_progress, on_complete, on_error)
+
+    def start_runner(self, runner, on_output=None, on_progress=None, on_complete=None, on_error=None,
+                     fatal_markers=()):
+        """
+        Start a job driven by a runner object such as a StreamingProcess or BuildEngine.
+
+        The runner must provide run(), kill() and an `on_line` attribute; the
+        callbacks behave as in `start`. Output is parsed as it streams and the
+        runner is killed as soon as a fatal error shows up; the result then has
+        `abort_reason` set instead of `cancelled`. `fatal_markers` adds the
+        engine's own (log prefix, reason) pairs to the fatal conditions.
+
+        Returns:
+            bool: False if a job is already running.
+        """
+        if self.is_running:
+            return False
+
+        self._pending_lines.clear()
+        self._page_counter = PageCounter()
+        self._last_reported_pages = 0
+        self._pending_errors.clear()
+        self._log_parser = StreamingLogParser(on_error=self._pending_errors.append, fatal_markers=fatal_markers)
+        self._result = None
+        self._callbacks = {
+            'output': on_output,
+            'progress': on_progress,
+            'complete': on_complete,
+            'error': on_error,
+        }
+        runner.on_line = self._on_line
+        self._process = runner
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(_DRAIN_INTERVAL_MS, self._drain)
+        return True
+
+    def cancel(self):
+        """Kill the running job. The completion callback still fires with cancelled=True."""
+        if self._process and self.is_running:
+            logs_console.log("Cancelling LaTeX compilation.", level='ACTION')
+            self._process.kill()
+
+    def _on_line(self, line):
+        """Worker thread: buffer a line and update the page counter."""
+        self._pending_lines.append(line)
+        self._page_counter.feed(line)
+        if self._log_parser.feed(line):
+            logs_console.log(f"Stopping compilation early: {self._log_parser.fatal_reason}", level='WARNING')
+            self._process.kill()
+
+    def _run(self):
+        """Worker thread: execute the process and store its outcome."""
+        try:
+            result = self._process.run()
+            self._log_parser.finish()
+            self._result = self._log_parser.aborted_result(result)
+        except Exception as e:
+            self._result = e
+
+    def _drain(self):
+        """Main thread: flush buffered output and deliver the result once finished."""
+        lines = []
+        while self._pending_lines:
+            lines.append(self._pending_lines.popleft())
+        if lines and self._callbacks.get('output'):
+            self._callbacks['output'](lines)
+
+        errors = []
+        while self._pending_errors:
+            errors.append(self._pending_errors.popleft())
+        if errors and self._callbacks.get('error'):
+            self._callbacks['error'](errors)
+
+        pages = self._page_counter.pages if self._page_counter else 0
+        if pages != self._last_reported_pages and self._callbacks.get('progress'):
+            self._last_reported_pages = pages
+            self._callbacks['progress'](pages)
+
+        if self.is_running or self._pending_lines or self._pending_errors:
+            self.root.after(_DRAIN_INTERVAL_MS, self._drain)
+            return
+
+        result = self._result
+        on_complete = self._callbacks.get('complete')
+        self._callbacks = {}
+        if on_complete:
+            on_complete(result)
@@ -2,7 +2,7 @@
 """
 This module provides functionalities for compiling LaTeX documents,
 cleaning auxiliary files, and displaying the generated PDF.
-It integrates with external command-line tools like `pdflatex`.
+It integrates with external command-line tools like `pdflatex`, `xelatex` and `lualatex`.
 """
 
 import subprocess
@@ -12,8 +12,14 @@ import tkinter as tk
 from tkinter import messagebox
 import shutil # import shutil for file operations
 import difflib # import difflib for diffing
+import hashlib
+import tempfile
 from utils import logs_console
 from latex import error_parser
+from latex.compile_worker import CompileWorker
+from latex.compile_client import create_build
+from latex.engines import DEFAULT_ENGINE, select_engine
+from latex.project_graph import get_project_graph, write_overlay, overlay_environment
 
 
 # global reference to the root tkinter window, initialized during application setup
@@ -22,6 +28,8 @@ get_current_tab = None
 show_console = None
 hide_console = None
 _pdf_monitor_setting = "Default" # default value
+_compile_worker = None # background worker for full compilation, created on first use
+BUILD_TIMEOUT = 300 # seconds allowed for all passes of a full build
 
 def initialize_compiler(root_widget, get_current_tab_func, show_console_func, hide_console_func, pdf_monitor_setting="Default"):
     """
@@ -63,7 +71,7 @@ def clean_project_directory(event=None):
         # list of common latex auxiliary file extensions to be deleted
         extensions_to_delete = [
             '.aux', '.log', '.toc', '.bbl', '.bcf', '.blg', '.lof', '.lot', 
-            '.out', '.run.xml', '.synctex.gz', '.fls', '.fdb_latexmk', '.nav', '.snm', '.vrb', '.dvi', '.ps'
+            '.out', '.run.xml', '.synctex.gz', '.fls', '.fdb_latexmk', '.fdb_noctern', '.nav', '.snm', '.vrb', '.dvi', '.ps'
         ]
         
         files_deleted_count = 0
@@ -98,11 +106,14 @@ def clean_project_directory(event=None):
 
 def compile_latex(event=None):
     """
-    Compiles the current LaTeX document into a PDF using `pdflatex`.
+    Compiles the current LaTeX document into a PDF with the document's TeX engine.
 
     The content of the active editor tab is saved to a .tex file (either its original path
-    or a temporary file), and `pdflatex` is executed. Upon successful compilation, a success
-    message is shown. Compilation errors are shown in a log window.
+    or a temporary file), and a multi-pass build is started on a background compile worker so
+    the editor stays responsive. The engine comes from a `% !TEX program = ...` magic comment,
+    the document's engine settings or its packages, and falls back to the `latex_engine` setting.
+    The build engine reruns TeX and bibtex/biber only as often as references and citations require. Output is streamed to the debug panel while it runs, and the
+    result is handled on the main thread once the process exits.
 
     Args:
         event (tk.Event, optional): The Tkinter event object, if called from a binding. Defaults to None.
@@ -112,6 +123,11 @@ def compile_latex(event=None):
     if not current_tab:
         logs_console.log("LaTeX compilation aborted: No active editor tab.", level='WARNING')
         return
+
+    worker = _get_compile_worker()
+    if worker.is_running:
+        logs_console.log("LaTeX compilation already running; request ignored.", level='INFO')
+        return
     
     editor_content = current_tab.editor.get("1.0", tk.END)
     temp_file_created = False
@@ -146,22 +162,173 @@ def compile_latex(event=None):
             logs_console.log(f"Error saving temporary file for compilation: {e}", level='ERROR')
             return
 
+    # a chapter of a larger project builds its root document instead
+    build_env = None
+    if current_tab.file_path:
+        root_path, build_env = _prepare_project_build(current_tab.file_path)
+        if root_path != os.path.abspath(current_tab.file_path):
+            logs_console.log(f"'{file_name}' is part of '{root_path}'; building the root document.", level='INFO')
+            source_directory = os.path.dirname(root_path)
+            file_name = os.path.basename(root_path)
+            tex_file_path = root_path
+            editor_content = get_project_graph().read(root_path) or ""
+
+    selection = select_engine(editor_content, tex_file_path, default=_get_setting('latex_engine', DEFAULT_ENGINE))
+    engine = selection.build.name
+    if selection.source != 'default':
+        logs_console.log(f"Using {engine} for {file_name} (from {selection.source}).", level='INFO')
+
+    job = {
+        'source_directory': source_directory,
+        'file_name': file_name,
+        'tex_file_path': tex_file_path,
+        'temp_file_created': temp_file_created,
+        'editor_content': editor_content,
+        'file_path': tex_file_path,
+        'engine': engine,
+    }
+
+    # build the document in the source directory
+    build = create_build(source_directory, file_name, engine=engine, timeout=BUILD_TIMEOUT, env=build_env)
+    logs_console.log(f"Starting {engine} build of {file_name} in directory: {source_directory}", level='DEBUG')
+
+    debug_coordinator = _get_debug_coordinator()
+    if debug_coordinator:
+        debug_coordinator.begin_compilation(file_name, on_cancel=cancel_compilation)
+
+    worker.start_runner(
+        build,
+        on_output=_on_compilation_output,
+        on_progress=_on_compilation_progress,
+        on_complete=lambda result: _on_compilation_complete(result, job),
+        on_error=_on_compilation_errors,
+        fatal_markers=selection.build.fatal_markers,
+    )
+
+def _prepare_project_build(file_path):
+    """
+    Resolve the root document of a file and expose unsaved project buffers to TeX.
+
+    Open tabs with unsaved edits are written to an overlay directory that is
+    searched before the project directory, so the build sees the editor text
+    without saving the files.
+
+    Returns:
+        tuple: (root document path, process environment or None when no overlay is needed)
+    """
+    graph = get_project_graph()
+    try:
+        from app import state
+        graph.sync_buffers(state.get_open_buffers())
+    except ImportError:
+        pass
+    root_path = graph.find_root(file_path)
+
+    # the active tab was just saved, so only the other buffers need an overlay
+    saved = os.path.relpath(os.path.abspath(file_path), os.path.dirname(root_path))
+    snapshots = {name: text for name, text in graph.unsaved_snapshots(root_path).items() if name != saved}
+    overlay_directory = os.path.join(tempfile.gettempdir(), "noctern_overlays",
+                                     hashlib.sha1(root_path.encode('utf-8')).hexdigest()[:12])
+    if not snapshots and not os.path.isdir(overlay_directory):
+        return root_path, None
+    try:
+        write_overlay(overlay_directory, snapshots)
+    except OSError as e:
+        logs_console.log(f"Could not write unsaved buffers for compilation: {e}", level='WARNING')
+        return root_path, None
+    if snapshots:
+        logs_console.log(f"Compiling unsaved buffers from memory: {', '.join(sorted(snapshots))}", level='INFO')
+    return root_path, overlay_environment(overlay_directory)
+
+def _get_setting(key, default):
+    """Get a compilation setting from the application config."""
+    try:
+        from app import state
+        return state.get_app_config().get(key, default)
+    except (ImportError, AttributeError):
+        return default
+
+def cancel_compilation(event=None):
+    """Cancel the running full compilation, if any."""
+    if _compile_worker:
+        _compile_worker.cancel()
+
+def _get_compile_worker():
+    """Return the module compile worker, creating it on first use."""
+    global _compile_worker
+    if _compile_worker is None:
+        _compile_worker = CompileWorker(root)
+    return _compile_worker
+
+def _get_debug_coordinator():
+    """Return the debug coordinator if the debug system is available."""
+    try:
+        from app import state
+        return getattr(state, 'debug_coordinator', None)
+    except ImportError:
+        return None
+
+def _on_compilation_output(lines):
+    """Forward streamed TeX output to the debug panel."""
+    debug_coordinator = _get_debug_coordinator()
+    if debug_coordinator:
+        debug_coordinator.append_compilation_output(lines)
+
+def _on_compilation_progress(pages):
+    """Show the live page counter in the debug panel."""
+    debug_coordinator = _get_debug_coordinator()
+    if debug_coordinator:
+        debug_coordinator.update_compilation_progress(f"Compiling... {pages} page{'s' if pages != 1 else ''} written")
+
+def _on_compilation_errors(errors):
+    """Show errors in the debug panel while the compilation is still running."""
+    debug_coordinator = _get_debug_coordinator()
+    if debug_coordinator:
+        debug_coordinator.report_streamed_errors(errors)
+
+def _on_compilation_complete(result, job):
+    """
+    Handle the outcome of a background compilation on the main thread.
+
+    Args:
+        result: ProcessResult from the worker, or the exception raised while starting it.
+        job (dict): Paths and content captured when the compilation was started.
+    """
+    source_directory = job['source_directory']
+    file_name = job['file_name']
+    tex_file_path = job['tex_file_path']
+    editor_content = job['editor_content']
+
+    debug_coordinator = _get_debug_coordinator()
+    if debug_coordinator:
+        debug_coordinator.end_compilation()
+
     # Setup for caching successful compilation
     tex_base_name = os.path.splitext(file_name)[0]
     cache_directory = os.path.join(source_directory, f"{tex_base_name}.cache")
     os.makedirs(cache_directory, exist_ok=True)
     cached_tex_path = os.path.join(cache_directory, f"{tex_base_name}_last_successful.tex")
 
-    # compile directly in source directory
     try:
-        # execute pdflatex command in the source directory
-        command = ["pdflatex", "-interaction=nonstopmode", file_name]
-        logs_console.log(f"Executing pdflatex command: {' '.join(command)} in directory: {source_directory}", level='DEBUG')
-        result = subprocess.run(command, cwd=source_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120, check=False)
-        
-        # path to log file and pdf in source directory
+        if isinstance(result, FileNotFoundError):
+            engine = job.get('engine', DEFAULT_ENGINE)
+            messagebox.showerror("Error", f"`{engine}` command not found. Please ensure LaTeX is installed and in your system's PATH.")
+            logs_console.log(f"{engine} command not found.", level='ERROR')
+            return
+        if isinstance(result, Exception):
+            raise result
+        if result.cancelled:
+            logs_console.log("LaTeX compilation cancelled by user.", level='INFO')
+            if debug_coordinator:
+                debug_coordinator.update_compilation_progress("Compilation cancelled")
+            return
+        if result.timed_out:
+            messagebox.showerror("Error", f"LaTeX compilation timed out (exceeded {BUILD_TIMEOUT} seconds).")
+            logs_console.log("LaTeX compilation timed out.", level='ERROR')
+            return
+
+        # path to log file in source directory
         log_file_path = os.path.join(source_directory, file_name.replace(".tex", ".log"))
-        pdf_output_path = os.path.join(source_directory, file_name.replace(".tex", ".pdf"))
 
         # get log content for both success and failure cases
         log_content = ""
@@ -171,18 +338,26 @@ def compile_latex(event=None):
         except FileNotFoundError:
             logs_console.log("Log file not found, proceeding with empty log.", level='WARNING')
 
+        if result.abort_reason:
+            # the log file of a killed run may not be flushed; the streamed output holds the errors
+            logs_console.log(f"LaTeX compilation stopped early: {result.abort_reason}", level='ERROR')
+            log_content = result.output
+
         if result.returncode == 0:
             messagebox.showinfo("✅ Compilation Successful", "LaTeX document compiled successfully to PDF.")
-            logs_console.log("LaTeX compilation successful.", level='SUCCESS')
+            if getattr(result, 'up_to_date', False):
+                logs_console.log("LaTeX document already up to date; no pass needed.", level='SUCCESS')
+            else:
+                passes = getattr(result, 'passes', [])
+                logs_console.log(f"LaTeX compilation successful in {result.duration:.1f}s ({len(passes)} step(s): {'; '.join(passes)}).", level='SUCCESS')
             
             # store successful version in the new debug system
             try:
-                from app import state
-                if hasattr(state, 'debug_coordinator') and state.debug_coordinator:
-                    state.debug_coordinator.handle_compilation_result(
+                if debug_coordinator:
+                    debug_coordinator.handle_compilation_result(
                         success=True,
                         log_content=log_content,
-                        file_path=current_tab.file_path or tex_file_path,
+                        file_path=job['file_path'],
                         current_content=editor_content
                     )
                     logs_console.log("Compilation result handled by debug system", level='INFO')
@@ -203,12 +378,11 @@ def compile_latex(event=None):
             
             # handle compilation failure with new debug system
             try:
-                from app import state
-                if hasattr(state, 'debug_coordinator') and state.debug_coordinator:
-                    state.debug_coordinator.handle_compilation_result(
+                if debug_coordinator:
+                    debug_coordinator.handle_compilation_result(
                         success=False,
                         log_content=log_content,
-                        file_path=current_tab.file_path or tex_file_path,
+                        file_path=job['file_path'],
                         current_content=editor_content
                     )
                     logs_console.log("Compilation errors handled by TeXstudio debug system", level='INFO')
@@ -226,18 +400,12 @@ def compile_latex(event=None):
                 except Exception as e2:
                     logs_console.log(f"Error in fallback error display: {e2}", level='ERROR')
                     show_console(f"Error processing compilation log: {e2}")
-    except FileNotFoundError:
-        messagebox.showerror("Error", "`pdflatex` command not found. Please ensure LaTeX is installed and in your system's PATH.")
-        logs_console.log("pdflatex command not found.", level='ERROR')
-    except subprocess.TimeoutExpired:
-        messagebox.showerror("Error", "LaTeX compilation timed out (exceeded 120 seconds).")
-        logs_console.log("LaTeX compilation timed out.", level='ERROR')
     except Exception as e:
         messagebox.showerror("Compilation Error", f"An unexpected error occurred during compilation: {e}")
         logs_console.log(f"Unexpected error during LaTeX compilation: {e}", level='ERROR')
     finally:
         # clean up the temporary .tex file if one was created
-        if temp_file_created and os.path.exists(tex_file_path):
+        if job['temp_file_created'] and os.path.exists(tex_file_path):
              try:
                  os.remove(tex_file_path)
                  logs_console.log(f"Removed temporary compilation file: {tex_file_path}", level='DEBUG')
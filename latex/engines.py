@@ -0,0 +1,244 @@
+"""
+TeX engine profiles and per-document engine selection.
+A document picks its engine with a `% !TEX program = xelatex` magic comment, its
+per-document settings or the packages it loads; the configured default is used
+otherwise. Each profile knows the engine's flags, its log quirks and how the
+live preview may trade fidelity for speed.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+from utils import logs_console
+
+DEFAULT_ENGINE = "pdflatex"
+
+# Preview engine policies: the document's own engine, or the fastest one able to compile it
+PREVIEW_SAME, PREVIEW_FASTEST = "same", "fastest"
+
+# Run before the document so graphicx draws image frames instead of loading images;
+# set at \begin{document} so it also applies when the preamble comes from a format
+DRAFT_GRAPHICS_CODE = "\\AtBeginDocument{\\ifdefined\\setkeys\\setkeys{Gin}{draft}\\fi}"
+
+# Lines searched for magic comments at the top of a document
+_MAGIC_COMMENT_LINES = 20
+
+_MAGIC_PROGRAM = re.compile(r'^\s*%\s*!\s*TeX\s+(?:TS-)?program\s*=\s*([A-Za-z0-9_-]+)', re.IGNORECASE)
+_PACKAGE = re.compile(r'\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}')
+_LUA_PRIMITIVE = re.compile(r'\\(?:directlua|luaexec|luadirect)\b')
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    Command-line and behaviour differences of one TeX engine.
+
+    `speed_rank` orders engines by typical compile time (lower is faster).
+    `supports_formats` tells whether a dumped preamble format can be reused;
+    LuaTeX formats do not keep Lua state, so lualatex always loads the preamble.
+    `fatal_markers` are extra (log prefix, reason) pairs that end a run early.
+    """
+    name: str
+    draft_flag: Optional[str]
+    unicode: bool
+    speed_rank: int
+    supports_formats: bool
+    fatal_markers: tuple = ()
+
+    @property
+    def executable(self):
+        return self.name
+
+    def command(self, file_name, draft=False, synctex=False, format_base=None, extra_args=(),
+                preamble_code=None):
+        """
+        Build the engine command line for one pass.
+
+        Args:
+            file_name (str): Main .tex file, relative to the working directory.
+            draft (bool): Skip writing the PDF, when the engine can.
+            synctex (bool): Write SyncTeX data for source/PDF navigation.
+            format_base (str, optional): Precompiled format to load instead of LaTeX's.
+            extra_args (iterable): Flags placed before the input file.
+            preamble_code (str, optional): TeX code run before the file is read; the
+                job name stays the file's own.
+        """
+        command = [self.executable, "-interaction=nonstopmode"]
+        if draft and self.draft_flag:
+            command.append(self.draft_flag)
+        if synctex:
+            command.append("-synctex=1")
+        if format_base:
+            command.append(f"-fmt={format_base}")
+        command.extend(extra_args)
+        if preamble_code:
+            command.append(f"-jobname={os.path.splitext(file_name)[0]}")
+            command.append(f"{preamble_code}\\input{{{file_name}}}")
+        else:
+            command.append(file_name)
+        return command
+
+
+ENGINES = {
+    'pdflatex': EngineProfile(
+        'pdflatex', draft_flag='-draftmode', unicode=False, speed_rank=0, supports_formats=True,
+        fatal_markers=(
+            ('! Fatal Package fontspec Error', "fontspec needs xelatex or lualatex; add '% !TEX program = xelatex'"),
+            ('! Package unicode-math Error: Cannot be run with pdfLaTeX', "unicode-math needs xelatex or lualatex"),
+        ),
+    ),
+    'xelatex': EngineProfile('xelatex', draft_flag='-no-pdf', unicode=True, speed_rank=1, supports_formats=True),
+    'lualatex': EngineProfile(
+        'lualatex', draft_flag='--draftmode', unicode=True, speed_rank=2, supports_formats=False,
+        fatal_markers=(('! LuaTeX error', "LuaTeX error"),),
+    ),
+}
+
+# Names accepted in magic comments and settings
+_ALIASES = {
+    'pdftex': 'pdflatex', 'latex': 'pdflatex',
+    'xetex': 'xelatex',
+    'luatex': 'lualatex', 'luahbtex': 'lualatex', 'lualatex-dev': 'lualatex',
+}
+
+# Packages that only work with a Unicode engine, and those that need LuaTeX itself
+_UNICODE_PACKAGES = {'fontspec', 'unicode-math', 'polyglossia', 'xunicode', 'xltxtra', 'mathspec'}
+_LUA_PACKAGES = {'luacode', 'luatexja', 'luatexja-fontspec', 'luaotfload', 'lua-visual-debug', 'luamplib'}
+
+
+def normalize_engine_name(name):
+    """Map a program name from a magic comment or setting to a known engine, or None."""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = _ALIASES.get(name, name)
+    return name if name in ENGINES else None
+
+
+def get_engine(name):
+    """
+    Return the profile of an engine.
+
+    Only known engines are ever run: a document could otherwise name any program
+    on the PATH. Unknown names fall back to the default engine with a warning.
+    """
+    known = normalize_engine_name(name)
+    if known:
+        return ENGINES[known]
+    if name:
+        logs_console.log(f"Unknown TeX engine '{name}'; using {DEFAULT_ENGINE}", level='WARNING')
+    return ENGINES[DEFAULT_ENGINE]
+
+
+def read_magic_program(content):
+    """Return the program named by a `% !TEX program = ...` comment at the top of a document."""
+    for line in (content or "").split('\n', _MAGIC_COMMENT_LINES)[:_MAGIC_COMMENT_LINES]:
+        match = _MAGIC_PROGRAM.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+
+def detect_required_engine(content):
+    """
+    Guess the engine a document's packages require.
+
+    Returns:
+        str: 'lualatex' for Lua-only packages, 'xelatex' for packages that need any
+        Unicode engine, or None when pdflatex can compile the preamble.
+    """
+    packages = set()
+    for match in _PACKAGE.finditer(content or ""):
+        packages.update(name.strip() for name in match.group(1).split(','))
+    if packages & _LUA_PACKAGES or _LUA_PRIMITIVE.search(content or ""):
+        return 'lualatex'
+    if packages & _UNICODE_PACKAGES:
+        return 'xelatex'
+    return None
+
+
+def _settings_path(tex_path):
+    base_name, _ = os.path.splitext(tex_path)
+    return os.path.join(f"{base_name}.cache", "engine.json")
+
+
+def load_document_settings(tex_path):
+    """Read the engine settings stored in a document's `.cache` directory."""
+    if not tex_path:
+        return {}
+    try:
+        with open(_settings_path(tex_path), 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        return settings if isinstance(settings, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_document_settings(tex_path, settings):
+    """
+    Store engine settings for one document.
+
+    Keys: 'program' (engine of the final build), 'preview_program' (engine of the
+    live preview) and 'preview_draft' (compile previews with draft images).
+    """
+    path = _settings_path(tex_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=4)
+    except OSError as e:
+        logs_console.log(f"Could not save engine settings for {os.path.basename(tex_path)}: {e}", level='WARNING')
+
+
+@dataclass(frozen=True)
+class EngineSelection:
+    """Engines chosen for one document and where the choice came from."""
+    build: EngineProfile
+    preview: EngineProfile
+    source: str  # 'magic comment', 'document settings', 'packages' or 'default'
+    preview_draft: bool = False
+
+
+def select_engine(content, tex_path=None, default=DEFAULT_ENGINE, preview_policy=PREVIEW_SAME,
+                  preview_draft=False):
+    """
+    Choose the build and preview engines of a document.
+
+    The build engine comes from, in order: the magic comment, the document
+    settings, the packages the document loads, and `default`. The preview uses
+    the same engine unless the document settings name one, or `preview_policy`
+    is 'fastest', in which case it uses the fastest engine its packages allow.
+    """
+    settings = load_document_settings(tex_path)
+    required = detect_required_engine(content)
+
+    build_name, source = None, 'default'
+    magic = read_magic_program(content)
+    if magic and not normalize_engine_name(magic):
+        logs_console.log(f"Unknown TeX program '{magic}' in magic comment; ignoring it", level='WARNING')
+        magic = None
+    if magic:
+        build_name, source = magic, 'magic comment'
+    elif normalize_engine_name(settings.get('program')):
+        build_name, source = settings['program'], 'document settings'
+    elif required:
+        build_name, source = required, 'packages'
+    build = get_engine(build_name or default)
+
+    preview = build
+    preview_name = normalize_engine_name(settings.get('preview_program'))
+    if preview_name:
+        preview = ENGINES[preview_name]
+    elif preview_policy == PREVIEW_FASTEST:
+        candidates = [profile for profile in ENGINES.values() if profile.speed_rank <= build.speed_rank]
+        if required == 'lualatex':
+            candidates = [ENGINES['lualatex']]
+        elif required:
+            candidates = [profile for profile in candidates if profile.unicode]
+        preview = min(candidates, key=lambda profile: profile.speed_rank) if candidates else build
+
+    draft = settings.get('preview_draft')
+    return EngineSelection(build, preview, source, bool(preview_draft if draft is None else draft))
+
@@ -0,0 +1,114 @@
+"""
+Run TeX processes with line-by-line output streaming.
+Provide cancellation and timeout handling that work from any thread.
+"""
+
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a streamed process run."""
+    returncode: int
+    output: str
+    duration: float
+    cancelled: bool = False
+    timed_out: bool = False
+    abort_reason: str = ""  # set when the run was stopped because of a fatal error
+
+
+class StreamingProcess:
+    """
+    Launch a command and forward each output line to a callback as it arrives.
+
+    The process can be killed from another thread with `kill()`; a timeout kills
+    it the same way. Stderr is merged into stdout since TeX writes diagnostics there.
+    """
+
+    def __init__(self, command, cwd=None, on_line=None, timeout=120, env=None):
+        self.command = list(command)
+        self.cwd = cwd
+        self.on_line = on_line
+        self.timeout = timeout
+        self.env = env
+        self._process = None
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._timed_out = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def is_running(self):
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def run(self):
+        """
+        Run the command to completion in the calling thread.
+
+        Raises:
+            FileNotFoundError: If the executable does not exist.
+        """
+        start_time = time.time()
+        with self._lock:
+            if self._cancelled:
+                return ProcessResult(returncode=-1, output="", duration=0.0, cancelled=True)
+            self._process = subprocess.Popen(
+                self.command,
+                cwd=self.cwd,
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+
+        timer = None
+        if self.timeout:
+            timer = threading.Timer(self.timeout, self._on_timeout)
+            timer.daemon = True
+            timer.start()
+
+        output_lines = []
+        try:
+            for raw_line in iter(self._process.stdout.readline, b""):
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+                output_lines.append(line)
+                if self.on_line:
+                    self.on_line(line)
+            self._process.stdout.close()
+            returncode = self._process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+
+        return ProcessResult(
+            returncode=returncode,
+            output="\n".join(output_lines),
+            duration=time.time() - start_time,
+            cancelled=self._cancelled,
+            timed_out=self._timed_out,
+        )
+
+    def kill(self):
+        """Cancel the run, killing the process if it has started."""
+        with self._lock:
+            self._cancelled = True
+            self._terminate()
+
+    def _on_timeout(self):
+        with self._lock:
+            self._timed_out = True
+            self._terminate()
+
+    def _terminate(self):
+        if self._process and self._process.poll() is None:
+            try:
+                self._process.kill()
+            except OSError:
+                pass
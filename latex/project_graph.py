@@ -0,0 +1,405 @@
+"""
+Multi-file LaTeX project model.
+Track \\input, \\include, \\subfile, bibliography and graphics dependencies
+between files, find the root document of any file, and know which files have
+unsaved edits so a project can be compiled from in-memory snapshots.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+# Dependency kinds, by the commands that create them
+_COMMAND_KINDS = {
+    'input': 'input',
+    'include': 'include',
+    'subfile': 'subfile',
+    'bibliography': 'bibliography',
+    'addbibresource': 'bibliography',
+    'includegraphics': 'graphics',
+}
+_DEPENDENCY = re.compile(
+    r'\\(input|include|subfile|bibliography|addbibresource|includegraphics)\*?\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}'
+)
+_DOCUMENTCLASS = re.compile(r'^[^%\n]*\\documentclass\s*(?:\[([^\]]*)\])?\s*\{([^}]*)\}', re.MULTILINE)
+_MAGIC_ROOT = re.compile(r'^\s*%\s*!\s*tex\s+root\s*=\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Extensions tried for each dependency kind when the name has none
+_DEFAULT_EXTENSIONS = {
+    'input': ('.tex',),
+    'include': ('.tex',),
+    'subfile': ('.tex',),
+    'bibliography': ('.bib',),
+    'graphics': ('.pdf', '.png', '.jpg', '.jpeg', '.eps'),
+}
+SOURCE_KINDS = frozenset(('input', 'include', 'subfile'))
+
+# Magic root comments are only honoured near the top of a file
+_MAGIC_ROOT_SCAN_CHARS = 2000
+# Parent directories searched for the root of a file that nothing includes yet
+_ROOT_SEARCH_DEPTH = 2
+
+
+@dataclass(frozen=True)
+class Dependency:
+    """A file referenced from a LaTeX source."""
+    kind: str  # 'input', 'include', 'subfile', 'bibliography' or 'graphics'
+    name: str  # as written in the source
+    line: int  # 1-based
+
+
+def _strip_comment(line):
+    index = line.find('%')
+    while index != -1:
+        if index == 0 or line[index - 1] != '\\':
+            return line[:index]
+        index = line.find('%', index + 1)
+    return line
+
+
+def parse_dependencies(content):
+    """
+    Extract the files a LaTeX source pulls in.
+
+    Returns:
+        list: Dependency entries in source order; bibliography lists are split.
+    """
+    dependencies = []
+    for line_number, line in enumerate(content.split('\n'), start=1):
+        if '\\' not in line:
+            continue
+        for command, argument in _DEPENDENCY.findall(_strip_comment(line)):
+            kind = _COMMAND_KINDS[command]
+            names = argument.split(',') if kind == 'bibliography' else [argument]
+            for name in names:
+                name = name.strip()
+                if name:
+                    dependencies.append(Dependency(kind, name, line_number))
+    return dependencies
+
+
+def resolve_dependency(dependency, base_dir):
+    """Return the absolute path a dependency refers to, relative to the compile directory."""
+    path = os.path.normpath(os.path.join(base_dir, os.path.expanduser(dependency.name)))
+    if os.path.splitext(path)[1] and os.path.isfile(path):
+        return path
+    extensions = _DEFAULT_EXTENSIONS.get(dependency.kind, ())
+    for extension in extensions:
+        if os.path.isfile(path + extension):
+            return path + extension
+    # Missing file: report the name TeX would look for first
+    return path if os.path.splitext(path)[1] or not extensions else path + extensions[0]
+
+
+class _FileNode:
+    """Parsed state of one file, from an open buffer or from disk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.digest = None
+        self.dependencies = []
+        self.documentclass = None  # (options, class name) when the file is a document
+        self.magic_root = None
+        self.disk_mtime = None  # mtime of the disk version that was parsed
+
+    def parse(self, content):
+        digest = hashlib.sha1(content.encode('utf-8', errors='ignore')).hexdigest()
+        if digest == self.digest:
+            return False
+        self.digest = digest
+        self.dependencies = parse_dependencies(content)
+        match = _DOCUMENTCLASS.search(content)
+        self.documentclass = (match.group(1) or '', match.group(2).strip()) if match else None
+        match = _MAGIC_ROOT.search(content[:_MAGIC_ROOT_SCAN_CHARS])
+        self.magic_root = match.group(1) if match else None
+        return True
+
+
+class ProjectGraph:
+    """
+    Dependency graph of the LaTeX files the editor has seen.
+
+    Open buffers take precedence over the files on disk. Each update re-parses
+    only the file that changed; files on disk are parsed once and again only
+    when their modification time changes.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._buffers = {}  # path -> (content, dirty)
+        self._scanned_dirs = set()
+        self._version = 0
+        self._closures = {}  # root -> (version, files)
+        self._lock = threading.RLock()
+
+    # Open buffers
+
+    def update_buffer(self, path, content, dirty=True):
+        """Record the current text of an open editor buffer."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._buffers[path] = (content, dirty)
+            node = self._nodes.get(path) or self._nodes.setdefault(path, _FileNode(path))
+            if node.parse(content):
+                self._version += 1
+
+    def close_buffer(self, path):
+        """Forget an editor buffer; the file is read from disk again."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if self._buffers.pop(path, None) is not None:
+                node = self._nodes.get(path)
+                if node:
+                    node.digest = node.disk_mtime = None
+                self._version += 1
+
+    def sync_buffers(self, buffers):
+        """Update all open buffers at once from a {path: (content, dirty)} mapping."""
+        buffers = {os.path.abspath(path): value for path, value in buffers.items()}
+        with self._lock:
+            for path in list(self._buffers):
+                if path not in buffers:
+                    self.close_buffer(path)
+            for path, (content, dirty) in buffers.items():
+                self.update_buffer(path, content, dirty)
+
+    # Queries
+
+    def dependencies(self, path):
+        """Return the Dependency entries of a file."""
+        with self._lock:
+            node = self._load(os.path.abspath(path))
+            return list(node.dependencies) if node else []
+
+    def find_root(self, path):
+        """
+        Find the document a file belongs to.
+
+        A `% !TeX root = ...` comment wins, then a `\\documentclass[main]{subfiles}`
+        declaration; a file with its own \\documentclass is a root. Otherwise the
+        first document in the file's directory or its parents that includes the
+        file is used. Returns the file itself when no including document is found.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            seen = set()
+            while path not in seen:
+                seen.add(path)
+                node = self._load(path)
+                if node is None:
+                    return path
+                directory = os.path.dirname(path)
+                if node.magic_root:
+                    path = os.path.normpath(os.path.join(directory, node.magic_root))
+                    continue
+                if node.documentclass:
+                    options, document_class = node.documentclass
+                    if document_class == 'subfiles' and options:
+                        main = options.strip()
+                        path = os.path.normpath(os.path.join(directory, main if main.endswith('.tex') else main + '.tex'))
+                        continue
+                    return path
+                parent_root = self._find_including_root(path)
+                return parent_root or path
+            return path
+
+    def project_files(self, root, kinds=None):
+        """
+        List the files reachable from a root document, the root first.
+
+        Args:
+            root (str): Root document path.
+            kinds (set, optional): Dependency kinds to include; sources and all
+                other kinds by default.
+        """
+        root = os.path.abspath(root)
+        with self._lock:
+            files = self._closure(root)
+        if kinds is None:
+            return [path for path, _ in files]
+        return [path for path, kind in files if kind in kinds]
+
+    def file_state(self, path):
+        """Return 'unsaved', 'modified on disk' or 'clean' for a project file."""
+        path = os.path.abspath(path)
+        with self._lock:
+            buffer = self._buffers.get(path)
+            if buffer is not None:
+                return 'unsaved' if buffer[1] else 'clean'
+            node = self._nodes.get(path)
+        if node and node.disk_mtime is not None and _mtime(path) != node.disk_mtime:
+            return 'modified on disk'
+        return 'clean'
+
+    def dirty_files(self, root):
+        """Map each project file that is not clean to its state."""
+        states = {}
+        for path in self.project_files(root):
+            state = self.file_state(path)
+            if state != 'clean':
+                states[path] = state
+        return states
+
+    def unsaved_snapshots(self, root):
+        """
+        Return the text of open buffers with unsaved edits in a project.
+
+        Returns:
+            dict: Path relative to the root's directory -> buffer content, for
+            files inside that directory.
+        """
+        root = os.path.abspath(root)
+        base_dir = os.path.dirname(root)
+        snapshots = {}
+        with self._lock:
+            for path in self.project_files(root):
+                buffer = self._buffers.get(path)
+                relative = os.path.relpath(path, base_dir)
+                # Files outside the project directory cannot be shadowed by an overlay
+                if buffer is not None and buffer[1] and not relative.startswith(os.pardir):
+                    snapshots[relative] = buffer[0]
+        return snapshots
+
+    def read(self, path):
+        """Return a file's text, from its open buffer when there is one."""
+        path = os.path.abspath(path)
+        with self._lock:
+            buffer = self._buffers.get(path)
+        if buffer is not None:
+            return buffer[0]
+        return _read_text(path)
+
+    # Internals
+
+    def _load(self, path):
+        """Return the node of a file, parsing it from disk when needed."""
+        node = self._nodes.get(path)
+        if path in self._buffers:
+            return node
+        mtime = _mtime(path)
+        if mtime is None:
+            return None
+        if node is None or node.disk_mtime != mtime:
+            content = _read_text(path)
+            if content is None:
+                return None
+            node = node or self._nodes.setdefault(path, _FileNode(path))
+            node.disk_mtime = mtime
+            if node.parse(content):
+                self._version += 1
+        return node
+
+    def _closure(self, root):
+        cached = self._closures.get(root)
+        if cached and cached[0] == self._version:
+            return cached[1]
+        base_dir = os.path.dirname(root)
+        files, seen, stack = [], {root}, [(root, 'root')]
+        while stack:
+            path, kind = stack.pop()
+            files.append((path, kind))
+            node = self._load(path) if kind == 'root' or kind in SOURCE_KINDS else None
+            if node is None:
+                continue
+            # \subfile paths are relative to the including file; others to the compile directory
+            children = []
+            for dependency in node.dependencies:
+                directory = os.path.dirname(path) if dependency.kind == 'subfile' else base_dir
+                target = resolve_dependency(dependency, directory)
+                if target not in seen:
+                    seen.add(target)
+                    children.append((target, dependency.kind))
+            stack.extend(reversed(children))
+        self._closures[root] = (self._version, files)
+        return files
+
+    def _find_including_root(self, path):
+        """Search nearby documents for one whose project contains `path`."""
+        directory = os.path.dirname(path)
+        candidates = []
+        for _ in range(_ROOT_SEARCH_DEPTH + 1):
+            self._discover(directory)
+            candidates.append(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        for directory in candidates:
+            for candidate, node in sorted(self._nodes.items()):
+                if os.path.dirname(candidate) != directory or candidate == path:
+                    continue
+                if node.documentclass and node.documentclass[1] != 'subfiles' \
+                        and path in self.project_files(candidate, SOURCE_KINDS):
+                    return candidate
+        return None
+
+    def _discover(self, directory):
+        """Parse the .tex files of a directory once, so their includes are known."""
+        if directory in self._scanned_dirs:
+            return
+        self._scanned_dirs.add(directory)
+        for candidate in glob.glob(os.path.join(glob.escape(directory), '*.tex')):
+            self._load(os.path.abspath(candidate))
+
+
+_OVERLAY_MANIFEST = ".noctern_overlay"
+
+
+def write_overlay(directory, snapshots):
+    """
+    Write buffer snapshots into an overlay directory, mirroring project paths.
+
+    Files written by the previous call are removed first, so a buffer that was
+    saved or closed no longer shadows the file on disk.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, _OVERLAY_MANIFEST)
+    previous = _read_text(manifest)
+    for relative in (previous or "").splitlines():
+        if relative and relative not in snapshots:
+            try:
+                os.remove(os.path.join(directory, relative))
+            except OSError:
+                pass
+    for relative, content in snapshots.items():
+        target = os.path.join(directory, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(content)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        f.write("\n".join(snapshots))
+
+
+def overlay_environment(directory, base_env=None):
+    """Return an environment where TeX and BibTeX find overlay files before the project's."""
+    env = dict(os.environ if base_env is None else base_env)
+    for variable in ('TEXINPUTS', 'BIBINPUTS'):
+        # A trailing separator keeps the default search path after the overlay
+        env[variable] = directory + os.pathsep + env.get(variable, '')
+    return env
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+_default_graph = ProjectGraph()
+
+
+def get_project_graph():
+    """Return the project graph shared by the compiler and the preview."""
+    return _default_graph
@@ -0,0 +1,307 @@
+"""
+Structural pre-check for LaTeX source.
+Find unbalanced braces, unclosed environments and dangling math delimiters
+without running TeX, so documents that cannot compile are not sent to it.
+"""
+
+import re
+from dataclasses import dataclass
+
+MAX_ISSUES = 20
+
+# Commands whose arguments may legitimately hold half of an environment or math pair
+_DEFINITION_COMMANDS = frozenset((
+    'def', 'gdef', 'edef', 'xdef', 'newcommand', 'renewcommand', 'providecommand',
+    'newenvironment', 'renewenvironment', 'DeclareRobustCommand',
+    'NewDocumentCommand', 'RenewDocumentCommand', 'ProvideDocumentCommand',
+    'NewDocumentEnvironment', 'RenewDocumentEnvironment', 'newtheorem', 'let',
+))
+
+# Commands whose argument is read verbatim, so % and braces inside are literal
+_VERBATIM_COMMANDS = frozenset(('verb', 'lstinline', 'url', 'path', 'nolinkurl', 'href'))
+
+# Environments whose body is not parsed by TeX
+_VERBATIM_ENVIRONMENTS = frozenset((
+    'verbatim', 'verbatim*', 'Verbatim', 'Verbatim*', 'lstlisting', 'minted', 'comment',
+))
+
+_MATH_CLOSERS = {'$': '$', '$$': '$$', '\\[': '\\]', '\\(': '\\)'}
+
+# Commands starting with "if" that are not TeX conditionals, so no \fi ends them
+_NOT_CONDITIONALS = frozenset(('iff', 'ifthenelse'))
+
+# "\let\lb={" assigns the brace itself and "\let\a\iffalse" a conditional; neither opens anything
+_LET_BRACE = re.compile(r'\s*\\(?:[A-Za-z@]+|.)\s*=?\s?(?:[{}]|\\(?:iffalse|fi)(?![A-Za-z@]))')
+
+_ENVIRONMENT_NAME = re.compile(r'\s*\{([^{}]*)\}')
+_LINE_CACHE_LIMIT = 50000
+
+
+@dataclass
+class StructuralIssue:
+    """A structural error that would stop the document from compiling."""
+    line: int  # 1-based
+    column: int  # 0-based
+    message: str
+    suggestion: str = ""
+
+
+def _skip_verbatim_argument(text, j):
+    """Return the index after a verbatim argument starting at `j`."""
+    length = len(text)
+    if j < length and text[j] == '*':
+        j += 1
+    if j >= length:
+        return j
+    if text[j] == '{':
+        depth = 0
+        for k in range(j, length):
+            if text[k] == '{':
+                depth += 1
+            elif text[k] == '}':
+                depth -= 1
+                if depth == 0:
+                    return k + 1
+        return length
+    closing = text.find(text[j], j + 1)
+    return length if closing == -1 else closing + 1
+
+
+def tokenize_line(text):
+    """
+    Extract the structural tokens of one source line.
+
+    Returns:
+        tuple: (tokens, is_blank) where tokens are (kind, column, name) tuples and
+        is_blank tells whether the line ends a paragraph.
+    """
+    tokens = []
+    length = len(text)
+    i = 0
+    while i < length:
+        char = text[i]
+        if char == '%':
+            break
+        if char == '\\':
+            j = i + 1
+            if j < length and text[j].isalpha():
+                while j < length and text[j].isalpha():
+                    j += 1
+                name = text[i + 1:j]
+                if name in ('begin', 'end'):
+                    match = _ENVIRONMENT_NAME.match(text, j)
+                    if match:
+                        tokens.append((name, i, match.group(1).strip()))
+                        j = match.end()
+                elif name in _VERBATIM_COMMANDS:
+                    j = _skip_verbatim_argument(text, j)
+                elif name in _DEFINITION_COMMANDS:
+                    tokens.append(('def', i, name))
+                    if name == 'let':
+                        match = _LET_BRACE.match(text, j)
+                        if match:
+                            j = match.end()
+                elif name == 'iffalse':
+                    tokens.append(('iffalse', i, None))
+                elif name == 'fi':
+                    tokens.append(('fi', i, None))
+                elif name.startswith('if') and name not in _NOT_CONDITIONALS:
+                    tokens.append(('if', i, None))
+                i = j
+                continue
+            if j < length and text[j] in '[]()':
+                tokens.append(('\\' + text[j], i, None))
+            i = j + 1
+            continue
+        if char == '{' or char == '}':
+            tokens.append((char, i, None))
+        elif char == '$':
+            if i + 1 < length and text[i + 1] == '$':
+                tokens.append(('$$', i, None))
+                i += 1
+            else:
+                tokens.append(('$', i, None))
+        i += 1
+    return tokens, not text.strip()
+
+
+class StructureValidator:
+    """
+    Validate document structure, reusing tokenized lines between calls.
+
+    Only lines whose text changed since the previous call are tokenized again,
+    so validating after each keystroke costs little more than a scan of tokens.
+    """
+
+    def __init__(self):
+        self._line_cache = {}
+
+    def validate(self, content):
+        """
+        Check a document for fatal structural problems.
+
+        Args:
+            content (str): Full document source.
+
+        Returns:
+            list: StructuralIssue instances in document order, empty if none found.
+        """
+        lines = content.split('\n')
+        if len(self._line_cache) > _LINE_CACHE_LIMIT:
+            self._line_cache.clear()
+
+        state = _ValidationState()
+        for line_number, text in enumerate(lines, start=1):
+            tokenized = self._line_cache.get(text)
+            if tokenized is None:
+                tokenized = tokenize_line(text)
+                self._line_cache[text] = tokenized
+            tokens, is_blank = tokenized
+            state.feed_line(line_number, tokens, is_blank)
+            if len(state.issues) >= MAX_ISSUES:
+                break
+        else:
+            state.finish()
+        return sorted(state.issues[:MAX_ISSUES], key=lambda issue: (issue.line, issue.column))
+
+
+class _ValidationState:
+    """Stacks of open braces, environments and math shifts while scanning."""
+
+    def __init__(self):
+        self.issues = []
+        self.braces = []  # (line, column)
+        self.environments = []  # (name, line, column)
+        self.math = None  # (delimiter, line, column)
+        self.verbatim = None  # environment name while inside a verbatim block
+        self.skipped_conditionals = 0  # nesting depth inside \iffalse ... \fi, whose text TeX skips
+        self.definition_depth = None
+
+    def feed_line(self, line_number, tokens, is_blank):
+        if is_blank and not self.verbatim:
+            self.definition_depth = None
+            if self.math:
+                delimiter, line, column = self.math
+                self._add(line, column, f"Math opened with {delimiter} is not closed before the paragraph ends",
+                          "Add the closing delimiter or remove the stray one")
+                self.math = None
+
+        for kind, column, name in tokens:
+            if self.verbatim:
+                if kind == 'end' and name == self.verbatim:
+                    self.verbatim = None
+                    self._pop_environment(name, line_number, column)
+                continue
+            if self.skipped_conditionals:
+                if kind in ('if', 'iffalse'):
+                    self.skipped_conditionals += 1
+                elif kind == 'fi':
+                    self.skipped_conditionals -= 1
+                continue
+            if kind == '{':
+                self.braces.append((line_number, column))
+                continue
+            if kind == '}':
+                if self.braces:
+                    self.braces.pop()
+                else:
+                    self._add(line_number, column, "Unmatched closing brace '}'", "Remove it or add the missing '{'")
+                continue
+            if kind == 'def':
+                self.definition_depth = len(self.braces)
+                continue
+            if self.definition_depth is not None:
+                if len(self.braces) > self.definition_depth:
+                    continue  # inside the body of a definition
+                self.definition_depth = None
+
+            # TeX counts braces literally in definition bodies, so only skip conditional text outside them
+            if kind == 'iffalse':
+                self.skipped_conditionals = 1
+                continue
+            if kind in ('if', 'fi'):
+                continue
+            if kind == 'begin':
+                self.environments.append((name, line_number, column))
+                if name in _VERBATIM_ENVIRONMENTS:
+                    self.verbatim = name
+            elif kind == 'end':
+                self._pop_environment(name, line_number, column)
+            else:
+                self._feed_math(kind, line_number, column)
+
+        # Single-line definitions end with their line
+        if self.definition_depth is not None and len(self.braces) <= self.definition_depth:
+            self.definition_depth = None
+
+    def _pop_environment(self, name, line_number, column):
+        if not self.environments:
+            self._add(line_number, column, f"\\end{{{name}}} has no matching \\begin{{{name}}}",
+                      f"Remove it or add \\begin{{{name}}} before it")
+            return
+        open_name, open_line, _ = self.environments[-1]
+        if open_name == name:
+            self.environments.pop()
+        elif any(entry[0] == name for entry in self.environments):
+            # Report the inner environments that were never ended
+            while self.environments[-1][0] != name:
+                inner, inner_line, inner_column = self.environments.pop()
+                self._add(inner_line, inner_column,
+                          f"\\begin{{{inner}}} is not closed before \\end{{{name}}} on line {line_number}",
+                          f"Add \\end{{{inner}}}")
+            self.environments.pop()
+        else:
+            self._add(line_number, column, f"\\end{{{name}}} does not match \\begin{{{open_name}}} on line {open_line}",
+                      f"Use \\end{{{open_name}}} or fix the environment name")
+            # Like LaTeX, treat the mismatched \end as closing the innermost environment
+            self.environments.pop()
+
+    def _feed_math(self, kind, line_number, column):
+        if not self.math:
+            if kind in _MATH_CLOSERS:
+                self.math = (kind, line_number, column)
+            else:
+                opener = '\\[' if kind == '\\]' else '\\('
+                self._add(line_number, column, f"{kind} without opening math delimiter",
+                          f"Remove it or add {opener} before it")
+            return
+
+        delimiter, open_line, _ = self.math
+        closer = _MATH_CLOSERS[delimiter]
+        if kind == closer:
+            self.math = None
+        elif delimiter == '$' and kind == '$$':
+            # "$a$$b$" is two inline formulas back to back
+            self.math = ('$', line_number, column + 1)
+        elif delimiter == '$$' and kind == '$':
+            self._add(line_number, column, f"Display math opened on line {open_line} must end with $$",
+                      "Use $$ to close it")
+            self.math = None
+        elif kind in ('\\[', '\\('):
+            self._add(line_number, column, f"{kind} inside math opened on line {open_line}",
+                      "Close the previous math before opening new math")
+        elif kind in ('\\]', '\\)'):
+            self._add(line_number, column, f"{kind} does not close math opened with {delimiter} on line {open_line}",
+                      f"Use {closer} to close it")
+            self.math = None
+        # '$' inside \[...\] or \(...\) belongs to a nested \text{$...$} and is left alone
+
+    def finish(self):
+        if self.math and not self.verbatim:
+            delimiter, line, column = self.math
+            self._add(line, column, f"Math opened with {delimiter} is never closed", "Add the closing delimiter")
+        for name, line, column in self.environments:
+            self._add(line, column, f"\\begin{{{name}}} is never closed", f"Add \\end{{{name}}}")
+        for line, column in self.braces:
+            self._add(line, column, "Unclosed '{' opened here", "Add the missing '}'")
+
+    def _add(self, line, column, message, suggestion=""):
+        self.issues.append(StructuralIssue(line, column, message, suggestion))
+
+
+_default_validator = StructureValidator()
+
+
+def validate_structure(content):
+    """Validate a document with a shared validator; see StructureValidator.validate."""
+    return _default_validator.validate(content)
@@ -1,25 +1,32 @@
 """
 Debug system for LaTeX compilation error analysis.
+
+Names are imported on first access, so headless users such as the compile
+worker can import the parsers without loading the Tk user interface.
 """
 
-from .core import DebugContext, AnalysisResult, LaTeXError, DebugUI
-from .coordinator import DebugCoordinator, create_debug_system
-from .error_parser import LaTeXErrorParser
-from .llm_analyzer import LLMAnalyzer
-from .legacy_fix_applicator import LegacyFixApplicator
-from .diff_service import CachedDiffGenerator
-from .debug_ui import TabbedDebugUI
+import importlib
+
+_EXPORTS = {
+    'DebugContext': 'core',
+    'AnalysisResult': 'core',
+    'LaTeXError': 'core',
+    'DebugUI': 'core',
+    'DebugCoordinator': 'coordinator',
+    'create_debug_system': 'coordinator',
+    'LaTeXErrorParser': 'error_parser',
+    'StreamingLogParser': 'stream_parser',
+    'LLMAnalyzer': 'llm_analyzer',
+    'LegacyFixApplicator': 'legacy_fix_applicator',
+    'CachedDiffGenerator': 'diff_service',
+    'TabbedDebugUI': 'debug_ui',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'DebugContext',
-    'AnalysisResult',
-    'LaTeXError',
-    'DebugUI',
-    'DebugCoordinator',
-    'create_debug_system',
-    'LaTeXErrorParser',
-    'LLMAnalyzer',
-    'LegacyFixApplicator',
-    'CachedDiffGenerator',
-    'TabbedDebugUI'
-]
\ No newline at end of file
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
@@ -1,7 +1,7 @@
 """Orchestrate debug functionality with SOLID design principles."""
 
 import threading
-from typing import Optional, Callable
+from typing import List, Optional, Callable
 from utils import logs_console
 from latex_debug_system.core import DebugContext, AnalysisResult
 from latex_debug_system.error_parser import LaTeXErrorParser
@@ -68,6 +68,37 @@ class DebugCoordinator:
             
             logs_console.log("LLM analysis available via 'Analyze with AI' button", level='INFO')
     
+    def report_structural_issues(self, issues: List, file_path: str, current_content: str):
+        """Show structural pre-check issues, or clear them once the document is sound again."""
+        if issues:
+            self.current_context = DebugContext(
+                current_file_path=file_path,
+                current_content=current_content
+            )
+            self.debug_ui.show_structural_issues(issues, file_path, current_content)
+        else:
+            self.debug_ui.clear_display()
+    
+    def report_streamed_errors(self, errors: List):
+        """Show errors parsed from the output of a compilation that is still running."""
+        self.debug_ui.show_streamed_errors(errors)
+    
+    def begin_compilation(self, file_name: str, on_cancel: Optional[Callable[[], None]] = None):
+        """Prepare the debug panel to show a streamed compilation."""
+        self.debug_ui.begin_compilation_output(file_name, on_cancel)
+    
+    def append_compilation_output(self, lines: List[str]):
+        """Append streamed compiler output lines to the debug panel."""
+        self.debug_ui.append_compilation_output(lines)
+    
+    def update_compilation_progress(self, text: str):
+        """Show live compilation progress in the debug panel."""
+        self.debug_ui.set_compilation_progress(text)
+    
+    def end_compilation(self):
+        """Restore the debug panel once the compile process has exited."""
+        self.debug_ui.end_compilation_output()
+    
     def set_current_document(self, file_path: str, content: str):
         """Set the current document information."""
         self.current_context = DebugContext(
@@ -383,6 +383,8 @@ class AnalysisTab(ttk.Frame):
 class TabbedDebugUI(ttk.Frame, DebugUI):
     """Main debug UI with tabbed interface for errors, analysis, and quick fixes."""
     
+    MAX_OUTPUT_LINES = 2000  # Streamed output lines kept in the Output tab
+    
     def __init__(self, parent, on_goto_line: Optional[Callable[[int], None]] = None):
         """Initialize the tabbed debug UI."""
         super().__init__(parent)
@@ -416,6 +418,16 @@ class TabbedDebugUI(ttk.Frame, DebugUI):
         )
         self.compare_btn.pack(side='right', padx=(8, 2))
         
+        # Cancel button, only shown while a compilation is running
+        self.cancel_btn = ttk.Button(
+            header_frame,
+            text="Cancel",
+            command=self._cancel_compilation,
+            width=7
+        )
+        self._on_cancel_compilation: Optional[Callable[[], None]] = None
+        self._streamed_errors: List[LaTeXError] = []
+        
         # Ultra-fine notebook with minimal padding
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill='both', expand=True, padx=3, pady=(0, 2))
@@ -440,6 +452,17 @@ class TabbedDebugUI(ttk.Frame, DebugUI):
         )
         self.notebook.add(self.analysis_tab, text='Analyze diff')
         
+        # Output tab with streamed compiler output
+        self.output_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.output_frame, text='Output')
+        
+        self.output_text = tk.Text(self.output_frame, height=6, wrap='none', font=('Consolas', 9),
+                                   relief='flat', borderwidth=0, state='disabled')
+        output_scrollbar = ttk.Scrollbar(self.output_frame, orient='vertical', command=self.output_text.yview)
+        self.output_text.configure(yscrollcommand=output_scrollbar.set)
+        output_scrollbar.pack(side='right', fill='y')
+        self.output_text.pack(fill='both', expand=True, padx=3, pady=3)
+        
         
         # Ultra-fine status bar
         self.status_frame = ttk.Frame(self)
@@ -501,6 +524,35 @@ class TabbedDebugUI(ttk.Frame, DebugUI):
         
         logs_console.log(f"Updated debug UI with {len(errors)} total issues", level='INFO')
     
+    def show_structural_issues(self, issues: List, file_path: str = None, current_content: str = None):
+        """Show problems found by the structural pre-check before any compile ran."""
+        lines = (current_content or "").split('\n')
+        errors = [
+            LaTeXError(
+                line_number=issue.line,
+                severity='Error',
+                message=issue.message,
+                suggestion=issue.suggestion or None,
+                context=lines[issue.line - 1] if 0 < issue.line <= len(lines) else None
+            )
+            for issue in issues
+        ]
+        self.error_list.display_errors(errors)
+        self.current_context = DebugContext(
+            current_file_path=file_path or "",
+            current_content=current_content or "",
+            errors=errors
+        )
+        self.status_label.configure(text=f"{len(errors)} structural errors, compile skipped", foreground='#d32f2f')
+        logs_console.log(f"Structural pre-check found {len(errors)} issues", level='INFO')
+    
+    def show_streamed_errors(self, errors: List[LaTeXError]):
+        """Add errors found in the output of a running compilation."""
+        self._streamed_errors.extend(errors)
+        self.error_list.display_errors(self._streamed_errors)
+        count = len(self._streamed_errors)
+        self.status_label.configure(text=f"Compiling... {count} error{'s' if count != 1 else ''} so far", foreground='#d32f2f')
+    
     def display_analysis_result(self, result: AnalysisResult):
         """Display AI analysis result."""
         if self.current_context:
@@ -531,6 +583,51 @@ class TabbedDebugUI(ttk.Frame, DebugUI):
         self.error_list.clear_errors()
         self.status_label.configure(text="Ready", foreground='#666')
     
+    def begin_compilation_output(self, file_name: str, on_cancel: Optional[Callable[[], None]] = None):
+        """Clear the output tab and show the cancel button for a new compilation."""
+        self.output_text.configure(state='normal')
+        self.output_text.delete('1.0', 'end')
+        self.output_text.configure(state='disabled')
+        
+        self._on_cancel_compilation = on_cancel
+        self._streamed_errors = []
+        if on_cancel:
+            self.cancel_btn.pack(side='right', padx=(8, 2))
+        
+        self.notebook.select(self.output_frame)
+        self.status_label.configure(text=f"Compiling {file_name}...", foreground='#1565c0')
+    
+    def append_compilation_output(self, lines: List[str]):
+        """Append streamed output lines, keeping only the most recent ones."""
+        if not lines:
+            return
+        self.output_text.configure(state='normal')
+        self.output_text.insert('end', '\n'.join(lines) + '\n')
+        
+        # Trim old lines so long logs do not slow the widget down
+        line_count = int(self.output_text.index('end-1c').split('.')[0])
+        if line_count > self.MAX_OUTPUT_LINES:
+            self.output_text.delete('1.0', f'{line_count - self.MAX_OUTPUT_LINES}.0')
+        
+        self.output_text.configure(state='disabled')
+        self.output_text.see('end')
+    
+    def set_compilation_progress(self, text: str):
+        """Show live compilation progress in the status bar."""
+        self.status_label.configure(text=text, foreground='#1565c0')
+    
+    def end_compilation_output(self):
+        """Hide the cancel button once compilation has finished."""
+        self._on_cancel_compilation = None
+        self.cancel_btn.pack_forget()
+        self.notebook.select(self.errors_frame)
+        self.status_label.configure(text="Ready", foreground='#666')
+    
+    def _cancel_compilation(self):
+        """Request cancellation of the running compilation."""
+        if self._on_cancel_compilation:
+            self._on_cancel_compilation()
+    
     def _on_error_selected(self, error: LaTeXError):
         """Handle error selection for navigation."""
         if self.on_goto_line and error.line_number > 0:
@@ -0,0 +1,144 @@
+"""
+Incremental LaTeX log parser for streamed compiler output.
+Report errors as soon as TeX prints them and detect fatal conditions, so a
+compilation that can no longer succeed is stopped instead of running to its timeout.
+"""
+
+import re
+from dataclasses import replace
+from typing import Callable, List, Optional, Tuple
+from latex_debug_system.core import LaTeXError
+
+# Identical errors in a row allowed before the run is considered an error loop
+DEFAULT_MAX_REPEATED_ERRORS = 5
+
+# Lines after "! ..." searched for the "l.<n>" location before giving up
+_MAX_ERROR_LINES = 12
+
+_ERROR_START = re.compile(r'^! (.*)$')
+_FILE_LINE_ERROR = re.compile(r'^(?:\./)?[^:\s]+\.(?:tex|sty|cls|ltx):(\d+): (.*)$')
+_LOCATION = re.compile(r'^l\.(\d+)\s?(.*)$')
+
+# A page shipped out ("[12" in the output) shows TeX is still making progress
+_PAGE_SHIPPED = re.compile(r'\[\d+')
+
+# Output that means TeX has given up, by reason shown to the user
+_FATAL_MARKERS = (
+    ('! Emergency stop.', "Emergency stop"),
+    ('! ==> Fatal error occurred', "Fatal error, no output produced"),
+    ('(That makes 100 errors; please try again.)', "Too many errors"),
+    ('*** (job aborted, no legal \\end found)', "Job aborted: no legal \\end found"),
+    ('*** (cannot \\read from terminal in nonstop modes)', "TeX halted waiting for input"),
+    ('! Interruption.', "Interrupted"),
+)
+
+
+class StreamingLogParser:
+    """
+    Parse TeX output one line at a time.
+
+    Complete errors are appended to `errors` and passed to `on_error` as soon as
+    their location line ("l.<n>") has been read. `feed()` returns True once, on
+    the line where a fatal condition is found; `fatal_reason` then explains it.
+    The parser is fed from the thread that reads the process output.
+    """
+
+    def __init__(self, on_error: Optional[Callable[[LaTeXError], None]] = None,
+                 max_repeated_errors: int = DEFAULT_MAX_REPEATED_ERRORS,
+                 fatal_markers: Tuple[Tuple[str, str], ...] = ()):
+        self.on_error = on_error
+        self.max_repeated_errors = max_repeated_errors
+        # Engine-specific markers are checked first so their reason wins
+        self.fatal_markers = tuple(fatal_markers) + _FATAL_MARKERS
+        self.errors: List[LaTeXError] = []
+        self.fatal_reason: Optional[str] = None
+        self._pending = None  # (message, line_number or None, raw lines)
+        self._repeated = (None, 0)  # last error message and how many times in a row it came
+
+    @property
+    def is_fatal(self) -> bool:
+        return self.fatal_reason is not None
+
+    def feed(self, line: str) -> bool:
+        """Consume one output line. Returns True when it reveals a fatal condition."""
+        if self.fatal_reason is not None:
+            return False
+
+        for marker, reason in self.fatal_markers:
+            if line.startswith(marker):
+                self._flush()
+                self.fatal_reason = reason
+                return True
+
+        match = _ERROR_START.match(line)
+        if match:
+            self._flush()
+            self._pending = (match.group(1).strip(), None, [line])
+            return self._check_repeats()
+        match = _FILE_LINE_ERROR.match(line)
+        if match:
+            self._flush()
+            self._pending = (match.group(2).strip(), int(match.group(1)), [line])
+            return self._check_repeats()
+
+        if self._pending is None:
+            if _PAGE_SHIPPED.search(line):
+                self._repeated = (None, 0)
+            return False
+        message, line_number, raw_lines = self._pending
+        raw_lines.append(line)
+        location = _LOCATION.match(line)
+        if location:
+            self._flush(int(location.group(1)), location.group(2).strip() or None)
+        elif len(raw_lines) > _MAX_ERROR_LINES:
+            self._flush()
+        return False
+
+    def finish(self):
+        """Report an error still waiting for its location once output has ended."""
+        self._flush()
+
+    def aborted_result(self, result):
+        """
+        Mark a process result as aborted by this parser.
+
+        A run killed because of a fatal error is a failed compilation rather than
+        a user cancellation, so the returned copy has `cancelled` cleared and
+        `abort_reason` set. Results of runs that were not aborted are returned unchanged.
+        """
+        if self.fatal_reason is None or not result.cancelled:
+            return result
+        return replace(result, cancelled=False, returncode=result.returncode or 1, abort_reason=self.fatal_reason)
+
+    def _check_repeats(self) -> bool:
+        """
+        Detect an error loop: the same message over and over with nothing else in between.
+
+        Any other error or a shipped page breaks the run, so a document that merely
+        uses one undefined macro in several places still compiles to the end.
+        """
+        message = self._pending[0]
+        last_message, count = self._repeated
+        count = count + 1 if message == last_message else 1
+        self._repeated = (message, count)
+        if count >= self.max_repeated_errors:
+            self._flush()
+            self.fatal_reason = f"'{message}' repeated {count} times"
+            return True
+        return False
+
+    def _flush(self, line_number=None, context=None):
+        if self._pending is None:
+            return
+        message, known_line, raw_lines = self._pending
+        self._pending = None
+        error = LaTeXError(
+            line_number=line_number if line_number is not None else (known_line or 0),
+            severity='Error',
+            message=message,
+            context=context,
+            raw_log_lines=raw_lines,
+        )
+        self.errors.append(error)
+        if self.on_error:
+            self.on_error(error)
@@ -6,6 +6,7 @@ import ctypes
 from app import main_window, state, interface
 from editor import outline as editor_outline
 from latex import compiler as latex_compiler
+from latex import compile_client
 from latex import translator as latex_translator
 from llm import service as llm_service
 from utils import logs_console
@@ -38,6 +39,12 @@ def main():
         interface.hide_console,
         pdf_monitor_setting=state.get_app_config().get("pdf_monitor", "Default")
     )
+
+    # run full and preview compiles in the background compile server
+    try:
+        compile_client.configure_compile_server(int(state.get_app_config().get("compile_server_workers", "2")))
+    except ValueError:
+        logs_console.log("Invalid compile_server_workers setting; compiling in-process", level='WARNING')
     
     # schedule the heavy syntax highlighting updates at startup
     root_window.after(100, interface.perform_heavy_updates)
@@ -0,0 +1,460 @@
+"""
+Headless command-line entry point for Noctern.
+Build, lint, outline and count LaTeX documents with the same code the editor
+uses, without importing Tk, and print one JSON report with per-phase timings.
+The render command times the preview's page rasterization on built PDFs.
+
+    python -m noctern build thesis/
+    python -m noctern batch "reports/**/*.tex" --jobs 4
+    python -m noctern lint --log chapters/*.tex
+    python -m noctern outline main.tex
+    python -m noctern stats corpus/ --repeat 5
+    python -m noctern render thesis.pdf --dpi 150 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds allowed for all passes of a build, as in the editor
+BUILD_TIMEOUT = 300
+
+# Directories never searched for documents
+_SKIPPED_DIRECTORIES = ('.git', '__pycache__', 'node_modules')
+
+
+class PhaseTimer:
+    """Accumulate wall-clock seconds per named phase."""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def rounded(self):
+        return {name: round(seconds, 6) for name, seconds in self.timings.items()}
+
+
+def collect_documents(paths):
+    """
+    Expand file and directory arguments into a sorted list of .tex files.
+
+    Directories are searched recursively; hidden directories and the editor's
+    `<name>.cache` directories are skipped.
+    """
+    documents = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, files in os.walk(path):
+                subdirectories[:] = sorted(
+                    name for name in subdirectories
+                    if not name.startswith('.') and not name.endswith('.cache') and name not in _SKIPPED_DIRECTORIES
+                )
+                documents.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith('.tex'))
+        else:
+            documents.append(path)
+    seen = set()
+    unique = []
+    for document in documents:
+        absolute = os.path.abspath(document)
+        if absolute not in seen:
+            seen.add(absolute)
+            unique.append(absolute)
+    return unique
+
+
+def _read_document(path, timer):
+    with timer.phase('read'):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+
+def _error_dict(error):
+    return {'line': error.line_number, 'severity': error.severity, 'message': error.message, 'context': error.context}
+
+
+def _parse_log_lines(lines, fatal_markers=()):
+    """Run the streaming log parser over finished output, as the editor does while TeX runs."""
+    from latex_debug_system.stream_parser import StreamingLogParser
+    parser = StreamingLogParser(fatal_markers=fatal_markers)
+    for line in lines:
+        if parser.feed(line):
+            break
+    parser.finish()
+    return parser
+
+
+def build_document(path, args, timer):
+    """Build a document's root with the editor's build engine and report errors from its output."""
+    from latex.compile_client import create_build
+    from latex.engines import get_engine, select_engine
+    from latex.project_graph import get_project_graph
+
+    with timer.phase('resolve'):
+        graph = get_project_graph()
+        root = graph.find_root(path)
+        profile = get_engine(args.engine) if args.engine else select_engine(graph.read(root) or "", root).build
+
+    with timer.phase('compile'):
+        build = create_build(
+            os.path.dirname(root), os.path.basename(root), engine=profile.name,
+            timeout=args.timeout, max_passes=args.max_passes,
+        )
+        try:
+            result = build.run()
+        except FileNotFoundError:
+            return {'root': root, 'ok': False, 'engine': profile.name, 'error': f"TeX engine '{profile.name}' not found"}
+
+    with timer.phase('parse'):
+        log_parser = _parse_log_lines(result.output.splitlines(), profile.fatal_markers)
+
+    pdf_path = os.path.splitext(root)[0] + '.pdf'
+    return {
+        'root': root,
+        'engine': profile.name,
+        'ok': result.returncode == 0 and not result.timed_out,
+        'returncode': result.returncode,
+        'timed_out': result.timed_out,
+        'up_to_date': result.up_to_date,
+        'passes': result.passes,
+        'pdf': pdf_path if os.path.exists(pdf_path) else None,
+        'fatal': log_parser.fatal_reason,
+        'errors': [_error_dict(error) for error in log_parser.errors],
+    }
+
+
+def lint_document(path, args, timer):
+    """Check structure, and optionally the last log and the changes since the last successful build."""
+    from latex.structure_validator import validate_structure
+
+    content = _read_document(path, timer)
+    with timer.phase('validate'):
+        issues = validate_structure(content)
+    report = {
+        'ok': not issues,
+        'issues': [
+            {'line': issue.line, 'column': issue.column, 'message': issue.message, 'suggestion': issue.suggestion}
+            for issue in issues
+        ],
+    }
+
+    if args.log:
+        log_path = os.path.splitext(path)[0] + '.log'
+        report['log_errors'] = None
+        if os.path.exists(log_path):
+            with timer.phase('parse_log'):
+                with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                    log_parser = _parse_log_lines(f.read().splitlines())
+            report['log_errors'] = [_error_dict(error) for error in log_parser.errors]
+            report['ok'] = report['ok'] and not log_parser.errors and not log_parser.is_fatal
+
+    if args.diff:
+        from latex_debug_system.diff_service import CachedDiffGenerator
+        with timer.phase('diff'):
+            has_previous, diff_content, _ = CachedDiffGenerator().analyze_current_vs_last_successful(path, content)
+        report['diff'] = None
+        if has_previous:
+            diff_lines = (diff_content or "").splitlines()
+            report['diff'] = {
+                'added': sum(1 for line in diff_lines if line.startswith('+') and not line.startswith('+++')),
+                'removed': sum(1 for line in diff_lines if line.startswith('-') and not line.startswith('---')),
+            }
+    return report
+
+
+def outline_document(path, args, timer):
+    """List the sectioning commands of a document, as shown in the outline panel."""
+    from editor.structure import find_section_lines
+
+    content = _read_document(path, timer)
+    with timer.phase('outline'):
+        sections = find_section_lines(content)
+    return {
+        'ok': True,
+        'sections': [{'type': kind, 'title': title, 'line': line} for kind, title, line in sections],
+    }
+
+
+def document_stats(path, args, timer):
+    """Count lines, words, sections and dependencies of a document."""
+    from editor.structure import find_section_lines
+    from editor.wordcount import count_words
+    from latex.project_graph import parse_dependencies
+
+    content = _read_document(path, timer)
+    with timer.phase('analyze'):
+        dependencies = {}
+        for dependency in parse_dependencies(content):
+            dependencies[dependency.kind] = dependencies.get(dependency.kind, 0) + 1
+        stats = {
+            'ok': True,
+            'bytes': len(content.encode('utf-8')),
+            'lines': content.count('\n') + (1 if content and not content.endswith('\n') else 0),
+            'words': count_words(content),
+            'sections': len(find_section_lines(content)),
+            'dependencies': dependencies,
+        }
+    return stats
+
+
+COMMANDS = {
+    'build': build_document,
+    'lint': lint_document,
+    'outline': outline_document,
+    'stats': document_stats,
+}
+
+
+def _unique_roots(documents):
+    """Replace each document with its root document, keeping the first occurrence of each."""
+    from latex.project_graph import get_project_graph
+
+    graph = get_project_graph()
+    roots = []
+    for path in documents:
+        root = graph.find_root(path)
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
+def run_command(command, paths, args):
+    """
+    Run one subcommand over every document and build the JSON report.
+
+    Build maps every document to its root first, so a directory of chapters
+    builds its main document once.
+    """
+    handler = COMMANDS[command]
+    documents = collect_documents(paths)
+    if command == 'build':
+        documents = _unique_roots(documents)
+    repeat = max(1, getattr(args, 'repeat', 1))
+    totals = PhaseTimer()
+    results = []
+    start = time.perf_counter()
+
+    for path in documents:
+        entry = {'file': path}
+        timings = []
+        for _ in range(repeat):
+            timer = PhaseTimer()
+            try:
+                outcome = handler(path, args, timer)
+            except (OSError, UnicodeError) as e:
+                outcome = {'ok': False, 'error': str(e)}
+            timings.append(timer)
+            for name, seconds in timer.timings.items():
+                totals.timings[name] = totals.timings.get(name, 0.0) + seconds
+        entry.update(outcome)
+        entry['timings'] = timings[-1].rounded() if repeat == 1 else _timing_summary(timings)
+        results.append(entry)
+
+    return {
+        'command': command,
+        'ok': all(entry.get('ok') for entry in results),
+        'documents': results,
+        'timings': dict(totals.rounded(), total=round(time.perf_counter() - start, 6)),
+    }
+
+
+def run_batch(patterns, args, progress_out):
+    """
+    Build many root documents in parallel and report each one.
+
+    A line is written to `progress_out` as each document finishes, followed by
+    the full progress table.
+    """
+    from latex.batch_build import DEFAULT_BATCH_WORKERS, BatchBuild, expand_roots, format_table
+
+    start = time.perf_counter()
+    timer = PhaseTimer()
+    with timer.phase('resolve'):
+        roots = expand_roots(patterns)
+    progress_lock = threading.Lock()
+
+    def on_progress(job):
+        if job.finished:
+            with progress_lock:
+                progress_out.write(f"[{job.status}] {job.name} {job.duration:.1f}s\n")
+                progress_out.flush()
+
+    batch = BatchBuild(
+        roots, workers=args.jobs or DEFAULT_BATCH_WORKERS, engine=args.engine, timeout=args.timeout, max_passes=args.max_passes,
+        build_root=args.build_dir, publish=not args.no_publish, on_progress=on_progress,
+    )
+    with timer.phase('compile'):
+        jobs = batch.run()
+    progress_out.write(format_table(jobs) + "\n")
+
+    documents = [
+        {
+            'root': job.root,
+            'ok': job.status == 'ok',
+            'status': job.status,
+            'engine': job.engine,
+            'up_to_date': job.up_to_date,
+            'returncode': job.returncode,
+            'message': job.message,
+            'passes': job.passes,
+            'pdf': job.pdf_path,
+            'build_dir': job.build_dir,
+            'errors': [_error_dict(error) for error in job.errors],
+            'timings': {'build': round(job.duration, 6)},
+        }
+        for job in jobs
+    ]
+    return {
+        'command': 'batch',
+        'ok': all(document['ok'] for document in documents),
+        'documents': documents,
+        'summary': batch.summary(),
+        'timings': dict(timer.rounded(), total=round(time.perf_counter() - start, 6)),
+    }
+
+
+# Preview render modes compared by the render command: no dark mode, the former
+# PIL inversion of the finished image, and inversion inside the rasterizer
+RENDER_MODES = ('light', 'pil_invert', 'invert', 'smart')
+
+
+def _render_with_mode(document, page_num, dpi, mode):
+    from pdf_preview.image_processor import invert_pdf_colors
+    from pdf_preview.render_pool import render_page_image
+
+    if mode == 'light':
+        return render_page_image(document, page_num, dpi)
+    if mode == 'pil_invert':
+        return invert_pdf_colors(render_page_image(document, page_num, dpi))
+    return render_page_image(document, page_num, dpi, dark=mode)
+
+
+def run_render_benchmark(paths, args):
+    """
+    Rasterize every page of each PDF in each dark-mode style and report the cost per page.
+
+    Timings are milliseconds per page, minimum and median over pages and repeats.
+    """
+    # Imported as `fitz`, recent PyMuPDF prints a deprecation warning into the JSON report
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF before 1.24
+
+    repeat = max(1, args.repeat)
+    start = time.perf_counter()
+    results = []
+    for path in paths:
+        entry = {'file': path}
+        try:
+            document = fitz.open(path)
+        except Exception as e:
+            entry.update(ok=False, error=str(e))
+            results.append(entry)
+            continue
+        with document:
+            pages = range(1, min(document.page_count, args.pages or document.page_count) + 1)
+            samples = {mode: [] for mode in RENDER_MODES}
+            for _ in range(repeat):
+                for page_num in pages:
+                    for mode in RENDER_MODES:
+                        page_start = time.perf_counter()
+                        _render_with_mode(document, page_num, args.dpi, mode)
+                        samples[mode].append(time.perf_counter() - page_start)
+        entry.update(ok=True, pages=len(pages), dpi=args.dpi, ms_per_page={
+            mode: {'min': round(min(values) * 1000, 3), 'median': round(sorted(values)[len(values) // 2] * 1000, 3)}
+            for mode, values in samples.items() if values
+        })
+        results.append(entry)
+
+    return {
+        'command': 'render',
+        'ok': all(entry.get('ok') for entry in results),
+        'documents': results,
+        'timings': {'total': round(time.perf_counter() - start, 6)},
+    }
+
+
+def _timing_summary(timers):
+    """Minimum and median per phase over repeated runs."""
+    summary = {}
+    for name in timers[0].timings:
+        samples = sorted(timer.timings.get(name, 0.0) for timer in timers)
+        summary[name] = {'min': round(samples[0], 6), 'median': round(samples[len(samples) // 2], 6)}
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='noctern', description="Build and check LaTeX documents without the editor.")
+    parser.add_argument('--quiet', action='store_true', help="discard log messages instead of writing them to stderr")
+    parser.add_argument('--indent', type=int, default=2, help="JSON indentation, 0 for one line")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="compile documents with the editor's build engine")
+    build.add_argument('--engine', default=None, help="TeX engine for every document; by default each document's magic comment, settings or packages decide")
+    build.add_argument('--timeout', type=float, default=BUILD_TIMEOUT)
+    build.add_argument('--max-passes', type=int, default=5)
+
+    batch = subparsers.add_parser('batch', help="compile many root documents in parallel, each in its own build directory")
+    batch.add_argument('--jobs', type=int, default=None, help="documents built at once")
+    batch.add_argument('--engine', default=None, help="TeX engine for every document")
+    batch.add_argument('--timeout', type=float, default=BUILD_TIMEOUT)
+    batch.add_argument('--max-passes', type=int, default=5)
+    batch.add_argument('--build-dir', default=None, help="parent of the per-document build directories")
+    batch.add_argument('--no-publish', action='store_true', help="leave PDFs in the build directories")
+
+    lint = subparsers.add_parser('lint', help="report structural errors without compiling")
+    lint.add_argument('--log', action='store_true', help="also parse the document's existing .log file")
+    lint.add_argument('--diff', action='store_true', help="count lines changed since the last successful build")
+
+    subparsers.add_parser('outline', help="list sections")
+    subparsers.add_parser('stats', help="count lines, words, sections and dependencies")
+
+    for name, subparser in subparsers.choices.items():
+        subparser.add_argument('paths', nargs='+', help=".tex files or directories searched recursively")
+        if name not in ('build', 'batch'):
+            subparser.add_argument('--repeat', type=int, default=1, help="run each document N times and report min/median timings")
+
+    # Added after the loop: it takes PDFs rather than .tex documents
+    render = subparsers.add_parser('render', help="time preview page rendering and dark-mode inversion on PDFs")
+    render.add_argument('paths', nargs='+', help="PDF files")
+    render.add_argument('--dpi', type=int, default=150, help="render resolution")
+    render.add_argument('--pages', type=int, default=None, help="only the first N pages of each PDF")
+    render.add_argument('--repeat', type=int, default=1, help="render each page N times")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # stdout carries the report; keep log output away from it
+    report_out = sys.stdout
+    log_out = open(os.devnull, 'w') if args.quiet else sys.stderr
+    sys.stdout = log_out
+    try:
+        if args.command == 'batch':
+            report = run_batch(args.paths, args, sys.stderr)
+        elif args.command == 'render':
+            report = run_render_benchmark(args.paths, args)
+        else:
+            report = run_command(args.command, args.paths, args)
+    finally:
+        sys.stdout = report_out
+        if args.quiet:
+            log_out.close()
+    json.dump(report, report_out, indent=args.indent or None)
+    report_out.write('\n')
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Adaptive debounce for live preview compilation.
+Choose the pause before a preview compile from the document's measured compile
+time and the user's typing cadence, so compiles stay within a CPU budget on
+large documents while small documents refresh almost immediately.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_CPU_BUDGET = 0.25
+MAX_DELAY = 10.0
+# Lower bound on the delay; small documents that compile quickly refresh after this
+DEFAULT_MIN_DELAY = 0.1
+
+# Gaps longer than this are pauses, not typing rhythm
+_TYPING_GAP_LIMIT = 2.0
+# Wait this many typical keystroke gaps before assuming the user paused
+_CADENCE_FACTOR = 2.0
+# Weight of the newest sample in the moving averages
+_SMOOTHING = 0.3
+
+
+@dataclass
+class DebounceDecision:
+    """Chosen delay and a short explanation for the status label."""
+    delay: float
+    reason: str
+
+
+class _DocumentStats:
+    def __init__(self):
+        self.compile_time = None
+        self.keystroke_gap = None
+        self.last_keystroke = None
+
+
+def _smooth(current, sample):
+    return sample if current is None else current + _SMOOTHING * (sample - current)
+
+
+class AdaptiveDebounce:
+    """
+    Track compile durations and keystroke intervals per document.
+
+    The delay is the smallest value that satisfies all of:
+    - the configured minimum delay;
+    - the CPU budget: a compile of duration C followed by a pause D uses
+      C / (C + D) of wall time, so D >= C * (1 - budget) / budget;
+    - the typing cadence: a few typical keystroke gaps, so compiles start when
+      the user pauses rather than between two keystrokes.
+    """
+
+    def __init__(self, cpu_budget=DEFAULT_CPU_BUDGET, max_delay=MAX_DELAY):
+        self.cpu_budget = cpu_budget
+        self.max_delay = max_delay
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, document_key):
+        stats = self._documents.get(document_key)
+        if stats is None:
+            stats = self._documents[document_key] = _DocumentStats()
+        return stats
+
+    def record_keystroke(self, document_key, now=None):
+        """Record an edit to update the typing cadence."""
+        now = time.time() if now is None else now
+        with self._lock:
+            stats = self._stats(document_key)
+            if stats.last_keystroke is not None:
+                gap = now - stats.last_keystroke
+                if 0 < gap < _TYPING_GAP_LIMIT:
+                    stats.keystroke_gap = _smooth(stats.keystroke_gap, gap)
+            stats.last_keystroke = now
+
+    def record_compile(self, document_key, duration):
+        """Record how long a completed preview compile took."""
+        with self._lock:
+            stats = self._stats(document_key)
+            stats.compile_time = _smooth(stats.compile_time, duration)
+
+    def forget(self, document_key):
+        """Drop the statistics of a closed document."""
+        with self._lock:
+            self._documents.pop(document_key, None)
+
+    def compute_delay(self, document_key, min_delay):
+        """
+        Pick the debounce delay for a document.
+
+        Args:
+            document_key (str): Document whose statistics to use.
+            min_delay (float): Lower bound from settings, in seconds.
+
+        Returns:
+            DebounceDecision: The delay in seconds and the constraint that set it.
+        """
+        with self._lock:
+            stats = self._stats(document_key)
+            compile_time = stats.compile_time
+            keystroke_gap = stats.keystroke_gap
+
+        delay, reason = min_delay, "minimum delay"
+        if compile_time is not None and 0 < self.cpu_budget < 1:
+            budget_delay = compile_time * (1 - self.cpu_budget) / self.cpu_budget
+            if budget_delay > delay:
+                delay = budget_delay
+                reason = f"CPU budget {self.cpu_budget:.0%} with {compile_time:.2f}s compiles"
+        if keystroke_gap is not None:
+            cadence_delay = keystroke_gap * _CADENCE_FACTOR
+            if cadence_delay > delay:
+                delay = cadence_delay
+                reason = f"typing cadence {keystroke_gap * 1000:.0f} ms"
+        if delay > self.max_delay:
+            delay, reason = self.max_delay, f"{reason}, capped"
+        return DebounceDecision(round(delay, 1), reason)
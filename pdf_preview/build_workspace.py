@@ -0,0 +1,232 @@
+"""
+Persistent build workspaces for live preview compilation.
+Keep one warm directory per document so .aux, .toc, .out and SyncTeX state
+survive between preview compiles, and evict old workspaces under a size budget.
+"""
+
+import hashlib
+import os
+import platform
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from utils import logs_console
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+# Auxiliary files worth restoring after a failed compile
+_AUX_EXTENSIONS = ('.aux', '.toc', '.out', '.lof', '.lot', '.nav', '.snm')
+_LAST_GOOD_SUFFIX = '.last_good'
+
+
+def get_temp_base():
+    """Get optimal temporary directory for compilation (RAM-backed when available)."""
+    if platform.system() in ['Linux', 'Darwin'] and os.path.exists('/dev/shm'):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def _process_alive(pid):
+    """Check whether a process id belongs to a running process."""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running under another user
+    except OSError:
+        return False
+    return True
+
+
+def session_directory(prefix, parent=None, adopt=False):
+    """
+    Return this process's `<prefix>-<pid>` directory under `parent`.
+
+    Directories of processes that have exited are removed, so windows running
+    side by side never delete each other's files. With `adopt`, the first one
+    found is taken over instead, keeping its contents warm across a restart.
+
+    Args:
+        prefix (str): Directory name before the process id, e.g. "noctern_preview"
+        parent (str): Directory holding the session directories, get_temp_base() by default
+        adopt (bool): Rename a dead process's directory to this process's instead of deleting it
+    """
+    parent = parent or get_temp_base()
+    own = os.path.join(parent, f"{prefix}-{os.getpid()}")
+    pattern = re.compile(re.escape(prefix) + r'-(\d+)$')
+    try:
+        names = sorted(os.listdir(parent))
+    except OSError:
+        names = []
+    for name in names:
+        match = pattern.match(name)
+        if not match or _process_alive(int(match.group(1))):
+            continue
+        stale = os.path.join(parent, name)
+        if adopt and not os.path.exists(own):
+            try:
+                os.rename(stale, own)  # another process starting now may have taken it first
+                continue
+            except OSError:
+                pass
+        shutil.rmtree(stale, ignore_errors=True)
+    return own
+
+
+class BuildWorkspaceManager:
+    """
+    Manage persistent per-document build directories.
+
+    Workspaces are keyed by document path (or any stable key for unsaved
+    buffers) and tracked in LRU order. Each process works in its own base
+    directory; one left over by a process that has exited is adopted, so the
+    first preview after a restart is warm too.
+    """
+
+    def __init__(self, base_dir=None, max_total_bytes=DEFAULT_BUDGET_BYTES):
+        self.base_dir = base_dir or session_directory("noctern_workspaces", adopt=True)
+        self.max_total_bytes = max_total_bytes
+        self._workspaces = OrderedDict()  # workspace dir name -> path, in LRU order
+        self._lock = threading.Lock()
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._adopt_existing()
+
+    def _adopt_existing(self):
+        """Register workspaces found on disk, oldest first."""
+        try:
+            entries = [
+                entry for entry in os.scandir(self.base_dir)
+                if entry.is_dir()
+            ]
+        except OSError:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            self._workspaces[entry.name] = entry.path
+
+    @staticmethod
+    def _dir_name(document_key):
+        return hashlib.sha1(str(document_key).encode('utf-8')).hexdigest()[:16]
+
+    def acquire(self, document_key):
+        """
+        Return the workspace directory for a document, creating it if needed.
+
+        Args:
+            document_key (str): Document path or stable key for unsaved buffers.
+
+        Returns:
+            str: Absolute path of the workspace directory.
+        """
+        name = self._dir_name(document_key)
+        with self._lock:
+            path = self._workspaces.pop(name, None) or os.path.join(self.base_dir, name)
+            self._workspaces[name] = path
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def peek(self, document_key):
+        """Return a document's workspace path if it exists, without touching LRU order."""
+        with self._lock:
+            return self._workspaces.get(self._dir_name(document_key))
+
+    def release(self, document_key):
+        """Delete a document's workspace, e.g. when its tab is closed."""
+        name = self._dir_name(document_key)
+        with self._lock:
+            path = self._workspaces.pop(name, None)
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+            logs_console.log(f"Released preview workspace for {document_key}", level='DEBUG')
+
+    def enforce_budget(self, keep_key=None):
+        """
+        Evict least recently used workspaces until the total size fits the budget.
+
+        Args:
+            keep_key (str, optional): Document whose workspace must not be evicted.
+        """
+        keep_name = self._dir_name(keep_key) if keep_key is not None else None
+        with self._lock:
+            sizes = {name: _directory_size(path) for name, path in self._workspaces.items()}
+            total = sum(sizes.values())
+            for name in list(self._workspaces.keys()):
+                if total <= self.max_total_bytes:
+                    break
+                if name == keep_name:
+                    continue
+                path = self._workspaces.pop(name)
+                shutil.rmtree(path, ignore_errors=True)
+                total -= sizes[name]
+                logs_console.log(f"Evicted preview workspace {name} ({sizes[name] // 1024} KB)", level='DEBUG')
+
+    def total_size(self):
+        """Return the combined size of all workspaces in bytes."""
+        with self._lock:
+            paths = list(self._workspaces.values())
+        return sum(_directory_size(path) for path in paths)
+
+    def clear(self):
+        """Delete every workspace."""
+        with self._lock:
+            paths = list(self._workspaces.values())
+            self._workspaces.clear()
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def checkpoint_aux_files(workspace, jobname):
+    """Keep a copy of the auxiliary files produced by a successful compile."""
+    for ext in _AUX_EXTENSIONS:
+        path = os.path.join(workspace, jobname + ext)
+        if os.path.exists(path):
+            try:
+                shutil.copy2(path, path + _LAST_GOOD_SUFFIX)
+            except OSError as e:
+                logs_console.log(f"Aux checkpoint error: {e}", level='WARNING')
+
+
+def restore_aux_files(workspace, jobname):
+    """
+    Restore auxiliary files from the last successful compile.
+
+    A failed run can leave a truncated .aux behind that breaks the next
+    compile; rolling back keeps the workspace warm and valid.
+    """
+    for ext in _AUX_EXTENSIONS:
+        path = os.path.join(workspace, jobname + ext)
+        good_path = path + _LAST_GOOD_SUFFIX
+        try:
+            if os.path.exists(good_path):
+                shutil.copy2(good_path, path)
+            elif os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logs_console.log(f"Aux restore error: {e}", level='WARNING')
+
+
+def _directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
@@ -0,0 +1,179 @@
+"""
+Preview compile scheduler.
+Coalesce preview requests to the latest editor snapshot and cancel in-flight
+compiles that have gone stale, so the final PDF always matches the final text.
+"""
+
+import threading
+import time
+from utils import logs_console
+
+# Let a stale compile finish when it has used this share of its expected duration
+NEAR_COMPLETION_RATIO = 0.8
+
+# Weight of the newest sample in the compile duration average
+_DURATION_SMOOTHING = 0.3
+
+
+class CompileRequest:
+    """Editor snapshot to compile, with a handle to cancel its TeX process."""
+
+    def __init__(self, content, source_dir, document_key, generation, cache_key=None, source_content=None, files=None,
+                 engine="pdflatex", draft=False, debounce_key=None):
+        self.content = content
+        # Editor text the compiled content was derived from, for error reporting
+        self.source_content = content if source_content is None else source_content
+        # Unsaved project files compiled in place of their disk version, by relative path
+        self.files = files or {}
+        self.source_dir = source_dir
+        # TeX engine of the preview, and whether images are replaced by frames
+        self.engine = engine
+        self.draft = draft
+        self.document_key = document_key
+        # Editor tab the compile times are recorded for; its workspace key may name a root or focus document
+        self.debounce_key = document_key if debounce_key is None else debounce_key
+        self.generation = generation
+        self.cache_key = cache_key
+        self.submitted_at = time.time()
+        self.started_at = None
+        self._process = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def attach_process(self, process):
+        """Register the running process; kill it at once if already cancelled."""
+        with self._lock:
+            self._process = process
+            if self._cancelled:
+                process.kill()
+
+    def cancel(self):
+        """Cancel the request and kill its process if one is running."""
+        with self._lock:
+            self._cancelled = True
+            if self._process:
+                self._process.kill()
+
+
+class PreviewCompileScheduler:
+    """
+    Run at most one preview compile at a time with a single coalesced pending slot.
+
+    All public methods are called on the Tk main thread. `run_compile(request)`
+    runs on a worker thread and must skip posting results for cancelled
+    requests; `dispatch(func)` schedules a call back onto the main thread.
+    """
+
+    def __init__(self, run_compile, dispatch, on_state_change=None):
+        self.run_compile = run_compile
+        self.dispatch = dispatch
+        self.on_state_change = on_state_change
+        self.in_flight = None
+        self.pending = None
+        self._generation = 0
+        self._expected_duration = None
+
+        # Metrics
+        self.submitted_count = 0
+        self.coalesced_count = 0
+        self.completed_count = 0
+        self.wasted_count = 0
+
+    @property
+    def is_busy(self):
+        return self.in_flight is not None
+
+    @property
+    def queue_depth(self):
+        """Number of requests waiting or running."""
+        return int(self.in_flight is not None) + int(self.pending is not None)
+
+    def submit(self, content, source_dir, document_key, cache_key=None, source_content=None, files=None,
+               engine="pdflatex", draft=False, debounce_key=None):
+        """
+        Request a compile of the given snapshot.
+
+        A waiting request is replaced by the newer one. A running compile is
+        killed unless it is close to finishing, in which case its result is
+        shown before the newer snapshot is compiled.
+        """
+        self._generation += 1
+        self.submitted_count += 1
+        request = CompileRequest(content, source_dir, document_key, self._generation, cache_key, source_content, files,
+                                 engine, draft, debounce_key)
+
+        if self.pending is not None:
+            self.coalesced_count += 1
+        self.pending = request
+
+        if self.in_flight is None:
+            self._start_next()
+        elif not self.in_flight.cancelled and not self._is_near_completion(self.in_flight):
+            logs_console.log(f"Cancelling stale preview compile #{self.in_flight.generation}", level='DEBUG')
+            self.in_flight.cancel()
+            self.wasted_count += 1
+        self._notify_state()
+
+    def cancel_all(self):
+        """Drop the pending request and cancel the running one."""
+        self.pending = None
+        if self.in_flight and not self.in_flight.cancelled:
+            self.in_flight.cancel()
+            self.wasted_count += 1
+        self._notify_state()
+
+    def get_metrics(self):
+        """Return scheduler counters for display and tuning."""
+        return {
+            'queue_depth': self.queue_depth,
+            'submitted': self.submitted_count,
+            'coalesced': self.coalesced_count,
+            'completed': self.completed_count,
+            'wasted': self.wasted_count,
+            'expected_duration': self._expected_duration,
+        }
+
+    def _is_near_completion(self, request):
+        if not self._expected_duration or request.started_at is None:
+            return False
+        elapsed = time.time() - request.started_at
+        return elapsed >= self._expected_duration * NEAR_COMPLETION_RATIO
+
+    def _start_next(self):
+        request, self.pending = self.pending, None
+        if request is None:
+            return
+        self.in_flight = request
+        request.started_at = time.time()
+        threading.Thread(target=self._run, args=(request,), daemon=True).start()
+
+    def _run(self, request):
+        """Worker thread: compile, then hand control back to the main thread."""
+        try:
+            self.run_compile(request)
+        except Exception as e:
+            logs_console.log(f"Preview compile error: {e}", level='ERROR')
+        finally:
+            self.dispatch(lambda: self._on_finished(request))
+
+    def _on_finished(self, request):
+        """Main thread: record the outcome and start the next snapshot, if any."""
+        if not request.cancelled:
+            self.completed_count += 1
+            duration = time.time() - request.started_at
+            if self._expected_duration is None:
+                self._expected_duration = duration
+            else:
+                self._expected_duration += _DURATION_SMOOTHING * (duration - self._expected_duration)
+        if self.in_flight is request:
+            self.in_flight = None
+        self._start_next()
+        self._notify_state()
+
+    def _notify_state(self):
+        if self.on_state_change:
+            self.on_state_change()
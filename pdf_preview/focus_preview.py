@@ -0,0 +1,117 @@
+"""
+Section-scoped focus preview.
+Build a synthetic document containing only the preamble and the section under
+the cursor, with stub labels for references into the rest of the document.
+"""
+
+import re
+from dataclasses import dataclass
+from editor.structure import find_section_lines
+from pdf_preview.preamble_cache import split_preamble
+
+_LABEL = re.compile(r'\\label\s*\{([^}]+)\}')
+_REFERENCE = re.compile(r'\\(?:ref|eqref|pageref|autoref|nameref|cref|Cref|vref)\s*\{([^}]+)\}')
+_AUX_NEWLABEL = re.compile(r'^\\newlabel\{([^}]+)\}(.*)$', re.MULTILINE)
+_END_DOCUMENT = re.compile(r'^[^%\n]*\\end\s*\{document\}')
+
+
+@dataclass
+class FocusDocument:
+    """Synthetic source for a focus preview and the section it covers."""
+    content: str
+    title: str
+    start_line: int  # 1-based, first line of the section
+    end_line: int  # 1-based, last line of the section
+
+
+def read_aux_labels(aux_path):
+    """Read `\\newlabel` definitions from an .aux file, keyed by label name."""
+    try:
+        with open(aux_path, 'r', encoding='utf-8', errors='ignore') as f:
+            aux = f.read()
+    except OSError:
+        return {}
+    return {name: f"\\newlabel{{{name}}}{value}" for name, value in _AUX_NEWLABEL.findall(aux)}
+
+
+def build_focus_document(content, cursor_line, known_labels=None):
+    """
+    Build a document that only typesets the section containing `cursor_line`.
+
+    Every line outside the preamble and the focused section is replaced by a
+    comment line, so line numbers in logs and SyncTeX data match the editor.
+    Labels referenced from the section but defined elsewhere are declared on
+    a spare line, using their real values from `known_labels` when available.
+
+    Args:
+        content (str): Full document source.
+        cursor_line (int): 1-based line of the cursor.
+        known_labels (dict, optional): Label name -> `\\newlabel` line from a full compile.
+
+    Returns:
+        FocusDocument: The synthetic document, or None when the cursor is not
+        inside a \\section of the document body.
+    """
+    preamble, preamble_lines = split_preamble(content)
+    if preamble is None:
+        return None
+    lines = content.split('\n')
+    begin_index = preamble_lines  # 0-based line holding \begin{document}
+
+    end_index = len(lines)
+    for index in range(begin_index + 1, len(lines)):
+        if _END_DOCUMENT.match(lines[index]):
+            end_index = index
+            break
+
+    sections = [
+        (title, line) for section_type, title, line in find_section_lines(content)
+        if section_type == "section" and begin_index + 1 < line <= end_index
+    ]
+    current = None
+    for position, (title, line) in enumerate(sections):
+        if line <= cursor_line:
+            current = position
+    if current is None or cursor_line > end_index:
+        return None
+
+    title, start_line = sections[current]
+    end_line = sections[current + 1][1] - 1 if current + 1 < len(sections) else end_index
+    start, stop = start_line - 1, end_line  # 0-based slice of the section
+
+    focused = list(lines)
+    for index in range(begin_index + 1, end_index):
+        if not start <= index < stop:
+            focused[index] = '%'
+
+    stub = _label_stubs(lines[start:stop], preamble, known_labels or {})
+    # Number the section as in the full document
+    section_number = sum(1 for line in lines[begin_index:start] if re.match(r'\s*\\section\s*\{', line))
+    stub = f"\\setcounter{{section}}{{{section_number}}}" + stub
+    if start > begin_index + 1:
+        focused[start - 1] = stub + '%'
+    else:
+        focused[begin_index] = lines[begin_index] + stub + '%'
+
+    return FocusDocument('\n'.join(focused), title, start_line, end_line)
+
+
+def _label_stubs(section_lines, preamble, known_labels):
+    """Declare labels that the section references but does not define."""
+    section_text = '\n'.join(section_lines)
+    defined = set(_LABEL.findall(section_text))
+    referenced = []
+    for group in _REFERENCE.findall(section_text):
+        for name in group.split(','):
+            name = name.strip()
+            if name and name not in defined and name not in referenced:
+                referenced.append(name)
+
+    # hyperref's \newlabel takes five fields instead of two
+    placeholder = "{{?}{?}{}{}{}}" if 'hyperref' in preamble else "{{?}{?}}"
+    return ''.join(known_labels.get(name, f"\\newlabel{{{name}}}{placeholder}") for name in referenced)
+
+
+def focus_workspace_key(document_key):
+    """Key of the workspace used for focus compiles, kept apart from full previews."""
+    return f"{document_key}#focus"
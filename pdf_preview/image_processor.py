@@ -1,12 +1,30 @@
 """
 PDF Image Processing for Dark Mode Support.
-Handle color inversion and image optimization for dark themes.
+Handle color inversion and image optimization for dark themes. Pages rendered
+with PyMuPDF are inverted in the pixmap buffer while they are rasterized; the
+PIL inversion remains for the pdf2image fallback.
 """
 
 from PIL import Image, ImageOps
 import numpy as np
 from utils import logs_console
 
+try:
+    # Recent PyMuPDF prints a deprecation warning on stdout when imported as `fitz`
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF before 1.24
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+# Dark mode styles: invert everything, or invert everything but embedded photos
+DARK_MODE_INVERT, DARK_MODE_SMART = "invert", "smart"
+
+# Editor background the dark mode decision was last made for, and the decision
+_dark_mode_decision = None
+
 
 def invert_pdf_colors(image):
     """
@@ -41,9 +59,14 @@ def is_dark_mode_inversion_needed():
     """
     Check if dark mode color inversion should be applied to PDFs.
     
+    The luminance check is kept until the theme's editor background changes.
+    The viewer stores the result and asks again only when the theme or its
+    dark mode setting changes.
+    
     Returns:
         bool: True if current theme requires PDF color inversion
     """
+    global _dark_mode_decision
     try:
         from app import state
         theme_settings = state.get_theme_settings()
@@ -53,7 +76,10 @@ def is_dark_mode_inversion_needed():
             
         # Check if background is dark (indicating dark theme)
         editor_bg = theme_settings.get('editor_bg', '#FFFFFF')
+        if _dark_mode_decision is not None and _dark_mode_decision[0] == editor_bg:
+            return _dark_mode_decision[1]
         
+        needed = False
         # Simple luminance check for dark background
         if editor_bg.startswith('#'):
             # Convert hex to RGB
@@ -62,7 +88,9 @@ def is_dark_mode_inversion_needed():
             luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
             
             # If luminance is low (dark background), we need inversion
-            return luminance < 0.5
+            needed = luminance < 0.5
+        _dark_mode_decision = (editor_bg, needed)
+        return needed
             
     except Exception as e:
         logs_console.log(f"Error checking dark mode state: {e}", level='ERROR')
@@ -70,6 +98,42 @@ def is_dark_mode_inversion_needed():
     return False
 
 
+def photo_areas(page, matrix):
+    """
+    Pixel areas of the raster images drawn on a page, for smart dark mode.
+    
+    Args:
+        page (fitz.Page): Page being rendered
+        matrix (fitz.Matrix): Render matrix
+        
+    Returns:
+        list: fitz.IRect of each image, in the coordinates of pixmaps rendered with `matrix`
+    """
+    try:
+        return [(fitz.Rect(info['bbox']) * matrix).irect for info in page.get_image_info()]
+    except Exception as e:
+        logs_console.log(f"Error locating images on page: {e}", level='WARNING')
+        return []
+
+
+def darken_pixmap(pixmap, photos=()):
+    """
+    Invert a rendered PyMuPDF pixmap in place for dark mode.
+    
+    Args:
+        pixmap (fitz.Pixmap): Rendered page, band or tile
+        photos (list): Areas from photo_areas() to invert back, so photos keep their colors
+    """
+    # Invert the sample buffer in place; numpy is several times faster than
+    # Pixmap.invert_irect() or a PIL lookup table on a whole page
+    samples = np.frombuffer(pixmap.samples_mv, dtype=np.uint8)
+    np.invert(samples, out=samples)
+    for area in photos:
+        overlap = fitz.IRect(area) & pixmap.irect
+        if not overlap.is_empty:
+            pixmap.invert_irect(overlap)
+
+
 def apply_dark_mode_processing(image):
     """
     Apply dark mode processing to a PDF image if needed.
@@ -134,6 +134,16 @@ class PDFPreviewInterface:
         if tab and tab.file_path and self.preview_manager:
             self.preview_manager.load_existing_pdf(tab.file_path)
     
+    def on_tab_closed(self, tab):
+        """
+        Release preview resources held for a closed tab.
+        
+        Args:
+            tab: The editor tab that was closed
+        """
+        if tab and self.preview_manager:
+            self.preview_manager.release_document(tab)
+    
     def set_auto_refresh(self, enabled):
         """
         Enable or disable automatic PDF refresh.
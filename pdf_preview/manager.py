@@ -4,14 +4,25 @@ Manage PDF preview functionality including compilation triggering and status upd
 """
 
 import os
-import threading
-import time
-import subprocess
-import shutil
 import tempfile
-import platform
+import time
 from utils import logs_console
 from pdf_preview.viewer import PDFPreviewViewer
+from pdf_preview.build_workspace import (
+    BuildWorkspaceManager, DEFAULT_BUDGET_BYTES, checkpoint_aux_files, restore_aux_files, get_temp_base, session_directory
+)
+from pdf_preview.preamble_cache import PreambleFormatCache, strip_preamble, is_format_failure
+from pdf_preview.compile_scheduler import PreviewCompileScheduler
+from pdf_preview.result_cache import PreviewResultCache, compute_cache_key
+from pdf_preview.adaptive_debounce import AdaptiveDebounce, DEFAULT_CPU_BUDGET, DEFAULT_MIN_DELAY
+from pdf_preview.pdf_handoff import PDFHandoff
+from pdf_preview.focus_preview import build_focus_document, read_aux_labels, focus_workspace_key
+from latex.compile_client import create_process
+from latex.build_engine import mirror_source_directories, needs_rerun
+from latex.engines import DEFAULT_ENGINE, DRAFT_GRAPHICS_CODE, get_engine, select_engine
+from latex.structure_validator import StructureValidator
+from latex.project_graph import get_project_graph, write_overlay
+from latex_debug_system.stream_parser import StreamingLogParser
 
 
 class PDFPreviewManager:
@@ -33,21 +44,131 @@ class PDFPreviewManager:
         self.last_compilation_time = None
         self.compilation_status = "Not yet compiled"
         self.compilation_delay = self._get_compilation_delay()
+        self.debounce = AdaptiveDebounce(self._get_cpu_budget())
+        self.debounce_decision = None
         self.compilation_timer = None
         self.status_update_job = None
         self.auto_refresh_enabled = True
         
+        # Persistent per-document build directories, created on first compile
+        self.workspaces = None
+        
+        # Precompiled preamble formats per engine, created on first compile when enabled
+        self.preamble_caches = {}
+        
+        # Content already given its one extra pass for cross-references
+        self._rerun_content = None
+        
+        # Recent results by normalized content hash, created on first compile
+        self.result_cache = None
+        self._last_result_key = None
+        self._last_result_status = self.compilation_status
+        
+        # Focus preview compiles only the section under the cursor
+        self.focus_mode = False
+        self.focus_section = None
+        
+        # Root document compiled for a chapter tab, None when the tab is its own root
+        self.project_root = None
+        
+        # Compiled PDFs are published as numbered generations the viewer swaps to
+        self.pdf_handoff = PDFHandoff(session_directory("noctern_preview", tempfile.gettempdir()))
+        
+        # Cheap pre-check that keeps structurally broken buffers away from TeX
+        self.structure_validator = StructureValidator()
+        self._structure_issues_shown = False
+        
+        # One compile at a time; newer snapshots cancel or follow the running one
+        self.scheduler = PreviewCompileScheduler(
+            self._compile_from_memory,
+            lambda func: self.root_window.after(0, func),
+            on_state_change=self._on_scheduler_state_change,
+        )
+        
         self._update_status_label()
 
     def _get_compilation_delay(self):
-        """Get compilation delay from settings"""
+        """Get the minimum compilation delay from settings; the adaptive debounce lengthens it as needed"""
+        delay = None
         try:
             from app import state
-            if hasattr(state, 'settings_manager') and state.settings_manager:
-                return float(state.settings_manager.get('compilation_delay', '0.5'))
-        except (ImportError, ValueError, AttributeError):
+            # Older versions kept a user-set delay under 'compilation_delay' in the settings manager
+            if getattr(state, 'settings_manager', None):
+                delay = state.settings_manager.get('compilation_delay', None)
+        except ImportError:
             pass
-        return 0.5  # Default delay reduced to 0.5 seconds
+        if delay is None:
+            delay = self._get_setting('preview_min_delay', str(DEFAULT_MIN_DELAY))
+        try:
+            return max(0.0, float(delay))
+        except (TypeError, ValueError):
+            return DEFAULT_MIN_DELAY
+
+    def _get_cpu_budget(self):
+        """Get the share of wall time preview compiles may use, from a percentage setting"""
+        try:
+            percent = float(self._get_setting('preview_cpu_budget', str(int(DEFAULT_CPU_BUDGET * 100))))
+        except (TypeError, ValueError):
+            return DEFAULT_CPU_BUDGET
+        return min(1.0, max(0.01, percent / 100))
+
+    def _get_setting(self, key, default):
+        """Get a preview setting from the application config."""
+        try:
+            from app import state
+            return state.get_app_config().get(key, default)
+        except (ImportError, AttributeError):
+            return default
+
+    def _get_workspaces(self):
+        """Get the workspace manager, creating it with the configured size budget."""
+        if self.workspaces is None:
+            try:
+                budget = int(float(self._get_setting('preview_workspace_budget_mb', '256')) * 1024 * 1024)
+            except (TypeError, ValueError):
+                budget = DEFAULT_BUDGET_BYTES
+            self.workspaces = BuildWorkspaceManager(max_total_bytes=budget)
+        return self.workspaces
+
+    def _get_preamble_cache(self, engine=DEFAULT_ENGINE):
+        """Get the preamble format cache of an engine, or None when disabled or unsupported."""
+        from app.config import get_bool
+        if not get_bool(self._get_setting('preview_preamble_cache', 'True')):
+            return None
+        if not get_engine(engine).supports_formats:
+            return None
+        if engine not in self.preamble_caches:
+            self.preamble_caches[engine] = PreambleFormatCache(os.path.join(get_temp_base(), "noctern_formats"), engine=engine)
+        return self.preamble_caches[engine]
+
+    def _select_preview_engine(self, content, tex_path):
+        """Choose the preview engine and draft mode of a document from its magic comments and settings."""
+        from app.config import get_bool
+        return select_engine(
+            content, tex_path,
+            default=self._get_setting('latex_engine', DEFAULT_ENGINE),
+            preview_policy=self._get_setting('preview_engine_policy', 'same'),
+            preview_draft=get_bool(self._get_setting('preview_draft_graphics', 'False')),
+        )
+
+    def _get_result_cache(self):
+        """Get the preview result cache, or None when its budget is set to 0."""
+        try:
+            budget = int(float(self._get_setting('preview_result_cache_mb', '64')) * 1024 * 1024)
+        except (TypeError, ValueError):
+            budget = 64 * 1024 * 1024
+        if budget <= 0:
+            return None
+        if self.result_cache is None:
+            self.result_cache = PreviewResultCache(max_total_bytes=budget)
+        self.result_cache.max_total_bytes = budget
+        return self.result_cache
+
+    def _get_document_key(self, tab):
+        """Get the key identifying a tab's preview workspace."""
+        if tab.file_path:
+            return os.path.abspath(tab.file_path)
+        return f"untitled-{id(tab)}"
 
     def get_viewer(self):
         """Get current PDF viewer instance."""
@@ -60,92 +181,301 @@ class PDFPreviewManager:
         # Set the shared sync manager if available
         if hasattr(self, 'sync_manager') and self.sync_manager:
             self.viewer.sync_manager = self.sync_manager
+        self.viewer.on_focus_toggle = self.toggle_focus_mode
+        self.viewer.on_generation_displayed = self._on_generation_displayed
+        self.viewer.set_focus_mode(self.focus_mode)
         return self.viewer
 
     def trigger_compilation(self):
         if not self.auto_refresh_enabled: return
         
+        current_tab = self.get_current_tab()
+        if current_tab:
+            self.debounce.cpu_budget = self._get_cpu_budget()
+            decision = self.debounce.compute_delay(self._get_document_key(current_tab), self._get_compilation_delay())
+            self.compilation_delay = decision.delay
+            if decision != self.debounce_decision:
+                self.debounce_decision = decision
+                self._update_status_label()
+        
         if self.compilation_timer: self.root_window.after_cancel(self.compilation_timer)
         self.compilation_timer = self.root_window.after(int(self.compilation_delay * 1000), self._compile_document)
     
-    def _compile_document(self):
-        if self.is_compiling: return
+    def _compile_document(self, force=False):
+        """
+        Snapshot the current editor and hand it to the compile scheduler.
+        
+        Buffers with fatal structural errors are reported without running TeX,
+        content that normalizes to the last shown result is skipped, and content
+        seen recently is served from the result cache.
+        """
+        self.compilation_timer = None
         current_tab = self.get_current_tab()
         if not current_tab: return
-            
-        self.is_compiling = True
-        self.compilation_status = "Compiling..."
-        self._update_status_label()
         
         try:
             editor_content = current_tab.editor.get("1.0", "end-1c")
             source_dir = os.path.dirname(current_tab.file_path) if current_tab.file_path else None
+            document_key = tab_key = self._get_document_key(current_tab)
+            if not self._check_structure(current_tab, editor_content):
+                return
             
-            comp_thread = threading.Thread(target=self._compile_from_memory, args=(editor_content, source_dir), daemon=True)
-            comp_thread.start()
+            compile_content = editor_content
+            project_files = None
+            self.project_root = None
+            if current_tab.file_path:
+                root_path, project_files = self._resolve_project(current_tab.file_path)
+                if root_path != document_key:
+                    # A chapter previews through its root document
+                    self.project_root = root_path
+                    compile_content = get_project_graph().read(root_path) or ""
+                    source_dir = os.path.dirname(root_path)
+                    document_key = root_path
             
+            self.focus_section = None
+            if self.focus_mode and not self.project_root:
+                focus = self._build_focus_document(current_tab, editor_content, document_key)
+                if focus:
+                    self.focus_section = focus
+                    compile_content = focus.content
+                    document_key = focus_workspace_key(document_key)
+            selection = self._select_preview_engine(compile_content, self.project_root or current_tab.file_path)
+            engine = selection.preview.name
+            cache_key = compute_cache_key(
+                compile_content, source_dir, engine=engine + ("-draft" if selection.preview_draft else ""),
+                files=project_files,
+            )
+            
+            if not force:
+                if cache_key == self._last_result_key:
+                    # Only comments or whitespace changed since the shown result
+                    self.scheduler.cancel_all()
+                    return
+                result_cache = self._get_result_cache()
+                cached = result_cache.get(cache_key) if result_cache else None
+                if cached:
+                    self.scheduler.cancel_all()
+                    self._show_cached_result(cached, editor_content, cache_key)
+                    return
+            
+            self.scheduler.submit(compile_content, source_dir, document_key, cache_key,
+                                  source_content=compile_content if self.project_root else editor_content,
+                                  files=project_files, engine=engine, draft=selection.preview_draft,
+                                  debounce_key=tab_key)
         except Exception as e:
             logs_console.log(f"Error preparing compilation: {e}", level='ERROR')
-            self.is_compiling = False
 
+    def _resolve_project(self, file_path):
+        """
+        Find the root document of a file and the unsaved project buffers to compile.
 
-    def _compile_from_memory(self, latex_content, source_dir):
-        """Compile LaTeX content in temporary memory location"""
+        Returns:
+            tuple: (root path, {path relative to the root: unsaved buffer text})
+        """
+        graph = get_project_graph()
         try:
-            temp_base = self._get_temp_base()
+            from app import state
+            graph.sync_buffers(state.get_open_buffers())
+        except Exception as e:
+            logs_console.log(f"Could not read open buffers: {e}", level='DEBUG')
+        root_path = graph.find_root(file_path)
+        files = graph.unsaved_snapshots(root_path)
+        # The root itself is compiled as preview.tex
+        files.pop(os.path.basename(root_path), None)
+        return root_path, files
+
+    def toggle_focus_mode(self):
+        """Switch between compiling the section under the cursor and the whole document."""
+        self.set_focus_mode(not self.focus_mode)
+
+    def set_focus_mode(self, enabled):
+        """Enable or disable focus preview and recompile right away."""
+        self.focus_mode = bool(enabled)
+        if self.viewer:
+            self.viewer.set_focus_mode(self.focus_mode)
+        logs_console.log(f"Focus preview {'enabled' if self.focus_mode else 'disabled'}", level='ACTION')
+        self._last_result_key = None
+        if self.compilation_timer:
+            self.root_window.after_cancel(self.compilation_timer)
+        self._compile_document()
+
+    def _build_focus_document(self, tab, latex_content, document_key):
+        """Build the focus document for the cursor position, or None to compile everything."""
+        try:
+            cursor_line = int(tab.editor.index("insert").split('.')[0])
+        except Exception:
+            return None
+        # Labels from the last full preview give references outside the section real numbers
+        known_labels = {}
+        full_workspace = self.workspaces.peek(document_key) if self.workspaces else None
+        if full_workspace:
+            known_labels = read_aux_labels(os.path.join(full_workspace, "preview.aux"))
+        return build_focus_document(latex_content, cursor_line, known_labels)
+
+    def _check_structure(self, tab, latex_content):
+        """Run the structural pre-check; return False if compiling is pointless."""
+        issues = self.structure_validator.validate(latex_content)
+        if not issues and not self._structure_issues_shown:
+            return True
+        
+        self._structure_issues_shown = bool(issues)
+        try:
+            from app import state
+            debug_coordinator = getattr(state, 'debug_coordinator', None)
+            if debug_coordinator:
+                debug_coordinator.report_structural_issues(issues, tab.file_path or "preview.tex", latex_content)
+        except Exception as e:
+            logs_console.log(f"Debug system notification error: {e}", level='WARNING')
+        
+        if not issues:
+            return True
+        first = issues[0]
+        logs_console.log(f"Preview compile skipped: line {first.line}: {first.message}", level='DEBUG')
+        self.scheduler.cancel_all()
+        self.compilation_status = f"Not compilable (line {first.line}: {first.message})"
+        self._last_result_status = self.compilation_status
+        self._last_result_key = None
+        if self.viewer:
+            self.viewer.set_compilation_status("Not compilable", self.last_compilation_time)
+        self._update_status_label()
+        return False
+
+    def _show_cached_result(self, cached, latex_content, cache_key):
+        """Display a stored result as if it had just been compiled."""
+        pdf_path, synctex_path = cached
+        generation = self.pdf_handoff.publish(pdf_path, synctex_path)
+        logs_console.log("Preview served from result cache", level='DEBUG')
+        self._on_compilation_success(generation, "", latex_content, cache_key)
+
+    def _on_scheduler_state_change(self):
+        """Reflect scheduler activity in the status label."""
+        self.is_compiling = self.scheduler.is_busy
+        if self.is_compiling:
+            self.compilation_status = "Compiling..."
+            if self.scheduler.pending is not None:
+                self.compilation_status = "Compiling... (newer edit queued)"
+            self._update_status_label()
+        elif self.compilation_status.startswith("Compiling"):
+            # Everything in flight was cancelled; show the last real result again
+            self.compilation_status = self._last_result_status
+            self._update_status_label()
+
+    def get_compile_metrics(self):
+        """Return preview scheduler metrics (queue depth, wasted compiles, ...)."""
+        return self.scheduler.get_metrics()
+
+    def _compile_from_memory(self, request):
+        """Compile LaTeX content in the document's persistent memory-backed workspace"""
+        latex_content = request.content
+        source_dir = request.source_dir
+        document_key = request.document_key
+        try:
+            workspaces = self._get_workspaces()
+            temp_dir = workspaces.acquire(document_key)
             
-            with tempfile.TemporaryDirectory(dir=temp_base, prefix='noctern_') as temp_dir:
-                self._setup_compilation_files(temp_dir, latex_content, source_dir)
-                result = self._execute_latex_compilation(temp_dir, source_dir)
-                self._process_compilation_result(temp_dir, result, latex_content)
+            start_time = time.time()
+            format_base, preamble_lines = None, 0
+            preamble_cache = self._get_preamble_cache(request.engine)
+            if preamble_cache:
+                format_base, preamble_lines = preamble_cache.get_format(latex_content, source_dir,
+                                                                        attach_process=request.attach_process)
+            
+            self._setup_compilation_files(temp_dir, latex_content, source_dir, preamble_lines, request.files)
+            result = self._execute_latex_compilation(temp_dir, source_dir, format_base, request)
+            
+            # Fall back to the normal path if the cached format cannot be loaded
+            if format_base and result.returncode != 0 and not result.cancelled:
+                output = self._read_log_file(temp_dir) + result.output
+                if is_format_failure(output):
+                    logs_console.log("Preamble format rejected by TeX; recompiling without it", level='WARNING')
+                    preamble_cache.invalidate(latex_content, source_dir)
+                    format_base = None
+                    self._setup_compilation_files(temp_dir, latex_content, source_dir, files=request.files)
+                    result = self._execute_latex_compilation(temp_dir, source_dir, request=request)
+            
+            if result.cancelled or request.cancelled:
+                # A newer snapshot superseded this one; keep the workspace valid and show nothing
+                restore_aux_files(temp_dir, "preview")
+                logs_console.log(f"Preview compile #{request.generation} cancelled after {time.time() - start_time:.2f}s", level='DEBUG')
+                return
+            
+            self.debounce.record_compile(request.debounce_key, time.time() - start_time)
+            mode = f"{request.engine}, precompiled preamble" if format_base else f"{request.engine}, full preamble"
+            logs_console.log(f"Preview compiled in {time.time() - start_time:.2f}s (warm workspace, {mode})", level='DEBUG')
+            self._process_compilation_result(temp_dir, result, request.source_content, request.cache_key)
+            
+            workspaces.enforce_budget(keep_key=document_key)
                     
         except Exception as e:
             logs_console.log(f"Memory compilation error: {e}", level='ERROR')
-            self.root_window.after(0, self._on_compilation_failure, "", latex_content)
+            if not request.cancelled:
+                self.root_window.after(0, self._on_compilation_failure, "", request.source_content, request.cache_key)
 
-    def _get_temp_base(self):
-        """Get optimal temporary directory for compilation"""
-        if platform.system() in ['Linux', 'Darwin'] and os.path.exists('/dev/shm'):
-            return '/dev/shm'
-        return tempfile.gettempdir()
-
-    def _setup_compilation_files(self, temp_dir, latex_content, source_dir):
-        """Setup files required for compilation"""        
+    def _setup_compilation_files(self, temp_dir, latex_content, source_dir, preamble_lines=0, files=None):
+        """Setup files required for compilation, stripping a preamble that is precompiled"""
+        # Unsaved project files sit next to preview.tex, where TeX looks before the source directory
+        write_overlay(temp_dir, files or {})
+        # \include'd chapters write their .aux files to matching subdirectories of the workspace
+        if source_dir:
+            mirror_source_directories(source_dir, temp_dir)
+        
+        # Drop outputs of the previous run so a failed compile never reuses them
+        for stale_name in ("preview.pdf", "preview.log"):
+            stale_path = os.path.join(temp_dir, stale_name)
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        
+        if preamble_lines:
+            latex_content = strip_preamble(latex_content, preamble_lines)
+        
         tex_file = os.path.join(temp_dir, "preview.tex")
         with open(tex_file, 'w', encoding='utf-8') as f:
             f.write(latex_content)
 
-    def _execute_latex_compilation(self, temp_dir, source_dir=None):
-        """Execute pdflatex compilation in temporary directory with SyncTeX support"""
-        cmd = ["pdflatex", "-synctex=1", "-interaction=nonstopmode"]
+    def _execute_latex_compilation(self, temp_dir, source_dir=None, format_base=None, request=None):
+        """Execute the preview engine in temporary directory with SyncTeX support"""
+        profile = get_engine(request.engine if request else DEFAULT_ENGINE)
         
         # Add source directory to search path if provided
+        extra_args = []
         if source_dir:
-            cmd.extend([f"-include-directory={source_dir}", f"-aux-directory={temp_dir}"])
+            extra_args = [f"-include-directory={source_dir}", f"-aux-directory={temp_dir}"]
         
-        cmd.append("preview.tex")
-        
-        return subprocess.run(
-            cmd,
-            cwd=temp_dir,
-            capture_output=True, 
-            timeout=60, 
-            check=False
+        # A precompiled preamble replaces the default LaTeX format; draft previews draw image frames
+        cmd = profile.command(
+            "preview.tex", synctex=True, format_base=format_base, extra_args=extra_args,
+            preamble_code=DRAFT_GRAPHICS_CODE if request and request.draft else None,
         )
+        
+        process = create_process(cmd, cwd=temp_dir, timeout=60)
+        # Stop TeX as soon as the output shows it cannot produce a useful preview
+        log_parser = StreamingLogParser(fatal_markers=profile.fatal_markers)
+        process.on_line = lambda line: log_parser.feed(line) and process.kill()
+        if request:
+            request.attach_process(process)
+        result = log_parser.aborted_result(process.run())
+        if result.abort_reason:
+            logs_console.log(f"Preview compile stopped early: {result.abort_reason}", level='DEBUG')
+        return result
 
-    def _process_compilation_result(self, temp_dir, result, latex_content):
+    def _process_compilation_result(self, temp_dir, result, latex_content, cache_key=None):
         """Process compilation result and handle success or failure"""
-        log_content = self._read_log_file(temp_dir)
+        # A killed run may leave its log unflushed; its streamed output has the errors
+        log_content = result.output if result.abort_reason else self._read_log_file(temp_dir)
         pdf_path = os.path.join(temp_dir, "preview.pdf")
         synctex_path = os.path.join(temp_dir, "preview.synctex.gz")
         success = result.returncode == 0 and os.path.exists(pdf_path)
         
         if success:
-            persistent_pdf = self._save_preview_pdf(pdf_path)
-            persistent_synctex = self._save_synctex_file(synctex_path) if os.path.exists(synctex_path) else None
-            self.root_window.after(0, self._on_compilation_success, persistent_pdf, log_content, latex_content, persistent_synctex)
+            checkpoint_aux_files(temp_dir, "preview")
+            result_cache = self._get_result_cache()
+            if result_cache and cache_key:
+                result_cache.put(cache_key, pdf_path, synctex_path)
+            generation = self.pdf_handoff.publish(pdf_path, synctex_path)
+            self.root_window.after(0, self._on_compilation_success, generation, log_content, latex_content, cache_key)
         else:
-            self.root_window.after(0, self._on_compilation_failure, log_content, latex_content)
+            restore_aux_files(temp_dir, "preview")
+            self.root_window.after(0, self._on_compilation_failure, log_content, latex_content, cache_key)
 
     def _read_log_file(self, temp_dir):
         """Read compilation log file"""
@@ -161,40 +491,38 @@ class PDFPreviewManager:
             return ""
 
 
-    def _save_preview_pdf(self, pdf_path):
-        """Save preview PDF to persistent location and return path"""
-        persistent_dir = os.path.join(tempfile.gettempdir(), "noctern_preview")
-        os.makedirs(persistent_dir, exist_ok=True)
-        persistent_pdf = os.path.join(persistent_dir, "preview.pdf")
-        shutil.copy2(pdf_path, persistent_pdf)
-        return persistent_pdf
-
-    def _save_synctex_file(self, synctex_path):
-        """Save SyncTeX file to persistent location and return path"""
-        persistent_dir = os.path.join(tempfile.gettempdir(), "noctern_preview")
-        os.makedirs(persistent_dir, exist_ok=True)
-        persistent_synctex = os.path.join(persistent_dir, "preview.synctex.gz")
-        shutil.copy2(synctex_path, persistent_synctex)
-        return persistent_synctex
-
-    def _on_compilation_success(self, pdf_path, log_content="", latex_content="", synctex_path=None):
-        """Handle successful compilation"""
-        self.is_compiling = False
+    def _on_generation_displayed(self, generation):
+        """Keep the files of the generation on screen; older ones can be deleted."""
+        self.pdf_handoff.set_displayed(generation)
+
+    def _on_compilation_success(self, generation, log_content="", latex_content="", cache_key=None):
+        """Handle successful compilation of a published PDF generation"""
         self.last_compilation_time = time.time()
         self.compilation_status = "Compilable"
+        self._last_result_status = self.compilation_status
+        self._last_result_key = cache_key
         
         if self.viewer:
-            self.viewer.load_pdf(pdf_path, synctex_path)
+            self.viewer.load_pdf(generation.pdf_path, generation.synctex_path, generation=generation)
             self.viewer.set_compilation_status("Compilable", self.last_compilation_time)
         self._start_status_updates()
         
-        self._save_successful_version(latex_content)
+        # A focused or root-document compile says nothing about the current tab alone
+        if not self.focus_section and not self.project_root:
+            self._save_successful_version(latex_content)
         self._notify_debug_system(True, log_content, latex_content)
+        
+        # The workspace keeps its aux files, so one more pass settles references
+        if needs_rerun(log_content) and self.scheduler.pending is None and latex_content != self._rerun_content:
+            self._rerun_content = latex_content
+            logs_console.log("Preview log requested a rerun; compiling once more", level='DEBUG')
+            self._compile_document(force=True)
 
-    def _on_compilation_failure(self, log_content="", latex_content=""):
+    def _on_compilation_failure(self, log_content="", latex_content="", cache_key=None):
         """Handle compilation failure"""
-        self.is_compiling = False
         self.compilation_status = "Not compilable"
+        self._last_result_status = self.compilation_status
+        self._last_result_key = cache_key
         if self.viewer:
             self.viewer.set_compilation_status("Not compilable", self.last_compilation_time)
         self._stop_status_updates()
@@ -265,13 +593,23 @@ class PDFPreviewManager:
                 else:
                     time_ago = f"Last PDF output {minutes} minutes ago"
         
+        if self.focus_section:
+            status_text += f" (focus: {self.focus_section.title}, lines {self.focus_section.start_line}-{self.focus_section.end_line})"
         full_text = f"{time_ago}\n{status_text}" if time_ago else status_text
+        if self.debounce_decision:
+            full_text += f"\nPreview delay {self.debounce_decision.delay:.1f}s ({self.debounce_decision.reason})"
         self.header_label.config(text=full_text)
 
+        if self.status_update_job:
+            self.root_window.after_cancel(self.status_update_job)
+            self.status_update_job = None
         if self.compilation_status == "Compilable":
             self.status_update_job = self.root_window.after(1000, self._update_status_label)
 
     def on_editor_change(self):
+        current_tab = self.get_current_tab()
+        if current_tab:
+            self.debounce.record_keystroke(self._get_document_key(current_tab))
         self.trigger_compilation()
     
     def refresh_preview(self):
@@ -284,6 +622,8 @@ class PDFPreviewManager:
             self.viewer.load_pdf(pdf_path)
             self.last_compilation_time = os.path.getmtime(pdf_path)
             self.compilation_status = "Compilable"
+            self._last_result_status = self.compilation_status
+            self._last_result_key = None
             self.viewer.set_compilation_status("Compilable", self.last_compilation_time)
             self._start_status_updates()
 
@@ -338,12 +678,23 @@ class PDFPreviewManager:
         except Exception as e:
             logs_console.log(f"Auto-compilation: Error in _handle_compilation_failure: {e}", level='ERROR')
 
+    def release_document(self, tab):
+        """Delete the preview workspace of a closed tab."""
+        if not tab:
+            return
+        document_key = self._get_document_key(tab)
+        self.debounce.forget(document_key)
+        if self.workspaces:
+            self.workspaces.release(document_key)
+            self.workspaces.release(focus_workspace_key(document_key))
+
     def set_auto_refresh(self, enabled):
         self.auto_refresh_enabled = enabled
     
     def update_compilation_delay(self):
-        """Update compilation delay from settings"""
+        """Update compilation delay and CPU budget from settings"""
         self.compilation_delay = self._get_compilation_delay()
+        self.debounce.cpu_budget = self._get_cpu_budget()
         
     def navigate_to_exact_line(self, line_number: int, source_text: str = "", 
                               context_before: str = "", context_after: str = "", 
@@ -379,13 +730,10 @@ class PDFPreviewManager:
         if not pdf_path:
             return None
             
-        # Try persistent SyncTeX first
-        import tempfile
-        persistent_dir = os.path.join(tempfile.gettempdir(), "noctern_preview")
-        synctex_path = os.path.join(persistent_dir, "preview.synctex.gz")
-        
-        if os.path.exists(synctex_path):
-            return synctex_path
+        # Preview generations carry their own SyncTeX file
+        generation = self.pdf_handoff.find(pdf_path)
+        if generation and generation.synctex_path and os.path.exists(generation.synctex_path):
+            return generation.synctex_path
             
         # Try alongside PDF
         base_path = os.path.splitext(pdf_path)[0]
@@ -0,0 +1,101 @@
+"""
+Page fingerprints for incremental preview reloads.
+Hash what a PDF page draws, so the viewer can keep its renders of the pages a
+recompile did not change and only rasterize the others.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from utils import logs_console
+
+# Font subset tags ("ABCDEF+CMR10") change whenever any page adds a glyph
+_SUBSET_TAG = re.compile(r'^[A-Z]{6}\+')
+
+
+def page_fingerprint(document, page, stream_digests=None):
+    """
+    Fingerprint one page of an open PyMuPDF document.
+
+    The hash covers the page geometry, its content streams, the streams of
+    the images and form XObjects it draws and the fonts it uses (without
+    subset tags). Object numbers are not part of it, since they shift between
+    compiles even when a page looks the same.
+
+    Args:
+        document (fitz.Document): Document the page belongs to.
+        page (fitz.Page): Page to fingerprint.
+        stream_digests (dict, optional): xref -> digest memo shared across the
+            pages of one document, so shared images are hashed once.
+
+    Returns:
+        str: Hex digest.
+    """
+    stream_digests = {} if stream_digests is None else stream_digests
+    digest = hashlib.sha1()
+    digest.update(f"{tuple(page.rect)}:{page.rotation}\n".encode('utf-8'))
+    digest.update(page.read_contents())
+
+    xrefs = [(name, xref) for xref, name, *_ in page.get_xobjects()]
+    xrefs += [(image[7], image[0]) for image in page.get_images(full=True)]
+    for name, xref in sorted(xrefs):
+        if xref not in stream_digests:
+            stream_digests[xref] = hashlib.sha1(document.xref_stream_raw(xref) or b"").hexdigest()
+        digest.update(f"\n{name}:{stream_digests[xref]}".encode('utf-8'))
+
+    for font in sorted(page.get_fonts(full=False), key=lambda font: font[4]):
+        _, _, font_type, base_font, resource_name, encoding = font[:6]
+        digest.update(f"\n{resource_name}:{font_type}:{_SUBSET_TAG.sub('', base_font)}:{encoding}".encode('utf-8'))
+
+    for annotation in page.annots() or ():
+        digest.update(f"\n{annotation.type[0]}:{tuple(annotation.rect)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def fingerprint_document(document):
+    """
+    Fingerprint every page of an open PyMuPDF document.
+
+    Returns:
+        list: One digest per page, or None when the document cannot be read.
+    """
+    stream_digests = {}
+    try:
+        return [page_fingerprint(document, page, stream_digests) for page in document]
+    except Exception as e:
+        logs_console.log(f"Could not fingerprint PDF pages: {e}", level='WARNING')
+        return None
+
+
+@dataclass
+class PageReuse:
+    """Outcome of matching a new PDF's pages against the displayed one."""
+    mapping: dict  # new page number -> old page number with the same fingerprint
+    unchanged: int  # pages of the new PDF that look like a page of the old one
+    changed: int  # pages that must be rendered again
+
+    def describe(self, kept, total_cached):
+        return (f"{self.unchanged} unchanged, {self.changed} changed; "
+                f"{kept} of {total_cached} cached pages reused")
+
+
+def match_pages(old_fingerprints, new_fingerprints):
+    """
+    Map pages of a new PDF to identical pages of the previous one.
+
+    A page keeps its own number when it did not change; otherwise any old page
+    with the same fingerprint is used, so pages that only moved are reused too.
+    """
+    old_fingerprints = old_fingerprints or []
+    new_fingerprints = new_fingerprints or []
+    by_fingerprint = {}
+    for number, fingerprint in enumerate(old_fingerprints, 1):
+        by_fingerprint.setdefault(fingerprint, number)
+
+    mapping = {}
+    for number, fingerprint in enumerate(new_fingerprints, 1):
+        if number <= len(old_fingerprints) and old_fingerprints[number - 1] == fingerprint:
+            mapping[number] = number
+        elif fingerprint in by_fingerprint:
+            mapping[number] = by_fingerprint[fingerprint]
+    return PageReuse(mapping, len(mapping), len(new_fingerprints) - len(mapping))
@@ -0,0 +1,131 @@
+"""
+Virtual layout of the pages of a previewed PDF.
+Every page is assumed to have the size of the first one until its real size is
+known, so opening a document costs the same whatever its page count; page
+positions are computed on demand from the few pages whose size differs.
+"""
+
+import bisect
+from collections.abc import Mapping
+
+PAGE_MARGIN = 10  # Space above the first page and left of every page
+PAGE_GAP = 10  # Space below every page
+
+
+class VirtualPageLayout(Mapping):
+    """
+    Vertical stack of pages at a zoom level.
+
+    Sizes are given in pixels at the viewer's base resolution and scaled by
+    the zoom. Reading `layout[page_num]` returns a fresh dict with the page's
+    display 'y_offset', 'width' and 'height'.
+    """
+
+    def __init__(self, page_count=0, default_size=(0, 0), zoom=1.0):
+        self.reset(page_count, default_size, zoom)
+
+    def reset(self, page_count, default_size, zoom=None):
+        """Lay out `page_count` pages of `default_size`, forgetting every refined size."""
+        self.page_count = page_count
+        self.default_size = default_size
+        if zoom is not None:
+            self.zoom = zoom
+        self._sizes = {}  # page_num -> (width, height) of pages whose size is known
+        self._invalidate()
+
+    def clear(self):
+        self.reset(0, (0, 0))
+
+    def set_zoom(self, zoom):
+        self.zoom = zoom
+        self._invalidate()
+
+    def is_known(self, page_num):
+        """True when the page's own size was given with `refine()`."""
+        return page_num in self._sizes
+
+    def refine(self, page_num, width, height):
+        """
+        Record the real size of a page.
+
+        Returns:
+            int: How far the pages below it moved, in display pixels.
+        """
+        before = self._display_size(page_num)[1]
+        self._sizes[page_num] = (width, height)
+        self._invalidate()
+        return self._display_size(page_num)[1] - before
+
+    def offset(self, page_num):
+        """Display y coordinate of the top of a page."""
+        self._build_index()
+        default_height = self._display_size(None)[1]
+        # Pages with their own size above this one shift it by their height difference
+        shift = self._shifts[bisect.bisect_left(self._refined, page_num)]
+        return PAGE_MARGIN + (page_num - 1) * (default_height + PAGE_GAP) + shift
+
+    def page_at(self, y):
+        """Page whose area (including the gap below it) contains display y, clamped to the document."""
+        if not self.page_count:
+            return None
+        low, high = 1, self.page_count
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.offset(middle) <= y:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def pages_between(self, top, bottom):
+        """Page numbers overlapping the display range [top, bottom], in order."""
+        if not self.page_count:
+            return []
+        pages = []
+        page_num = self.page_at(top)
+        while page_num <= self.page_count and self.offset(page_num) <= bottom:
+            if self.offset(page_num) + self._display_size(page_num)[1] >= top:
+                pages.append(page_num)
+            page_num += 1
+        return pages
+
+    @property
+    def total_height(self):
+        if not self.page_count:
+            return 0
+        return self.offset(self.page_count) + self._display_size(self.page_count)[1] + PAGE_GAP
+
+    @property
+    def max_width(self):
+        widths = [self._display_size(page_num)[0] for page_num in self._sizes] + [self._display_size(None)[0]]
+        return max(widths)
+
+    def __getitem__(self, page_num):
+        if not isinstance(page_num, int) or not 1 <= page_num <= self.page_count:
+            raise KeyError(page_num)
+        width, height = self._display_size(page_num)
+        return {'y_offset': self.offset(page_num), 'width': width, 'height': height}
+
+    def __iter__(self):
+        return iter(range(1, self.page_count + 1))
+
+    def __len__(self):
+        return self.page_count
+
+    def _display_size(self, page_num):
+        width, height = self._sizes.get(page_num, self.default_size)
+        return int(width * self.zoom), int(height * self.zoom)
+
+    def _invalidate(self):
+        self._refined = None
+        self._shifts = None
+
+    def _build_index(self):
+        """Sorted pages with their own size and the running height difference they add."""
+        if self._refined is not None:
+            return
+        default_height = self._display_size(None)[1]
+        self._refined = sorted(page_num for page_num in self._sizes if page_num <= self.page_count)
+        self._shifts = [0]
+        for page_num in self._refined:
+            self._shifts.append(self._shifts[-1] + self._display_size(page_num)[1] - default_height)
@@ -0,0 +1,96 @@
+"""
+Tiled rendering of zoomed-in preview pages.
+A page whose bitmap would be larger than TILED_PAGE_PIXELS is rasterized in
+square tiles, and only the tiles that intersect the viewport are rendered.
+A low-resolution render of the whole page provides stand-ins for the tiles
+that have not arrived yet.
+"""
+
+from PIL import Image
+from pdf_preview.image_processor import DARK_MODE_SMART, darken_pixmap, photo_areas
+
+try:
+    # Recent PyMuPDF prints a deprecation warning on stdout when imported as `fitz`
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF before 1.24
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+TILE_SIZE = 512
+
+# Pages up to this many display pixels (A4 at about 170% zoom) are still rendered whole
+TILED_PAGE_PIXELS = 6_000_000
+
+# Resolution of the whole-page render that stands in for missing tiles
+BACKDROP_DPI = 72
+
+
+def needs_tiles(width, height):
+    """True when a page displayed at width x height pixels should be rendered in tiles."""
+    return width * height > TILED_PAGE_PIXELS
+
+
+def tile_box(tile, width, height, tile_size=TILE_SIZE):
+    """Pixel box (x0, y0, x1, y1) of a (column, row) tile within a width x height page."""
+    column, row = tile
+    x0, y0 = column * tile_size, row * tile_size
+    return x0, y0, min(width, x0 + tile_size), min(height, y0 + tile_size)
+
+
+def tiles_in_view(width, height, view, tile_size=TILE_SIZE):
+    """
+    Tiles of a width x height page that intersect `view`.
+
+    Args:
+        view (tuple): (x0, y0, x1, y1) of the visible area, relative to the page's top-left corner.
+
+    Returns:
+        list: (column, row) tuples, those nearest the middle of the view first.
+    """
+    x0, y0 = max(0, view[0]), max(0, view[1])
+    x1, y1 = min(width, view[2]), min(height, view[3])
+    if x0 >= x1 or y0 >= y1:
+        return []
+    center = ((x0 + x1) / 2, (y0 + y1) / 2)
+    tiles = [(column, row)
+             for row in range(int(y0 // tile_size), int((y1 - 1) // tile_size) + 1)
+             for column in range(int(x0 // tile_size), int((x1 - 1) // tile_size) + 1)]
+
+    def distance(tile):
+        box = tile_box(tile, width, height, tile_size)
+        return abs((box[0] + box[2]) / 2 - center[0]) + abs((box[1] + box[3]) / 2 - center[1])
+    return sorted(tiles, key=distance)
+
+
+def render_tile_image(document, page_num, dpi, tile, tile_size=TILE_SIZE, dark=False):
+    """
+    Rasterize one tile of a page through a PyMuPDF clip rectangle, inverted for dark mode when `dark` is set.
+
+    Returns:
+        PIL.Image: RGB image of the tile, sized exactly like its tile_box().
+    """
+    page = document[page_num - 1]
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    area = (page.rect * matrix).irect
+    x0, y0, x1, y1 = tile_box(tile, area.width, area.height, tile_size)
+    clip = fitz.Rect(page.rect.x0 + x0 / zoom, page.rect.y0 + y0 / zoom,
+                     page.rect.x0 + x1 / zoom, page.rect.y0 + y1 / zoom)
+    pixmap = page.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+    if dark:
+        darken_pixmap(pixmap, photo_areas(page, matrix) if dark == DARK_MODE_SMART else ())
+    image = Image.new("RGB", (x1 - x0, y1 - y0), "white")
+    strip = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    image.paste(strip, (pixmap.x - area.x0 - x0, pixmap.y - area.y0 - y0))
+    return image
+
+
+def crop_backdrop(backdrop, tile, width, height, tile_size=TILE_SIZE):
+    """Cut the part of a low-resolution page render under a tile and scale it to the tile's size."""
+    x0, y0, x1, y1 = tile_box(tile, width, height, tile_size)
+    scale_x, scale_y = backdrop.width / width, backdrop.height / height
+    return backdrop.resize((x1 - x0, y1 - y0), Image.Resampling.BILINEAR,
+                           box=(x0 * scale_x, y0 * scale_y, x1 * scale_x, y1 * scale_y))
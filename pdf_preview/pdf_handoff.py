@@ -0,0 +1,155 @@
+"""
+Generation-numbered handoff of compiled PDFs to the preview viewer.
+Each compile result is published under a new file name with an atomic rename,
+so the viewer never reads a file that is still being written and the document
+it shows stays intact until it has switched to a newer generation. Every
+Noctern process publishes into its own directory, so windows running side by
+side never delete each other's PDFs.
+"""
+
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from utils import logs_console
+
+# Newest generations kept besides the one on screen
+DEFAULT_KEEP = 2
+
+_GENERATION_FILE = re.compile(r'^preview-(\d+)\.(pdf|synctex\.gz)$')
+
+
+@dataclass(frozen=True)
+class PDFGeneration:
+    """Immutable handle on one published preview PDF and its SyncTeX data."""
+    number: int
+    pdf_path: str
+    synctex_path: Optional[str] = None
+
+
+def _fsync_path(path, directory=False):
+    """Flush a file or directory entry to disk; directories cannot be opened on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY | (getattr(os, 'O_DIRECTORY', 0) if directory else 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _publish_file(source, target):
+    """Copy `source` to `target` through a temporary file and an atomic rename."""
+    temporary = target + ".tmp"
+    with open(source, 'rb') as src, open(temporary, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(temporary, target)
+
+
+class PDFHandoff:
+    """
+    Publish compiled PDFs as numbered generations in one directory.
+
+    `publish()` may run on a compile thread; the viewer reports the generation
+    it displays with `set_displayed()`, which keeps that generation's files on
+    disk while older ones are deleted.
+    """
+
+    def __init__(self, directory, keep=DEFAULT_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self._generations = []
+        self._displayed = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._remove_leftovers()
+        self._next_number = 1
+
+    @property
+    def latest(self):
+        with self._lock:
+            return self._generations[-1] if self._generations else None
+
+    @property
+    def displayed(self):
+        return self._displayed
+
+    def publish(self, pdf_source, synctex_source=None):
+        """
+        Publish a compiled PDF as the next generation.
+
+        Returns:
+            PDFGeneration: Handle on the published files.
+        """
+        with self._lock:
+            number = self._next_number
+            self._next_number += 1
+
+        pdf_path = os.path.join(self.directory, f"preview-{number}.pdf")
+        _publish_file(pdf_source, pdf_path)
+        synctex_path = None
+        if synctex_source and os.path.exists(synctex_source):
+            synctex_path = os.path.join(self.directory, f"preview-{number}.synctex.gz")
+            _publish_file(synctex_source, synctex_path)
+        _fsync_path(self.directory, directory=True)
+
+        generation = PDFGeneration(number, pdf_path, synctex_path)
+        with self._lock:
+            self._generations.append(generation)
+            self._generations.sort(key=lambda g: g.number)
+        self._collect()
+        return generation
+
+    def set_displayed(self, generation):
+        """Record the generation on screen so its files are not deleted."""
+        with self._lock:
+            self._displayed = generation
+        self._collect()
+
+    def find(self, pdf_path):
+        """Return the generation published at `pdf_path`, or None."""
+        with self._lock:
+            for generation in self._generations:
+                if generation.pdf_path == pdf_path:
+                    return generation
+        return None
+
+    def _collect(self):
+        """Delete generations that are neither recent nor displayed."""
+        with self._lock:
+            recent = self._generations[-self.keep:] if self.keep > 0 else []
+            obsolete = [g for g in self._generations if g not in recent and g != self._displayed]
+        for generation in obsolete:
+            if self._remove_files(generation):
+                with self._lock:
+                    self._generations.remove(generation)
+
+    def _remove_files(self, generation):
+        """Remove a generation's files; False if one is still open elsewhere (Windows)."""
+        for path in (generation.pdf_path, generation.synctex_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    return False
+        return True
+
+    def _remove_leftovers(self):
+        """Delete generations left behind by an earlier process that had the same id."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if _GENERATION_FILE.match(name) or name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    logs_console.log(f"Could not remove old preview file {name}: {e}", level='DEBUG')
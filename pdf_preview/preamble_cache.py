@@ -0,0 +1,208 @@
+"""
+Precompiled preamble format cache for preview compilation.
+Dump the document preamble into a TeX format file once, keyed by a hash of the
+preamble text, so preview compiles only have to typeset the body.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from latex.compile_client import create_process
+from latex.project_graph import overlay_environment
+from utils import logs_console
+
+DEFAULT_MAX_FORMATS = 8
+
+_BEGIN_DOCUMENT = re.compile(r'^[^%\n]*?\\begin\s*\{document\}', re.MULTILINE)
+_LOCAL_DEPENDENCY = re.compile(r'\\(?:input|include|usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}')
+
+# Log messages showing that a compile failed because of the format itself
+_FORMAT_FAILURE_MARKERS = (
+    "I can't find the format file",
+    "Fatal format file error",
+    "---! ",
+)
+
+
+def split_preamble(content):
+    """
+    Split a document at its \\begin{document} line.
+
+    Returns:
+        tuple: (preamble, preamble_line_count), or (None, 0) if no document body is found.
+    """
+    match = _BEGIN_DOCUMENT.search(content)
+    if not match:
+        return None, 0
+    line_start = content.rfind('\n', 0, match.start()) + 1
+    preamble = content[:line_start]
+    return preamble, preamble.count('\n')
+
+
+def strip_preamble(content, preamble_line_count):
+    """
+    Replace the preamble with comment lines, keeping line numbers stable.
+
+    Keeping every body line at its original number means SyncTeX data from
+    format-based compiles still points at the right editor lines.
+    """
+    lines = content.split('\n')
+    return '\n'.join(['%'] * preamble_line_count + lines[preamble_line_count:])
+
+
+def is_format_failure(log_content):
+    """Check whether a compile log shows the format file could not be used."""
+    return any(marker in log_content for marker in _FORMAT_FAILURE_MARKERS)
+
+
+class PreambleFormatCache:
+    """
+    Build and cache format files for document preambles.
+
+    Formats are stored on disk as `<hash>.fmt`. Preambles whose dump failed are
+    remembered for the session so they are not retried on every keystroke.
+    Dumps of one preamble are serialized; compiles needing other formats do not
+    wait for them.
+    """
+
+    def __init__(self, cache_dir, engine="pdflatex", max_formats=DEFAULT_MAX_FORMATS, timeout=60):
+        self.cache_dir = cache_dir
+        self.engine = engine
+        self.max_formats = max_formats
+        self.timeout = timeout
+        self._failed_keys = set()
+        self._lock = threading.Lock()  # guards the bookkeeping below, never held while TeX runs
+        self._key_locks = {}  # preamble key -> lock held while its format is dumped
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_format(self, content, source_dir=None, attach_process=None):
+        """
+        Get the format for a document's preamble, dumping it if needed.
+
+        Args:
+            content (str): Full document source.
+            source_dir (str, optional): Directory of the document, for local packages.
+            attach_process (callable, optional): Called with the dump process, so the
+                caller can cancel it like a compile (e.g. CompileRequest.attach_process).
+
+        Returns:
+            tuple: (format_path_without_extension, preamble_line_count), or (None, 0)
+            when the document has no preamble or the dump failed or was cancelled.
+        """
+        preamble, line_count = split_preamble(content)
+        if not preamble:
+            return None, 0
+
+        key = self._preamble_key(preamble, source_dir)
+        format_base = os.path.join(self.cache_dir, key)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                with self._lock:
+                    if key in self._failed_keys:
+                        return None, 0
+                    if os.path.exists(format_base + ".fmt"):
+                        os.utime(format_base + ".fmt")
+                        return format_base, line_count
+                dumped = self._dump_format(key, preamble, source_dir, attach_process)
+                with self._lock:
+                    if dumped is None:
+                        return None, 0  # cancelled; a later compile dumps it again
+                    if not dumped:
+                        self._failed_keys.add(key)
+                        return None, 0
+                    self._evict_old_formats()
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return format_base, line_count
+
+    def invalidate(self, content, source_dir=None):
+        """Mark a preamble's format as unusable and delete it."""
+        preamble, _ = split_preamble(content)
+        if not preamble:
+            return
+        key = self._preamble_key(preamble, source_dir)
+        with self._lock:
+            self._failed_keys.add(key)
+            try:
+                os.remove(os.path.join(self.cache_dir, key + ".fmt"))
+            except OSError:
+                pass
+
+    def _preamble_key(self, preamble, source_dir):
+        """Hash the preamble together with the engine and local files it loads."""
+        digest = hashlib.sha1()
+        digest.update(self.engine.encode('utf-8'))
+        digest.update(preamble.encode('utf-8', errors='ignore'))
+        if source_dir:
+            for match in _LOCAL_DEPENDENCY.finditer(preamble):
+                for name in match.group(1).split(','):
+                    name = name.strip()
+                    for candidate in (name, name + '.tex', name + '.sty'):
+                        path = os.path.join(source_dir, candidate)
+                        if os.path.isfile(path):
+                            digest.update(f"{candidate}:{os.path.getmtime(path)}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _dump_format(self, key, preamble, source_dir, attach_process=None):
+        """
+        Run the engine in ini mode to dump the preamble into `<key>.fmt`.
+
+        Returns:
+            bool: Whether the format was written, or None when the dump was cancelled.
+        """
+        dump_source = os.path.join(self.cache_dir, f"{key}.tex")
+        with open(dump_source, 'w', encoding='utf-8') as f:
+            f.write(preamble)
+            f.write("\n\\dump\n")
+
+        cmd = [self.engine, "-ini", f"-jobname={key}", "-interaction=nonstopmode", f"&{self.engine}", f"{key}.tex"]
+        # Local packages and \input files are found through TEXINPUTS, which every TeX distribution reads
+        env = overlay_environment(source_dir) if source_dir else None
+
+        try:
+            process = create_process(cmd, cwd=self.cache_dir, timeout=self.timeout, env=env)
+            if attach_process:
+                attach_process(process)
+            result = process.run()
+            if result.cancelled:
+                logs_console.log(f"Preamble format dump {key} cancelled", level='DEBUG')
+                return None
+            success = result.returncode == 0 and os.path.exists(os.path.join(self.cache_dir, key + ".fmt"))
+            if result.timed_out:
+                logs_console.log(f"Preamble format dump timed out after {self.timeout}s", level='WARNING')
+        except OSError as e:
+            logs_console.log(f"Preamble format dump error: {e}", level='WARNING')
+            success = False
+        finally:
+            for ext in (".tex", ".log"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, key + ext))
+                except OSError:
+                    pass
+
+        if success:
+            logs_console.log(f"Dumped preamble format {key}.fmt", level='INFO')
+        else:
+            logs_console.log("Preamble format dump failed; using full compilation for this preamble", level='WARNING')
+        return success
+
+    def _evict_old_formats(self):
+        """Keep only the most recently used formats."""
+        try:
+            formats = [
+                entry for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name.endswith(".fmt")
+            ]
+        except OSError:
+            return
+        formats.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in formats[self.max_formats:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,122 @@
+"""
+Scroll-direction-aware prefetching for the PDF viewer.
+Track how fast and which way the preview scrolls and pick the pages just
+ahead of the view, so they are rendered before they come into sight.
+"""
+
+import math
+import time
+
+DEFAULT_PAGES_AHEAD = 3
+
+# Seconds of scrolling at the current speed that prefetched pages should cover
+LOOKAHEAD_SECONDS = 1.0
+
+# Slower scrolling, in pixels per second, counts as standing still
+MIN_VELOCITY = 50.0
+
+# A move of more than this many viewport heights at once is a jump, not a scroll
+JUMP_VIEWPORTS = 3
+
+# Observations further apart than this start a new gesture
+GESTURE_GAP_SECONDS = 0.5
+
+
+class ScrollPrefetcher:
+    """
+    Plan prefetches from the scroll position history.
+
+    `observe()` is fed the viewport position on every scroll. `plan()` returns
+    the pages to render ahead, forgetting earlier picks that went stale; the
+    viewer reports each prefetched page it queues with `queued()` and each page
+    that comes into view with `page_shown()`, from which the hit rate follows.
+    """
+
+    def __init__(self, pages_ahead=DEFAULT_PAGES_AHEAD, smoothing=0.5, clock=time.monotonic):
+        self.pages_ahead = pages_ahead
+        self.smoothing = smoothing
+        self.clock = clock
+        self.velocity = 0.0  # pixels per second, positive when scrolling down
+        self.pending = set()  # prefetched pages not shown yet
+        self.hits = 0  # prefetched pages that were ready when they came into view
+        self.misses = 0  # prefetched pages that came into view before their render finished
+        self.wasted = 0  # prefetched pages dropped after a reversal or jump
+        self._last = None  # (position, time) of the previous observation
+
+    def observe(self, position, viewport_height):
+        """Record the viewport's top position and update the scroll velocity."""
+        now = self.clock()
+        if self._last is not None:
+            last_position, last_time = self._last
+            delta, elapsed = position - last_position, now - last_time
+            if abs(delta) > JUMP_VIEWPORTS * max(1, viewport_height):
+                self.velocity = 0.0
+            elif elapsed > GESTURE_GAP_SECONDS:
+                self.velocity = delta / elapsed if delta else 0.0
+            elif elapsed > 0:
+                self.velocity = self.smoothing * (delta / elapsed) + (1 - self.smoothing) * self.velocity
+        self._last = (position, now)
+
+    @property
+    def direction(self):
+        if self.velocity > MIN_VELOCITY:
+            return 1
+        if self.velocity < -MIN_VELOCITY:
+            return -1
+        return 0
+
+    def plan(self, visible_pages, page_count, page_height, max_pages=None):
+        """
+        Pick the pages to prefetch beyond the visible ones, nearest first.
+
+        Enough pages to cover LOOKAHEAD_SECONDS of scrolling are picked, at
+        least one and at most `pages_ahead` or `max_pages`. Pending prefetches
+        that are no longer picked are dropped and counted as wasted.
+        """
+        pages = []
+        limit = self.pages_ahead if max_pages is None else min(self.pages_ahead, max_pages)
+        if visible_pages and self.direction and limit > 0:
+            wanted = math.ceil(abs(self.velocity) * LOOKAHEAD_SECONDS / max(1, page_height))
+            edge = max(visible_pages) if self.direction > 0 else min(visible_pages)
+            for step in range(1, max(1, min(limit, wanted)) + 1):
+                page_num = edge + self.direction * step
+                if 1 <= page_num <= page_count:
+                    pages.append(page_num)
+        dropped = self.pending - set(pages) - set(visible_pages)
+        self.wasted += len(dropped)
+        self.pending -= dropped
+        return pages
+
+    def queued(self, page_num):
+        self.pending.add(page_num)
+
+    def page_shown(self, page_num, ready):
+        """Count a page coming into view as a hit or miss if it had been prefetched."""
+        if page_num not in self.pending:
+            return
+        self.pending.discard(page_num)
+        if ready:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    @property
+    def hit_rate(self):
+        """Share of prefetched pages that were ready in time, or None before any was shown."""
+        shown = self.hits + self.misses
+        return self.hits / shown if shown else None
+
+    def reset(self):
+        """Forget pending prefetches and scroll history, e.g. when another document is shown."""
+        self.pending.clear()
+        self.velocity = 0.0
+        self._last = None
+
+    def stats(self):
+        return {
+            'pages_ahead': self.pages_ahead,
+            'hits': self.hits,
+            'misses': self.misses,
+            'wasted': self.wasted,
+            'hit_rate': None if self.hit_rate is None else round(self.hit_rate, 2),
+        }
@@ -0,0 +1,110 @@
+"""
+Memory cache of rendered preview pages.
+Light and dark renders of every page and zoom level share one least recently
+used cache, bounded by the bytes their images hold rather than by page count.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_BUDGET_BYTES = 192 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RenderKey:
+    """One cached render: document version, page, resolution, theme and, for tiles, (column, row)."""
+    generation: int
+    page_num: int
+    dpi: int
+    dark: bool
+    tile: tuple = None
+
+
+def image_nbytes(image):
+    """Return the memory held by a PIL image's pixels."""
+    return image.width * image.height * len(image.getbands())
+
+
+class RenderCache:
+    """
+    Keep rendered page images under a byte budget.
+
+    Entries are evicted in least recently used order; the newest entry is kept
+    even when it is larger than the whole budget. Not thread-safe: the viewer
+    only touches it from the Tk thread.
+    """
+
+    def __init__(self, max_total_bytes=DEFAULT_BUDGET_BYTES):
+        self.max_total_bytes = max_total_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # RenderKey -> (image, size)
+        self._total_bytes = 0
+
+    def get(self, key):
+        """Return the image stored under `key` and mark it as recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, image):
+        """Store an image, evicting the least recently used ones beyond the budget."""
+        self.pop(key)
+        size = image_nbytes(image)
+        self._entries[key] = (image, size)
+        self._total_bytes += size
+        self._evict()
+
+    def pop(self, key):
+        """Remove an entry without counting it as an eviction; return its image or None."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._total_bytes -= entry[1]
+        return entry[0]
+
+    def keys(self):
+        """Return the stored keys, least recently used first."""
+        return list(self._entries)
+
+    def items(self):
+        """Return (key, image) pairs, least recently used first."""
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def clear(self):
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def set_budget(self, max_total_bytes):
+        self.max_total_bytes = max_total_bytes
+        self._evict()
+
+    def total_size(self):
+        """Return the size of all stored images in bytes."""
+        return self._total_bytes
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self._total_bytes > self.max_total_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
@@ -0,0 +1,242 @@
+"""
+Background page rendering for the PDF viewer.
+Worker threads rasterize pages, or tiles of zoomed-in pages, at their display
+scale and apply dark mode, each with its own PyMuPDF document handle. The Tk main thread only turns the
+finished images into PhotoImages and places them on the canvas.
+"""
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Any
+from PIL import Image
+from pdf_preview.image_processor import DARK_MODE_SMART, darken_pixmap, photo_areas
+from pdf_preview.page_tiles import render_tile_image
+from utils import logs_console
+
+try:
+    # Recent PyMuPDF prints a deprecation warning on stdout when imported as `fitz`
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF before 1.24
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+DEFAULT_RENDER_WORKERS = 2
+
+# Pages are rasterized in horizontal bands of this many pixels. PyMuPDF keeps
+# the GIL while it draws, so bands bound how long the Tk thread can be held
+# up, and let a request that became stale stop halfway through a page.
+RENDER_BAND_PIXELS = 256
+
+# Priority tiers: pages on screen, pages in the scroll buffer, pages prefetched ahead of the scroll
+PRIORITY_VISIBLE, PRIORITY_NEARBY, PRIORITY_PREFETCH = 0, 1, 2
+
+
+@dataclass
+class PageRenderRequest:
+    """One page, or one (column, row) tile of it, to render for the current document, scale and theme."""
+    page_num: int
+    dpi: int
+    dark: bool
+    version: int
+    tile: Any = None
+    cancelled: bool = False
+    started: bool = False
+
+    @property
+    def key(self):
+        return self.page_num, self.tile
+
+
+@dataclass
+class RenderedPage:
+    """A page or tile rendered at `dpi`, ready to display."""
+    page_num: int
+    image: Any
+    dpi: int
+    dark: bool
+    version: int
+    tile: Any = None
+
+
+def render_page_image(document, page_num, dpi, should_stop=None, dark=False):
+    """
+    Rasterize one page in bands, inverting each band's pixmap for dark mode.
+
+    `dark` is False, True or a dark mode style such as DARK_MODE_SMART.
+
+    Returns:
+        PIL.Image: RGB image of the page, or None when `should_stop()` turned true.
+    """
+    page = document[page_num - 1]
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    area = (page.rect * matrix).irect
+    image = Image.new("RGB", (area.width, area.height), "white")
+    photos = photo_areas(page, matrix) if dark == DARK_MODE_SMART else ()
+    band = RENDER_BAND_PIXELS / zoom
+    top = page.rect.y0
+    while top < page.rect.y1:
+        if should_stop and should_stop():
+            return None
+        clip = fitz.Rect(page.rect.x0, top, page.rect.x1, min(page.rect.y1, top + band))
+        pixmap = page.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+        if dark:
+            darken_pixmap(pixmap, photos)
+        strip = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+        image.paste(strip, (pixmap.x - area.x0, pixmap.y - area.y0))
+        top += band
+    return image
+
+
+class PageRenderPool:
+    """
+    Render pages on a few worker threads, most urgent first.
+
+    `request()` queues a page or tile with a priority; asking again for a
+    queued one only updates its priority. `retain()` drops queued and running
+    requests for pages and tiles that scrolled out of range. Finished pages are passed to
+    `on_ready(RenderedPage)` on the worker thread; the viewer posts them to
+    the Tk thread.
+    """
+
+    def __init__(self, on_ready, workers=DEFAULT_RENDER_WORKERS):
+        self.on_ready = on_ready
+        self.workers = max(1, workers)
+        self.pdf_path = None
+        self.version = 0
+        self.rendered_count = 0
+        self.cancelled_count = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._requests = {}  # (page_num, tile) -> latest PageRenderRequest
+        self._condition = threading.Condition()
+        self._threads = []
+        self._stopped = False
+
+    def set_document(self, pdf_path):
+        """Switch to a new PDF; every queued or running request for the old one is dropped."""
+        with self._condition:
+            self.pdf_path = pdf_path
+            self.version += 1
+            self._drop_all()
+            return self.version
+
+    def request(self, page_num, priority, dpi, dark, tile=None):
+        """
+        Queue a page, or one tile of it. A queued request for another scale or theme is replaced.
+
+        Returns:
+            bool: False when there is no document to render from.
+        """
+        with self._condition:
+            if self._stopped or self.pdf_path is None:
+                return False
+            current = self._requests.get((page_num, tile))
+            if current and not current.cancelled and (current.dpi, current.dark) == (dpi, dark):
+                if current.started:
+                    return True
+                request = current
+            else:
+                if current:
+                    current.cancelled = True
+                request = PageRenderRequest(page_num, dpi, dark, self.version, tile)
+                self._requests[request.key] = request
+            heapq.heappush(self._heap, (priority, next(self._sequence), request))
+            self._start_workers()
+            self._condition.notify()
+            return True
+
+    def retain(self, page_nums, tiles=None):
+        """Cancel requests for pages outside `page_nums`, and for tiles outside `tiles` when given."""
+        with self._condition:
+            for key in list(self._requests):
+                page_num, tile = key
+                if page_num not in page_nums or (tile is not None and tiles is not None and key not in tiles):
+                    self._requests.pop(key).cancelled = True
+                    self.cancelled_count += 1
+
+    def discard(self, page_nums):
+        """Cancel the whole-page requests of `page_nums`, whose renders were found elsewhere."""
+        with self._condition:
+            for key in [key for key in self._requests if key[0] in page_nums and key[1] is None]:
+                self._requests.pop(key).cancelled = True
+                self.cancelled_count += 1
+
+    def cancel_all(self):
+        with self._condition:
+            self._drop_all()
+
+    def pending_count(self):
+        with self._condition:
+            return len(self._requests)
+
+    def shutdown(self):
+        with self._condition:
+            self._stopped = True
+            self._drop_all()
+            self._condition.notify_all()
+
+    def _drop_all(self):
+        for request in self._requests.values():
+            request.cancelled = True
+        self._requests.clear()
+        self._heap.clear()
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"page-render-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_request(self):
+        """Worker thread: wait for the most urgent live request."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None, None
+                while self._heap:
+                    _, _, request = heapq.heappop(self._heap)
+                    if request.started or request.cancelled or self._requests.get(request.key) is not request:
+                        continue
+                    # Left registered so retain() can still cancel it mid-render
+                    request.started = True
+                    return request, self.pdf_path
+                self._condition.wait()
+
+    def _work(self):
+        """Worker thread: render requests with this thread's own document handle."""
+        document, document_path = None, None
+        while True:
+            request, pdf_path = self._next_request()
+            if request is None:
+                break
+            image = None
+            try:
+                if pdf_path != document_path:
+                    if document is not None:
+                        document.close()
+                    document, document_path = fitz.open(pdf_path), pdf_path
+                if request.tile is not None:
+                    image = render_tile_image(document, request.page_num, request.dpi, request.tile, dark=request.dark)
+                else:
+                    image = render_page_image(document, request.page_num, request.dpi, lambda: request.cancelled,
+                                              dark=request.dark)
+            except Exception as e:
+                logs_console.log(f"Error rendering page {request.page_num}: {e}", level='ERROR')
+            self._finish(request, image)
+        if document is not None:
+            document.close()
+
+    def _finish(self, request, image):
+        with self._condition:
+            if self._requests.get(request.key) is request:
+                del self._requests[request.key]
+            if request.cancelled or request.version != self.version or image is None:
+                return
+            self.rendered_count += 1
+        self.on_ready(RenderedPage(request.page_num, image, request.dpi, request.dark, request.version, request.tile))
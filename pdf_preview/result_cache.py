@@ -0,0 +1,161 @@
+"""
+Content-addressed cache of preview compile results.
+Key compiled PDFs and SyncTeX files by a hash of the normalized source, so
+undoing to an earlier state or editing only comments reuses a stored result
+instead of running TeX again.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from utils import logs_console
+from pdf_preview.build_workspace import session_directory
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Environments whose content is typeset verbatim, so % is not a comment there
+_VERBATIM_BEGIN = re.compile(r'\\begin\s*\{(verbatim\*?|Verbatim\*?|lstlisting|minted|comment)\}')
+_LOCAL_FILE = re.compile(r'\\(?:input|include|subfile|includegraphics|bibliography|addbibresource)\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}')
+
+
+def _strip_comment(line):
+    """Drop comment text after an unescaped %, keeping the % itself."""
+    index = line.find('%')
+    while index != -1:
+        backslashes = 0
+        position = index - 1
+        while position >= 0 and line[position] == '\\':
+            backslashes += 1
+            position -= 1
+        if backslashes % 2 == 0:
+            # the % stays: it still swallows the end of line
+            return line[:index + 1]
+        index = line.find('%', index + 1)
+    return line
+
+
+def normalize_source(content):
+    """
+    Normalize LaTeX source for result caching.
+
+    Comment text and trailing whitespace are removed, but every line is kept so
+    that SyncTeX data of a cached result still matches the editor's line numbers.
+    """
+    normalized = []
+    verbatim_end = None
+    for line in content.split('\n'):
+        if verbatim_end:
+            normalized.append(line.rstrip())
+            if verbatim_end in line:
+                verbatim_end = None
+            continue
+        line = _strip_comment(line).rstrip()
+        match = _VERBATIM_BEGIN.search(line)
+        if match:
+            end_tag = f"\\end{{{match.group(1)}}}"
+            if end_tag not in line[match.end():]:
+                verbatim_end = end_tag
+        normalized.append(line)
+    return '\n'.join(normalized)
+
+
+def compute_cache_key(content, source_dir=None, engine="pdflatex", files=None):
+    """
+    Hash normalized source together with the local files it pulls in.
+
+    `files` maps project paths to unsaved buffer text compiled in place of the
+    files on disk; their content is part of the key.
+    """
+    normalized = normalize_source(content)
+    digest = hashlib.sha1()
+    digest.update(f"{engine}\n{source_dir or ''}\n".encode('utf-8'))
+    digest.update(normalized.encode('utf-8', errors='ignore'))
+    for name in sorted(files or {}):
+        digest.update(f"\n{name}\n".encode('utf-8'))
+        digest.update(normalize_source(files[name]).encode('utf-8', errors='ignore'))
+    if source_dir:
+        for match in _LOCAL_FILE.finditer(normalized):
+            for name in match.group(1).split(','):
+                path = os.path.join(source_dir, name.strip())
+                for candidate in (path, path + '.tex', path + '.bib'):
+                    if os.path.isfile(candidate):
+                        digest.update(f"{candidate}:{os.path.getmtime(candidate)}".encode('utf-8'))
+                        break
+    return digest.hexdigest()
+
+
+class PreviewResultCache:
+    """
+    Keep recent preview PDFs and SyncTeX files on disk under a byte budget.
+
+    Entries are evicted in least recently used order. Each process keeps its
+    cache in its own directory; files left over in it, or in the directory of a
+    process that has exited, are removed on start since their keys are not tracked.
+    """
+
+    def __init__(self, cache_dir=None, max_total_bytes=DEFAULT_BUDGET_BYTES):
+        self.cache_dir = cache_dir or session_directory("noctern_results")
+        self.max_total_bytes = max_total_bytes
+        self._entries = OrderedDict()  # key -> (pdf_path, synctex_path or None, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """
+        Look up a stored result.
+
+        Returns:
+            tuple: (pdf_path, synctex_path or None), or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if not os.path.exists(entry[0]):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, key, pdf_path, synctex_path=None):
+        """Store copies of a successful compile's PDF and SyncTeX files."""
+        try:
+            cached_pdf = os.path.join(self.cache_dir, key + ".pdf")
+            shutil.copy2(pdf_path, cached_pdf)
+            size = os.path.getsize(cached_pdf)
+            cached_synctex = None
+            if synctex_path and os.path.exists(synctex_path):
+                cached_synctex = os.path.join(self.cache_dir, key + ".synctex.gz")
+                shutil.copy2(synctex_path, cached_synctex)
+                size += os.path.getsize(cached_synctex)
+        except OSError as e:
+            logs_console.log(f"Preview result cache store error: {e}", level='WARNING')
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries[key][2]
+            self._entries[key] = (cached_pdf, cached_synctex, size)
+            self._entries.move_to_end(key)
+            self._total_bytes += size
+            while self._total_bytes > self.max_total_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+
+    def total_size(self):
+        """Return the size of all stored results in bytes."""
+        return self._total_bytes
+
+    def _drop(self, key):
+        pdf_path, synctex_path, size = self._entries.pop(key)
+        self._total_bytes -= size
+        for path in (pdf_path, synctex_path):
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,373 @@
+"""
+Snippet preview for math and TikZ.
+Extract the formula or picture under the cursor, wrap it in a `standalone`
+document that keeps the document's own packages and macros, and render it to a
+cropped PNG. Results are cached by a hash of the generated source, and the
+snippet preamble is precompiled once, so a changed equation only typesets
+itself.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from latex.compile_client import create_process
+from latex.engines import DEFAULT_ENGINE, get_engine
+from latex.project_graph import overlay_environment
+from pdf_preview.build_workspace import session_directory
+from pdf_preview.preamble_cache import PreambleFormatCache, split_preamble, strip_preamble, is_format_failure
+from utils import logs_console
+
+DEFAULT_SNIPPET_DPI = 200
+DEFAULT_MAX_SNIPPETS = 200
+
+# Seconds allowed for one snippet compile
+SNIPPET_TIMEOUT = 20
+
+MATH_ENVIRONMENTS = {
+    'equation', 'equation*', 'align', 'align*', 'gather', 'gather*', 'multline', 'multline*',
+    'flalign', 'flalign*', 'alignat', 'alignat*', 'eqnarray', 'eqnarray*', 'displaymath', 'math',
+}
+TIKZ_ENVIRONMENTS = {'tikzpicture', 'tikzcd'}
+
+# Packages whose page layout or document-level setup fights with `standalone`
+_SKIPPED_PACKAGES = {
+    'geometry', 'fancyhdr', 'hyperref', 'bookmark', 'titlesec', 'titling', 'tocloft', 'setspace',
+    'showframe', 'lipsum', 'blindtext', 'biblatex', 'natbib', 'makeidx', 'imakeidx', 'glossaries',
+    'todonotes', 'lineno', 'subfiles', 'pdfpages',
+}
+# Preamble commands that only matter for the full document
+_SKIPPED_COMMANDS = (
+    'title', 'author', 'date', 'geometry', 'hypersetup', 'pagestyle', 'thispagestyle', 'fancyhf',
+    'fancyhead', 'fancyfoot', 'lhead', 'chead', 'rhead', 'lfoot', 'cfoot', 'rfoot', 'makeindex',
+    'makeglossaries', 'addbibresource', 'bibliography', 'bibliographystyle', 'linenumbers',
+    'onehalfspacing', 'doublespacing', 'titleformat', 'titlespacing', 'includeonly',
+)
+
+_COMMENT = re.compile(r'(?<!\\)%.*')
+_BEGIN_ENVIRONMENT = re.compile(r'\\begin\s*\{([A-Za-z]+\*?)\}')
+_DELIMITER = re.compile(r'\\[\[\]()]|\\.|\$\$|\$', re.DOTALL)
+_CLOSING = {'\\[': '\\]', '\\(': '\\)', '$$': '$$', '$': '$'}
+_PARAGRAPH = re.compile(r'\n[ \t]*\n')
+_DOCUMENT_CLASS = re.compile(r'\\documentclass\s*(?:\[[^\]]*\])?\s*\{[^}]*\}')
+_PACKAGE = re.compile(r'\\usepackage\s*(\[[^\]]*\])?\s*\{([^}]*)\}')
+_SKIPPED_COMMAND = re.compile(r'\\(' + '|'.join(_SKIPPED_COMMANDS) + r')\b\*?')
+
+
+@dataclass(frozen=True)
+class Snippet:
+    """Math or TikZ source found in a document, with its character offsets."""
+    kind: str  # 'math' or 'tikz'
+    source: str  # delimiters or \begin/\end included
+    start: int
+    end: int
+
+
+@dataclass
+class SnippetResult:
+    """Rendered snippet: a PNG path, or the first error TeX reported."""
+    png_path: Optional[str] = None
+    error: str = ""
+    duration: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.png_path is not None
+
+
+def _blank_comments(content):
+    """Replace comments with spaces so offsets into the text stay valid."""
+    return _COMMENT.sub(lambda match: ' ' * len(match.group()), content)
+
+
+def _environment_regions(text):
+    regions = []
+    for match in _BEGIN_ENVIRONMENT.finditer(text):
+        name = match.group(1)
+        if name not in MATH_ENVIRONMENTS and name not in TIKZ_ENVIRONMENTS:
+            continue
+        pattern = re.compile(r'\\(begin|end)\s*\{' + re.escape(name) + r'\}')
+        depth = 0
+        for tag in pattern.finditer(text, match.start()):
+            depth += 1 if tag.group(1) == 'begin' else -1
+            if depth == 0:
+                regions.append(('tikz' if name in TIKZ_ENVIRONMENTS else 'math', match.start(), tag.end()))
+                break
+    return regions
+
+
+def _delimited_regions(text):
+    regions = []
+    opening, opened_at = None, 0
+    for match in _DELIMITER.finditer(text):
+        token = match.group()
+        if opening is not None and token == _CLOSING[opening]:
+            if opening in ('$', '\\(') and _PARAGRAPH.search(text, opened_at, match.start()):
+                # An unbalanced inline formula; this token opens a new one
+                opened_at = match.start()
+                continue
+            regions.append(('math', opened_at, match.end()))
+            opening = None
+        elif opening is None and token in _CLOSING:
+            opening, opened_at = token, match.start()
+    return regions
+
+
+def find_snippet(content, offset):
+    """
+    Find the math or TikZ snippet containing a character offset.
+
+    The outermost snippet wins, so hovering a `$x$` node label inside a
+    tikzpicture previews the whole picture. Only the document body is
+    searched when the text has a preamble.
+
+    Returns:
+        Snippet: The snippet, or None when the offset is not inside one.
+    """
+    text = _blank_comments(content)
+    preamble, _ = split_preamble(text)
+    body_start = len(preamble) if preamble else 0
+    if offset < body_start:
+        return None
+
+    best = None
+    for kind, start, end in _environment_regions(text) + _delimited_regions(text):
+        if start <= offset < end and start >= body_start:
+            if best is None or end - start > best[2] - best[1]:
+                best = (kind, start, end)
+    if best is None:
+        return None
+    kind, start, end = best
+    return Snippet(kind, content[start:end], start, end)
+
+
+def _remove_command(text, match):
+    """Remove a command matched at `match` together with its optional and mandatory arguments."""
+    position = match.end()
+    while True:
+        rest = text[position:]
+        stripped = rest.lstrip()
+        if not stripped or stripped[0] not in '[{':
+            break
+        position += len(rest) - len(stripped)
+        closing = ']' if stripped[0] == '[' else '}'
+        depth = 0
+        for index, char in enumerate(text[position:], position):
+            if char == stripped[0]:
+                depth += 1
+            elif char == closing:
+                depth -= 1
+                if depth == 0:
+                    position = index + 1
+                    break
+        else:
+            return text[:match.start()]
+    return text[:match.start()] + text[position:]
+
+
+def snippet_preamble(content):
+    """
+    Keep the packages and macro definitions of a document's preamble.
+
+    The document class, layout packages and title or bibliography setup are
+    dropped, since the snippet is typeset by `standalone`.
+
+    Returns:
+        str: Preamble lines to place after the standalone \\documentclass, or ""
+        when the text has no preamble.
+    """
+    preamble, _ = split_preamble(content)
+    if not preamble:
+        return ""
+    preamble = _DOCUMENT_CLASS.sub('', _COMMENT.sub('', preamble))
+
+    def keep_packages(match):
+        names = [name.strip() for name in match.group(2).split(',') if name.strip()]
+        kept = [name for name in names if name not in _SKIPPED_PACKAGES]
+        if not kept:
+            return ''
+        return f"\\usepackage{match.group(1) or ''}{{{','.join(kept)}}}"
+    preamble = _PACKAGE.sub(keep_packages, preamble)
+
+    match = _SKIPPED_COMMAND.search(preamble)
+    while match:
+        preamble = _remove_command(preamble, match)
+        match = _SKIPPED_COMMAND.search(preamble, match.start())
+    return '\n'.join(line.rstrip() for line in preamble.split('\n') if line.strip())
+
+
+def build_snippet_document(snippet, preamble=""):
+    """Wrap a snippet in a cropped standalone document using the given preamble."""
+    loaded = {name.strip() for match in _PACKAGE.finditer(preamble) for name in match.group(2).split(',')}
+    lines = []
+    if snippet.kind == 'tikz':
+        lines.append("\\documentclass[border=2pt]{standalone}")
+        needed = ['tikz-cd'] if '\\begin{tikzcd}' in snippet.source.replace(' ', '') else ['tikz']
+    else:
+        lines.append("\\documentclass[border=2pt,varwidth]{standalone}")
+        needed = ['amsmath']
+    lines.extend(f"\\usepackage{{{name}}}" for name in needed if name not in loaded)
+    if preamble:
+        lines.append(preamble)
+    lines.extend(["\\begin{document}", snippet.source, "\\end{document}", ""])
+    return '\n'.join(lines)
+
+
+def snippet_key(document, engine=DEFAULT_ENGINE, dpi=DEFAULT_SNIPPET_DPI, source_dir=None):
+    digest = hashlib.sha1(f"{engine}\n{dpi}\n{source_dir or ''}\n".encode('utf-8'))
+    digest.update(document.encode('utf-8', errors='ignore'))
+    return digest.hexdigest()
+
+
+def rasterize_pdf(pdf_path, png_path, dpi=DEFAULT_SNIPPET_DPI):
+    """Render the first page of a PDF to a PNG file."""
+    try:
+        # Recent PyMuPDF prints a deprecation warning on stdout when imported as `fitz`
+        try:
+            import pymupdf as fitz
+        except ImportError:
+            import fitz  # PyMuPDF before 1.24
+    except ImportError:
+        fitz = None
+    if fitz:
+        with fitz.open(pdf_path) as document:
+            zoom = dpi / 72.0
+            document[0].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).save(png_path)
+        return
+    from pdf2image import convert_from_path
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
+    if not images:
+        raise ValueError("PDF has no pages")
+    images[0].save(png_path)
+
+
+def _first_error(output):
+    for line in output.splitlines():
+        if line.startswith('! '):
+            return line[2:].strip()
+    return "Snippet did not compile"
+
+
+class SnippetRenderer:
+    """
+    Compile snippet documents to PNG images, with an LRU cache by source hash.
+
+    Compiles run one at a time in a single reused workspace. The standalone
+    preamble is dumped to a format on first use, so later snippets of the same
+    document only typeset their body. Failures are cached too, so an unchanged
+    broken formula is not recompiled on every hover. Each process keeps its
+    workspace and images in its own directory, cleared on start.
+    """
+
+    def __init__(self, cache_dir=None, dpi=DEFAULT_SNIPPET_DPI, max_entries=DEFAULT_MAX_SNIPPETS,
+                 timeout=SNIPPET_TIMEOUT):
+        self.cache_dir = cache_dir or session_directory("noctern_snippets")
+        self.dpi = dpi
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.workspace = os.path.join(self.cache_dir, "work")
+        self._entries = OrderedDict()  # key -> SnippetResult
+        self._formats = {}  # engine -> PreambleFormatCache
+        self._lock = threading.Lock()
+        self._compile_lock = threading.Lock()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.workspace, exist_ok=True)
+
+    def cached(self, document, engine=DEFAULT_ENGINE, source_dir=None):
+        """Return the stored result of a snippet document, or None."""
+        key = snippet_key(document, engine, self.dpi, source_dir)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None or (result.png_path and not os.path.exists(result.png_path)):
+                return None
+            self._entries.move_to_end(key)
+            return SnippetResult(result.png_path, result.error, result.duration, cached=True)
+
+    def render(self, document, engine=DEFAULT_ENGINE, source_dir=None):
+        """Compile and rasterize a snippet document. Blocks; call from a worker thread."""
+        cached = self.cached(document, engine, source_dir)
+        if cached:
+            return cached
+        key = snippet_key(document, engine, self.dpi, source_dir)
+        start_time = time.time()
+        with self._compile_lock:
+            try:
+                result = self._compile(key, document, engine, source_dir)
+            except FileNotFoundError:
+                result = SnippetResult(error=f"TeX engine '{engine}' not found")
+            except Exception as e:
+                logs_console.log(f"Snippet preview error: {e}", level='WARNING')
+                result = SnippetResult(error=str(e))
+        result.duration = time.time() - start_time
+        self._store(key, result)
+        logs_console.log(f"Snippet rendered in {result.duration:.2f}s", level='DEBUG')
+        return result
+
+    def _format_cache(self, engine):
+        if not get_engine(engine).supports_formats:
+            return None
+        if engine not in self._formats:
+            self._formats[engine] = PreambleFormatCache(os.path.join(self.cache_dir, "formats"), engine=engine)
+        return self._formats[engine]
+
+    def _compile(self, key, document, engine, source_dir):
+        format_cache = self._format_cache(engine)
+        format_base, preamble_lines = None, 0
+        if format_cache:
+            format_base, preamble_lines = format_cache.get_format(document, source_dir)
+        output = self._run_engine(document, engine, source_dir, format_base, preamble_lines)
+        if format_base and output is not None and is_format_failure(output):
+            format_cache.invalidate(document, source_dir)
+            output = self._run_engine(document, engine, source_dir)
+
+        pdf_path = os.path.join(self.workspace, "snippet.pdf")
+        if output is not None or not os.path.exists(pdf_path):
+            return SnippetResult(error=_first_error(output or ""))
+        png_path = os.path.join(self.cache_dir, key + ".png")
+        rasterize_pdf(pdf_path, png_path, self.dpi)
+        return SnippetResult(png_path)
+
+    def _run_engine(self, document, engine, source_dir, format_base=None, preamble_lines=0):
+        """Run TeX on the snippet; returns None on success, or the output of a failed run."""
+        pdf_path = os.path.join(self.workspace, "snippet.pdf")
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        with open(os.path.join(self.workspace, "snippet.tex"), 'w', encoding='utf-8') as f:
+            f.write(strip_preamble(document, preamble_lines) if format_base else document)
+        command = get_engine(engine).command("snippet.tex", format_base=format_base)
+        env = overlay_environment(source_dir) if source_dir else None
+        result = create_process(command, cwd=self.workspace, timeout=self.timeout, env=env).run()
+        if result.returncode == 0 and os.path.exists(pdf_path):
+            return None
+        if result.timed_out:
+            return f"! Timed out after {self.timeout}s"
+        return result.output
+
+    def _store(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, dropped = self._entries.popitem(last=False)
+                if dropped.png_path:
+                    try:
+                        os.remove(dropped.png_path)
+                    except OSError:
+                        pass
+
+
+_renderer = None
+
+
+def get_snippet_renderer():
+    """Return the shared snippet renderer, creating it on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = SnippetRenderer()
+    return _renderer
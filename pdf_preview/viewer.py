@@ -13,7 +13,11 @@ import time
 from utils import logs_console
 
 try:
-    import fitz  # PyMuPDF
+    # Recent PyMuPDF prints a deprecation warning on stdout when imported as `fitz`
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # PyMuPDF before 1.24
     HAS_FITZ = True
 except ImportError:
     HAS_FITZ = False
@@ -24,7 +28,13 @@ from pdf_preview.sync_manager import PDFPreviewSyncManager
 # Import circular magnifier component
 from pdf_preview.magnifier import PDFPreviewMagnifier
 # Import image processor for dark mode support
-from pdf_preview.image_processor import apply_dark_mode_processing, is_dark_mode_inversion_needed
+from pdf_preview.image_processor import DARK_MODE_INVERT, DARK_MODE_SMART, invert_pdf_colors, is_dark_mode_inversion_needed
+from pdf_preview.page_fingerprint import fingerprint_document, match_pages
+from pdf_preview.render_pool import render_page_image, PageRenderPool, PRIORITY_VISIBLE, PRIORITY_NEARBY, PRIORITY_PREFETCH
+from pdf_preview.render_cache import DEFAULT_BUDGET_BYTES, RenderCache, RenderKey
+from pdf_preview.page_layout import PAGE_MARGIN, VirtualPageLayout
+from pdf_preview.page_tiles import BACKDROP_DPI, crop_backdrop, needs_tiles, tile_box, tiles_in_view
+from pdf_preview.prefetch import DEFAULT_PAGES_AHEAD, ScrollPrefetcher
 
 
 class PDFPreviewViewer:
@@ -41,18 +51,31 @@ class PDFPreviewViewer:
         self.zoom_level = 1.2  # Start with 120% zoom for better readability
         
         # Caching and performance
-        self.page_cache = {}  # LRU cache for rendered pages
-        self.dark_mode_cache = {}  # Separate cache for dark mode processed pages
-        self.page_layouts = {}  # Layout information for each page
-        self.current_dark_mode_state = False  # Track current dark mode state
+        # Light and dark renders of every zoom level, under one byte budget
+        self.render_cache = RenderCache(self._render_cache_budget())
+        self.document_version = 0  # Bumped per loaded document; part of every render cache key
+        self.page_layouts = VirtualPageLayout()  # Page positions, computed on demand
+        # Canvas items exist only for pages near the viewport and are reused as it scrolls
+        self._page_items = {}  # page_num -> {'placeholder': item id, 'image': item id or None, 'tiles': {}}
+        self._spare_placeholders = []
+        self._spare_images = []
+        self._page_photos = {}  # page_num or (page_num, tile) -> PhotoImage on screen, kept from garbage collection
+        self._previous_renders = {}  # page_num -> render of the previous document, shown until the new one arrives
+        # False in light themes, else the dark mode style pages are rendered with; updated by refresh_theme()
+        self.current_dark_mode_state = self._dark_mode()
         self.total_height = 0
         self.render_thread = None
         self.pdf_doc = None  # Store PDF document reference
         self.total_pages = 0
-        self.RENDER_DPI = 150
-        self.MAX_CACHE_SIZE = 8  # Maximum cached pages
+        self.RENDER_DPI = 150  # Resolution at 100% zoom; pages are rendered at RENDER_DPI * zoom
         self.visible_pages = set()  # Currently visible page numbers
-        self.cache_order = []  # LRU tracking
+        self.page_fingerprints = None  # Per-page hashes of the displayed PDF, to reuse unchanged renders
+        self._reuse_candidates = None  # (fingerprints, cached renders) of the previous PDF until the new one is hashed
+        self.last_reload_stats = None  # PageReuse of the latest reload
+        # Pages are rasterized and scaled off the Tk thread; only PhotoImage creation happens here
+        self.render_pool = PageRenderPool(self._on_page_ready) if HAS_FITZ else None
+        # Pages ahead of the scroll are queued at idle priority before they come into view
+        self.prefetcher = ScrollPrefetcher(self._prefetch_pages())
         
         # Status tracking
         self.last_compilation_time = None
@@ -68,6 +91,15 @@ class PDFPreviewViewer:
         # Magnifier properties
         self.magnifier_active = False
         self.magnifier = None
+        self._magnifier_target = None  # (page_num, x, y) under the lens while its render is on the pool
+        
+        # Focus preview toggle, wired by the preview manager
+        self.on_focus_toggle = None
+        
+        # Preview PDF generation on screen and the callback told when it changes
+        self._load_token = 0
+        self.displayed_generation = None
+        self.on_generation_displayed = None
         
         self._create_widgets()
         if pdf_path and os.path.exists(pdf_path):
@@ -92,8 +124,8 @@ class PDFPreviewViewer:
         
         # Create canvas with scrollbars
         self.canvas = Canvas(canvas_frame, bg="lightgray")
-        v_scrollbar = Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
-        h_scrollbar = Scrollbar(canvas_frame, orient="horizontal", command=self.canvas.xview)
+        v_scrollbar = Scrollbar(canvas_frame, orient="vertical", command=lambda *args: self._on_scrollbar(self.canvas.yview, *args))
+        h_scrollbar = Scrollbar(canvas_frame, orient="horizontal", command=lambda *args: self._on_scrollbar(self.canvas.xview, *args))
         self.canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
         
         # Grid layout
@@ -131,6 +163,10 @@ class PDFPreviewViewer:
         self.magnifier_button = ttk.Button(toolbar, text="Magnifier", command=self.toggle_magnifier)
         self.magnifier_button.pack(side="left", padx=(0, 10))
         
+        # Focus preview button: compile only the section under the cursor
+        self.focus_button = ttk.Button(toolbar, text="Focus", command=self._on_focus_button, style="secondary.TButton")
+        self.focus_button.pack(side="left", padx=(0, 10))
+        
         # Refresh button
         self.refresh_button = ttk.Button(toolbar, text="Refresh", command=self.refresh)
         self.refresh_button.pack(side="right")
@@ -139,6 +175,11 @@ class PDFPreviewViewer:
         self.magnifier_active = False
         self.magnifier = None
     
+    def _on_scrollbar(self, view, *args):
+        """Scroll from a scrollbar and show what came into view."""
+        view(*args)
+        self.canvas.after_idle(self._update_visible_pages)
+    
     def _on_mouse_wheel(self, event):
         """Handle mouse wheel scrolling."""
         self.canvas.yview_scroll(-1 * (event.delta // 120), "units")
@@ -163,7 +204,7 @@ class PDFPreviewViewer:
     
     def _create_placeholder(self):
         """Create a placeholder display when no PDF is loaded."""
-        self.canvas.delete("all")
+        self._delete_page_items()
         self._clear_caches()
         self.zoom_level = 1.2
         self.zoom_label.configure(text="120%")
@@ -187,74 +228,175 @@ class PDFPreviewViewer:
     
     def _clear_caches(self):
         """Clear all page caches."""
-        for cache in [self.page_cache, self.dark_mode_cache, self.page_layouts, self.visible_pages]:
+        for cache in [self.render_cache, self.page_layouts, self.visible_pages, self._previous_renders]:
             cache.clear()
-        self.cache_order.clear()
+        self.page_fingerprints = None
+        self._reuse_candidates = None
+        self.prefetcher.reset()
+        if self.render_pool:
+            self.render_pool.cancel_all()
         if self.pdf_doc:
             self.pdf_doc = None
     
-    def load_pdf(self, pdf_path, synctex_path=None):
+    def load_pdf(self, pdf_path, synctex_path=None, generation=None):
         """
         Load a PDF file for preview.
         
+        The document is opened on a background thread while the current pages
+        stay on screen; the viewer switches to it on the main thread, laying out
+        and rendering the visible pages in the same step.
+        
         Args:
             pdf_path (str): Path to the PDF file
             synctex_path (str): Path to SyncTeX file for precise navigation
+            generation (PDFGeneration, optional): Published preview generation the file belongs to
         """
         if not os.path.exists(pdf_path):
             self._create_placeholder()
             return
-            
-        self.pdf_path = pdf_path
-        self._clear_caches()
         
-        # Clear any text highlights and set up new document files
-        if hasattr(self, 'text_locator'):
-            self.text_locator.clear_highlights()
-            # Initialize with new PDF and SyncTeX files
-            if synctex_path:
-                self.text_locator.set_document_files(pdf_path, synctex_path, "")
-        
-        # Cancel any existing render thread
-        if self.render_thread and self.render_thread.is_alive():
-            return
-            
-        # Start rendering in a separate thread
-        self.render_thread = threading.Thread(target=self._render_all_pages, daemon=True)
+        # Only the most recent request is shown; older ones are dropped when they finish opening
+        self._load_token += 1
+        self.render_thread = threading.Thread(
+            target=self._open_document,
+            args=(self._load_token, pdf_path, synctex_path, generation),
+            daemon=True
+        )
         self.render_thread.start()
     
-    def _render_all_pages(self):
-        """Initialize PDF document and get page count in a separate thread."""
+    def _open_document(self, token, pdf_path, synctex_path, generation):
+        """Open a PDF and count its pages in a separate thread, then fingerprint them once it is shown."""
+        document, page_count = None, 0
         try:
-            if HAS_FITZ:
-                self.pdf_doc = fitz.open(self.pdf_path)
-                self.total_pages = len(self.pdf_doc)
-                # Update UI in main thread
-                self.parent.after(0, self._initialize_layout)
-            else:
+            if not HAS_FITZ:
                 raise ImportError("PyMuPDF not available")
-        except (ImportError, Exception):
+            document = fitz.open(pdf_path)
+            page_count = len(document)
+        except Exception:
             # Fallback to pdf2image if PyMuPDF not available
             try:
-                from pdf2image import convert_from_path
-                images = convert_from_path(self.pdf_path, dpi=self.RENDER_DPI, first_page=1, last_page=1)
-                if images:
-                    # Get total page count without loading all pages
-                    from pdf2image.pdf2image import pdfinfo_from_path
-                    info = pdfinfo_from_path(self.pdf_path)
-                    self.total_pages = info.get('Pages', 1)
-                    self.parent.after(0, self._initialize_layout)
+                from pdf2image.pdf2image import pdfinfo_from_path
+                page_count = pdfinfo_from_path(pdf_path).get('Pages', 1)
             except Exception as fallback_e:
                 logs_console.log(f"Error with fallback PDF loading: {fallback_e}", level='ERROR')
-                self.parent.after(0, self._create_placeholder)
+                self.parent.after(0, self._load_failed, token)
+                return
+        self.parent.after(0, self._swap_document, token, pdf_path, synctex_path, generation, document, page_count)
+        # Hashing reads every page, so the visible pages are shown first; `document` now belongs to the Tk thread
+        if document is not None and token == self._load_token:
+            self.parent.after(0, self._apply_fingerprints, token, self._fingerprint_pdf(pdf_path))
+    
+    def _fingerprint_pdf(self, pdf_path):
+        """Fingerprint the pages of a PDF with a document handle of this thread's own."""
+        try:
+            document = fitz.open(pdf_path)
         except Exception as e:
-            logs_console.log(f"Error loading PDF: {e}", level='ERROR')
-            self.parent.after(0, self._create_placeholder)
+            logs_console.log(f"Could not open PDF to fingerprint its pages: {e}", level='WARNING')
+            return None
+        try:
+            return fingerprint_document(document)
+        finally:
+            document.close()
+    
+    def _load_failed(self, token):
+        """Show the placeholder for a document that could not be opened, unless a newer one was requested."""
+        # A superseded generation may already have been deleted; the current document stays on screen
+        if token == self._load_token:
+            self._create_placeholder()
+    
+    def _swap_document(self, token, pdf_path, synctex_path, generation, document, page_count):
+        """Replace the displayed document with a newly opened one."""
+        if token != self._load_token:
+            # A newer document was requested while this one was opening
+            if document:
+                document.close()
+            return
+        
+        previous_document = self.pdf_doc
+        previous_fingerprints = self.page_fingerprints
+        cached_pages = self.render_cache.items()
+        previous_renders = self._renders_on_screen(cached_pages)
+        self._clear_caches()
+        self._previous_renders = previous_renders
+        self.document_version += 1
+        self.render_cache.set_budget(self._render_cache_budget())
+        self.last_reload_stats = None
+        # Kept until the new pages are fingerprinted, so unchanged ones can still take their old renders
+        if previous_fingerprints and document is not None:
+            self._reuse_candidates = (previous_fingerprints, cached_pages)
+        self.pdf_path = pdf_path
+        if self.render_pool:
+            self.render_pool.set_document(pdf_path if document is not None else None)
+        self.pdf_doc = document
+        self.total_pages = page_count
+        
+        # Clear any text highlights and set up new document files
+        if hasattr(self, 'text_locator'):
+            self.text_locator.clear_highlights()
+            if synctex_path:
+                self.text_locator.set_document_files(pdf_path, synctex_path, "")
+        
+        # Old page images are replaced within this call, by the previous document's render until the
+        # new one arrives, so the screen never shows an empty document
+        self._initialize_layout()
+        if previous_document is not None and previous_document is not document:
+            previous_document.close()
+        
+        self.displayed_generation = generation
+        if generation is not None and self.on_generation_displayed:
+            self.on_generation_displayed(generation)
+    
+    def _apply_fingerprints(self, token, fingerprints):
+        """Reuse the previous document's renders of pages the new one did not change, and show them."""
+        if token != self._load_token or self.pdf_doc is None:
+            return
+        candidates, self._reuse_candidates = self._reuse_candidates, None
+        self.page_fingerprints = fingerprints
+        if not fingerprints or not candidates:
+            return
+        self._reuse_unchanged_pages(candidates[0], fingerprints, candidates[1])
+        
+        # Unchanged pages on screen swap their stand-in for the exact render, and are not rendered again
+        reused = {page_num for page_num in self.visible_pages
+                  if not self._is_tiled(page_num) and self._render_key(page_num) in self.render_cache}
+        if self.render_pool:
+            self.render_pool.discard(reused)
+        for page_num in sorted(self.visible_pages):
+            if page_num in reused:
+                self._previous_renders.pop(page_num, None)
+                self._render_visible_page(page_num)
+            elif self._is_tiled(page_num):
+                self._update_page_tiles(page_num, self._visible_tiles(page_num), (PRIORITY_VISIBLE, 0))
     
+    def _renders_on_screen(self, cached_pages):
+        """Whole-page renders of the visible pages in the current document, theme and zoom."""
+        dpi = self._render_dpi()
+        renders = {}
+        for key, image in cached_pages:
+            if (key.generation == self.document_version and key.page_num in self.visible_pages
+                    and key.dpi == dpi and key.dark == self.current_dark_mode_state and key.tile is None):
+                renders[key.page_num] = image
+        return renders
+    
+    def _reuse_unchanged_pages(self, old_fingerprints, new_fingerprints, cached_pages):
+        """Carry cached renders of pages whose fingerprint did not change over to the new document."""
+        reuse = match_pages(old_fingerprints, new_fingerprints)
+        old_to_new = {}
+        for new_page, old_page in sorted(reuse.mapping.items()):
+            old_to_new.setdefault(old_page, []).append(new_page)
+        # Oldest first, so the carried-over entries keep their recency order
+        for key, image in cached_pages:
+            for new_page in old_to_new.get(key.page_num, ()):
+                self.render_cache.put(RenderKey(self.document_version, new_page, key.dpi, key.dark, key.tile), image)
+        self.last_reload_stats = reuse
+        logs_console.log(
+            f"Preview reload: {reuse.describe(len(self.render_cache), len(cached_pages))}; "
+            f"render cache {self.render_cache.stats()}; prefetch {self.prefetcher.stats()}", level='DEBUG'
+        )
+
     def _initialize_layout(self):
-        """Initialize the layout with placeholder rectangles for all pages."""
-        self.canvas.delete("all")
-        self.page_layouts.clear()
+        """Lay out the pages from the first page's size; canvas items are only made for visible pages."""
+        self._delete_page_items()
         
         # Get sample page dimensions
         sample_width, sample_height = self._get_page_dimensions(1)
@@ -262,42 +404,10 @@ class PDFPreviewViewer:
             self._create_placeholder()
             return
             
-        y_offset = 10
-        max_width = 0
-        
-        # Create layout for all pages without rendering them
-        for page_num in range(1, self.total_pages + 1):
-            # Get actual dimensions for each page (in case they differ)
-            page_width, page_height = self._get_page_dimensions(page_num)
-            if not page_width or not page_height:
-                # Fallback to sample dimensions if individual page dimensions fail
-                page_width, page_height = sample_width, sample_height
-            
-            # Calculate display dimensions
-            disp_w = int(page_width * self.zoom_level)
-            disp_h = int(page_height * self.zoom_level)
-            
-            # Store layout information
-            self.page_layouts[page_num] = {
-                'y_offset': y_offset,
-                'height': disp_h,
-                'width': disp_w
-            }
-            
-            # Create placeholder rectangle
-            self.canvas.create_rectangle(
-                10, y_offset, 10 + disp_w, y_offset + disp_h,
-                fill="white", outline="gray", tags=f"page_{page_num}"
-            )
-            
-            # Update offset and width
-            y_offset += disp_h + 10
-            if disp_w > max_width:
-                max_width = disp_w
-                
-        # Set scroll region
-        self.total_height = y_offset
-        self.canvas.configure(scrollregion=(0, 0, max_width + 20, self.total_height))
+        # Other pages are assumed to match and refined when they come into view
+        self.page_layouts.reset(self.total_pages, (sample_width, sample_height), self.zoom_level)
+        self.page_layouts.refine(1, sample_width, sample_height)
+        self._update_scroll_region()
         
         # Enable toolbar
         self._enable_toolbar()
@@ -332,172 +442,393 @@ class PDFPreviewViewer:
             logs_console.log(f"Error getting page dimensions: {e}", level='ERROR')
         return None, None
         
-    def _render_page(self, page_num):
-        """Render a specific page and return the PIL Image."""
+    def _render_dpi(self):
+        """Resolution that maps PDF points to screen pixels at the current zoom; also the cache bucket."""
+        return max(1, int(round(self.RENDER_DPI * self.zoom_level)))
+    
+    def _render_page(self, page_num, dpi=None):
+        """Render a specific page at display resolution and return the PIL Image."""
+        dpi = dpi or self._render_dpi()
         try:
             if HAS_FITZ and self.pdf_doc:  # PyMuPDF - faster rendering
-                page = self.pdf_doc[page_num - 1]
-                # Calculate zoom factor for desired DPI
-                zoom = self.RENDER_DPI / 72.0
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("ppm")
-                from PIL import Image
-                import io
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Apply dark mode processing if needed
-                processed_img = apply_dark_mode_processing(img)
-                return processed_img
+                # Rendered straight at the display size, inverted in the pixmap for dark mode
+                return render_page_image(self.pdf_doc, page_num, dpi, dark=self.current_dark_mode_state)
             else:  # Fallback to pdf2image
                 from pdf2image import convert_from_path
-                images = convert_from_path(self.pdf_path, dpi=self.RENDER_DPI, first_page=page_num, last_page=page_num)
+                images = convert_from_path(self.pdf_path, dpi=dpi, first_page=page_num, last_page=page_num)
                 if images:
-                    # Apply dark mode processing if needed
-                    processed_img = apply_dark_mode_processing(images[0])
-                    return processed_img
+                    # Apply dark mode processing if needed; photos are inverted too here
+                    return invert_pdf_colors(images[0]) if self.current_dark_mode_state else images[0]
         except Exception as e:
             logs_console.log(f"Error rendering page {page_num}: {e}", level='ERROR')
         return None
         
+    def _get_setting(self, key, default):
+        """Get a preview setting from the application config."""
+        try:
+            from app import state
+            return (state.get_app_config() or {}).get(key, default)
+        except (ImportError, AttributeError):
+            return default
+    
+    def _render_cache_budget(self):
+        """Get the render cache size in bytes from the application config."""
+        try:
+            return int(float(self._get_setting('preview_render_cache_mb', DEFAULT_BUDGET_BYTES // (1024 * 1024))) * 1024 * 1024)
+        except (TypeError, ValueError):
+            return DEFAULT_BUDGET_BYTES
+    
+    def _prefetch_pages(self):
+        """Get how many pages to prefetch ahead of the scroll; 0 turns prefetching off."""
+        try:
+            return max(0, int(self._get_setting('preview_prefetch_pages', DEFAULT_PAGES_AHEAD)))
+        except (TypeError, ValueError):
+            return DEFAULT_PAGES_AHEAD
+    
+    def _render_key(self, page_num, dpi=None, tile=None):
+        """Cache key of a page or tile rendered at `dpi` (the current zoom by default) in the current theme."""
+        return RenderKey(self.document_version, page_num, dpi or self._render_dpi(), self.current_dark_mode_state, tile)
+    
+    def _dark_mode(self):
+        """False in light themes, otherwise the configured dark mode style."""
+        if not is_dark_mode_inversion_needed():
+            return False
+        style = self._get_setting('preview_dark_mode', DARK_MODE_INVERT)
+        return style if style in (DARK_MODE_INVERT, DARK_MODE_SMART) else DARK_MODE_INVERT
+    
     def _get_cached_page(self, page_num):
-        """Get a page from cache or render it if not cached."""
-        # Check if dark mode state has changed
-        current_is_dark = is_dark_mode_inversion_needed()
-        if current_is_dark != self.current_dark_mode_state:
-            self._clear_theme_caches()
-            self.current_dark_mode_state = current_is_dark
-            
-        # Use appropriate cache based on current theme
-        active_cache = self.dark_mode_cache if current_is_dark else self.page_cache
-        
-        # Check if page is in active cache
-        if page_num in active_cache:
-            # Move to end of LRU list
-            if page_num in self.cache_order:
-                self.cache_order.remove(page_num)
-            self.cache_order.append(page_num)
-            return active_cache[page_num]
+        """Get a page at the current zoom from cache or render it if not cached."""
+        key = self._render_key(page_num)
+        img = self.render_cache.get(key)
+        if img is not None:
+            return img
             
         # Render the page (with theme-appropriate processing)
-        img = self._render_page(page_num)
+        img = self._render_page(page_num, key.dpi)
         if not img:
             return None
-            
-        # Add to appropriate cache
-        self._add_to_cache(page_num, img)
+        self.render_cache.put(key, img)
         return img
-        
-    def _add_to_cache(self, page_num, img):
-        """Add a page to the appropriate cache, evicting oldest if necessary."""
-        # Determine which cache to use
-        active_cache = self.dark_mode_cache if self.current_dark_mode_state else self.page_cache
-        
-        # Remove oldest pages if combined cache is full
-        total_cached = len(self.page_cache) + len(self.dark_mode_cache)
-        while total_cached >= self.MAX_CACHE_SIZE and self.cache_order:
-            oldest_page = self.cache_order.pop(0)
-            # Remove from both caches if present
-            if oldest_page in self.page_cache:
-                del self.page_cache[oldest_page]
-            if oldest_page in self.dark_mode_cache:
-                del self.dark_mode_cache[oldest_page]
-            total_cached = len(self.page_cache) + len(self.dark_mode_cache)
-            
-        # Add new page to appropriate cache
-        active_cache[page_num] = img
-        self.cache_order.append(page_num)
-        
-    def _clear_theme_caches(self):
-        """Clear caches when theme changes to force re-rendering with new theme."""
-        self.page_cache.clear()
-        self.dark_mode_cache.clear()
-        self.cache_order.clear()
-        # Force re-rendering of visible pages
-        self.visible_pages.clear()
+    
+    def _nearest_cached_render(self, page_num, dpi):
+        """Return the cached whole-page render in the current theme whose scale is closest to `dpi`, or None."""
+        candidates = [key for key in self.render_cache.keys()
+                      if key.generation == self.document_version and key.page_num == page_num
+                      and key.dark == self.current_dark_mode_state and key.tile is None]
+        if not candidates:
+            return None
+        return self.render_cache.get(min(candidates, key=lambda key: abs(key.dpi - dpi)))
         
     def _update_visible_pages(self):
-        """Update the set of visible pages and render them."""
+        """Update the set of visible pages and queue the ones not shown yet, on-screen pages first."""
         if not self.page_layouts:
             return
             
+        buffer = 200  # Load pages slightly outside viewport
+        self._refine_page_sizes(buffer)
+        
         # Get visible area
         canvas_height = self.canvas.winfo_height()
         scroll_top = self.canvas.canvasy(0)
         scroll_bottom = scroll_top + canvas_height
+        scroll_center = (scroll_top + scroll_bottom) / 2
         
-        # Find visible pages
+        # Find visible pages, without looking at the ones far from the viewport
         new_visible_pages = set()
-        for page_num, layout in self.page_layouts.items():
+        priorities = {}
+        for page_num in self.page_layouts.pages_between(scroll_top - buffer, scroll_bottom + buffer):
+            layout = self.page_layouts[page_num]
             page_top = layout['y_offset']
             page_bottom = page_top + layout['height']
-            
-            # Check if page overlaps with visible area (with buffer)
-            buffer = 200  # Load pages slightly outside viewport
-            if page_bottom >= scroll_top - buffer and page_top <= scroll_bottom + buffer:
-                new_visible_pages.add(page_num)
+            new_visible_pages.add(page_num)
+            on_screen = page_bottom >= scroll_top and page_top <= scroll_bottom
+            distance = abs((page_top + page_bottom) / 2 - scroll_center)
+            priorities[page_num] = (PRIORITY_VISIBLE if on_screen else PRIORITY_NEARBY, distance)
+        
+        # Zoomed-in pages only need the tiles in view
+        tiles = {page_num: self._visible_tiles(page_num) for page_num in new_visible_pages if self._is_tiled(page_num)}
+        
+        # Pages and tiles scrolled past, and prefetches after a reversal or jump, are no longer worth rendering
+        prefetch_pages = self._plan_prefetch(new_visible_pages, scroll_top, canvas_height)
+        if self.render_pool:
+            self.render_pool.retain(new_visible_pages | set(prefetch_pages),
+                                    {(page_num, tile) for page_num in tiles for tile in tiles[page_num]})
+        
+        # Hand the canvas items of pages scrolled past to the newly visible ones
+        for page_num in set(self._page_items) - new_visible_pages:
+            self._recycle_page_items(page_num)
+        for page_num in new_visible_pages:
+            self._position_page_items(page_num)
                 
         # Render newly visible pages
-        for page_num in new_visible_pages - self.visible_pages:
-            self._render_visible_page(page_num)
-            
-        # Remove non-visible pages from display (but keep in cache)
-        for page_num in self.visible_pages - new_visible_pages:
-            self.canvas.delete(f"page_img_{page_num}")
+        for page_num in sorted(new_visible_pages - self.visible_pages, key=priorities.get):
+            if page_num not in tiles:
+                self.prefetcher.page_shown(page_num, self._render_key(page_num) in self.render_cache)
+            self._render_visible_page(page_num, priorities[page_num])
+        # Pages already shown in tiles still follow the view
+        for page_num in tiles.keys() & self.visible_pages:
+            self._update_page_tiles(page_num, tiles[page_num], priorities[page_num])
             
         self.visible_pages = new_visible_pages
         
-    def _render_visible_page(self, page_num):
-        """Render and display a specific visible page."""
+        for distance, page_num in enumerate(prefetch_pages):
+            key = self._render_key(page_num)
+            if key not in self.render_cache and self.render_pool.request(page_num, (PRIORITY_PREFETCH, distance),
+                                                                         key.dpi, key.dark):
+                self.prefetcher.queued(page_num)
+    
+    def _plan_prefetch(self, visible_pages, scroll_top, canvas_height):
+        """Pages to render ahead of the scroll, limited to half the render cache so they do not evict each other."""
+        self.prefetcher.observe(scroll_top, canvas_height)
+        if not self.render_pool or self.pdf_doc is None or not visible_pages:
+            return []
+        edge = max(visible_pages) if self.prefetcher.direction >= 0 else min(visible_pages)
+        layout = self.page_layouts[edge]
+        page_bytes = max(1, layout['width'] * layout['height'] * 3)
+        room = self.render_cache.max_total_bytes // 2 // page_bytes - len(visible_pages)
+        pages = self.prefetcher.plan(visible_pages, len(self.page_layouts), layout['height'], max_pages=room)
+        return [page_num for page_num in pages if not self._is_tiled(page_num)]
+    
+    def _refine_page_sizes(self, buffer):
+        """Replace the assumed size of pages near the viewport with their real one, keeping the view still."""
+        if not (HAS_FITZ and self.pdf_doc):
+            return  # without PyMuPDF, sizes are learned from the rendered images
+        scroll_top = self.canvas.canvasy(0)
+        scroll_bottom = scroll_top + self.canvas.winfo_height()
+        changed = False
+        for page_num in self.page_layouts.pages_between(scroll_top - buffer, scroll_bottom + buffer):
+            if not self.page_layouts.is_known(page_num):
+                changed |= self._refine_page_size(page_num, *self._get_page_dimensions(page_num))
+        if changed:
+            self._update_scroll_region()
+    
+    def _refine_page_size(self, page_num, width, height):
+        """
+        Record a page's real base size. Pages above the viewport growing or shrinking
+        would push the visible content around, so the view is scrolled by the same amount.
+        
+        Returns:
+            bool: True when the layout changed.
+        """
+        if not width or not height:
+            return False
+        scroll_top = self.canvas.canvasy(0)
+        above_view = self.page_layouts.offset(page_num) < scroll_top
+        shift = self.page_layouts.refine(page_num, width, height)
+        if shift and above_view:
+            self._update_scroll_region()
+            self.canvas.yview_moveto((scroll_top + shift) / self.total_height)
+        return bool(shift)
+    
+    def _position_page_items(self, page_num):
+        """Create or move the placeholder and image items of a page to its layout position."""
+        layout = self.page_layouts[page_num]
+        x0, y0 = PAGE_MARGIN, layout['y_offset']
+        bounds = (x0, y0, x0 + layout['width'], y0 + layout['height'])
+        items = self._page_items.get(page_num)
+        if items is None:
+            if self._spare_placeholders:
+                placeholder = self._spare_placeholders.pop()
+                self.canvas.coords(placeholder, *bounds)
+                self.canvas.itemconfigure(placeholder, state="normal")
+            else:
+                placeholder = self.canvas.create_rectangle(*bounds, fill="white", outline="gray")
+            self._page_items[page_num] = {'placeholder': placeholder, 'image': None, 'tiles': {}}
+            return
+        self.canvas.coords(items['placeholder'], *bounds)
+        if items['image'] is not None:
+            self.canvas.coords(items['image'], x0, y0)
+        for tile, (item, _) in items['tiles'].items():
+            tile_x, tile_y = tile_box(tile, layout['width'], layout['height'])[:2]
+            self.canvas.coords(item, x0 + tile_x, y0 + tile_y)
+    
+    def _recycle_page_items(self, page_num):
+        """Hide a page's canvas items and keep them for reuse by another page."""
+        items = self._page_items.pop(page_num, None)
+        if items is None:
+            return
+        self.canvas.itemconfigure(items['placeholder'], state="hidden")
+        self._spare_placeholders.append(items['placeholder'])
+        if items['image'] is not None:
+            self.canvas.itemconfigure(items['image'], state="hidden", image="")
+            self._spare_images.append(items['image'])
+        self._page_photos.pop(page_num, None)
+        for tile, (item, _) in items['tiles'].items():
+            self.canvas.delete(item)
+            self._page_photos.pop((page_num, tile), None)
+    
+    def _delete_page_items(self):
+        """Remove everything from the canvas, including the items kept for reuse."""
+        self.canvas.delete("all")
+        self._page_items.clear()
+        self._spare_placeholders.clear()
+        self._spare_images.clear()
+        self._page_photos.clear()
+        
+    def _render_visible_page(self, page_num, priority=(PRIORITY_VISIBLE, 0)):
+        """Render and display a specific visible page, on the render pool when available."""
         if page_num not in self.page_layouts:
             return
+        
+        if self.render_pool and self.pdf_doc is not None:
+            if self._is_tiled(page_num):
+                self._update_page_tiles(page_num, self._visible_tiles(page_num), priority)
+                return
+            key = self._render_key(page_num)
+            img = self.render_cache.get(key)
+            if img is not None:
+                self._place_page_image(page_num, img)
+                return
+            # Stretch the render of the nearest zoom level, or of the previous document, as a
+            # stand-in until the exact one arrives
+            preview = self._nearest_cached_render(page_num, key.dpi)
+            if preview is None:
+                preview = self._previous_renders.get(page_num)
+            if preview is not None:
+                layout = self.page_layouts[page_num]
+                self._place_page_image(page_num, preview.resize((layout['width'], layout['height']),
+                                                                Image.Resampling.BILINEAR))
+            self.render_pool.request(page_num, priority, key.dpi, key.dark)
+            return
             
-        layout = self.page_layouts[page_num]
+        # Rendered at the display scale already
         img = self._get_cached_page(page_num)
-        
         if img:
-            # Calculate display dimensions based on actual image size
-            disp_w = int(img.width * self.zoom_level)
-            disp_h = int(img.height * self.zoom_level)
-            
-            # Always use the actual image dimensions for display
-            display_img = img.resize((disp_w, disp_h), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(display_img)
-            
-            # Remove placeholder and add image
-            self.canvas.delete(f"page_{page_num}")
-            image_id = self.canvas.create_image(10, layout['y_offset'], anchor="nw", image=photo, tags=f"page_img_{page_num}")
-            
-            # Store photo reference to prevent garbage collection
-            setattr(self.canvas, f"photo_{page_num}", photo)
-            
-            # Update layout to reflect actual dimensions (important for scroll region)
-            if disp_w != layout['width'] or disp_h != layout['height']:
-                layout['width'] = disp_w
-                layout['height'] = disp_h
-                # Update scroll region if this page affects max width
+            self._place_page_image(page_num, img)
+    
+    def _on_page_ready(self, rendered):
+        """Render pool thread: hand a finished page to the Tk thread."""
+        try:
+            self.parent.after(0, self._show_rendered_page, rendered)
+        except (RuntimeError, tk.TclError):
+            pass  # the viewer was closed
+    
+    def _show_rendered_page(self, rendered):
+        """Place a page finished by the render pool, unless the view changed meanwhile."""
+        if (not self.render_pool or rendered.version != self.render_pool.version
+                or rendered.dark != self.current_dark_mode_state):
+            return
+        # Keep renders for other zoom levels too: they stand in while zooming back
+        page_num = rendered.page_num
+        self.render_cache.put(self._render_key(page_num, rendered.dpi, rendered.tile), rendered.image)
+        self._update_magnifier_from_render(rendered)
+        if page_num not in self.visible_pages or page_num not in self.page_layouts:
+            return
+        if rendered.tile is not None:
+            if rendered.dpi == self._render_dpi() and rendered.tile in self._visible_tiles(page_num):
+                self._place_tile_image(page_num, rendered.tile, rendered.image, exact=True)
+        elif self._is_tiled(page_num):
+            # A low-resolution render to cut stand-ins from for the tiles still missing
+            self._update_page_tiles(page_num, self._visible_tiles(page_num), (PRIORITY_VISIBLE, 0))
+        elif rendered.dpi == self._render_dpi():
+            self._previous_renders.pop(page_num, None)
+            self._place_page_image(page_num, rendered.image)
+    
+    def _is_tiled(self, page_num):
+        """True when a page is too large at the current zoom to render whole; tiles need the render pool."""
+        if not self.render_pool or self.pdf_doc is None:
+            return False
+        layout = self.page_layouts[page_num]
+        return needs_tiles(layout['width'], layout['height'])
+    
+    def _visible_tiles(self, page_num):
+        """Tiles of a page that intersect the viewport, nearest its middle first."""
+        layout = self.page_layouts[page_num]
+        left = self.canvas.canvasx(0) - PAGE_MARGIN
+        top = self.canvas.canvasy(0) - layout['y_offset']
+        view = (left, top, left + self.canvas.winfo_width(), top + self.canvas.winfo_height())
+        return tiles_in_view(layout['width'], layout['height'], view)
+    
+    def _update_page_tiles(self, page_num, tiles, priority):
+        """Show the cached tiles of a page in view, stand-ins for the missing ones, and queue those."""
+        if page_num not in self._page_items:
+            self._position_page_items(page_num)
+        shown = self._page_items[page_num]['tiles']
+        for tile in set(shown) - set(tiles):
+            self.canvas.delete(shown.pop(tile)[0])
+            self._page_photos.pop((page_num, tile), None)
+        
+        layout = self.page_layouts[page_num]
+        backdrop = None
+        for index, tile in enumerate(tiles):
+            if tile in shown and shown[tile][1]:
+                continue
+            key = self._render_key(page_num, tile=tile)
+            img = self.render_cache.get(key)
+            if img is not None:
+                self._place_tile_image(page_num, tile, img, exact=True)
+                continue
+            if backdrop is None:
+                backdrop = self._tile_backdrop(page_num, priority, key.dpi)
+            if backdrop is not None and tile not in shown:
+                self._place_tile_image(page_num, tile, crop_backdrop(backdrop, tile, layout['width'], layout['height']),
+                                       exact=False)
+            self.render_pool.request(page_num, (priority[0], priority[1] + index), key.dpi, key.dark, tile)
+    
+    def _tile_backdrop(self, page_num, priority, dpi):
+        """Whole-page render the missing tiles are cut from; a low-resolution one is queued first if none is cached."""
+        backdrop = self._nearest_cached_render(page_num, dpi)
+        if backdrop is None:
+            self.render_pool.request(page_num, (priority[0], priority[1] - 1), BACKDROP_DPI, self.current_dark_mode_state)
+        return backdrop
+    
+    def _place_tile_image(self, page_num, tile, image, exact):
+        """Show a tile image, or a stand-in for it, above the page's placeholder."""
+        if page_num not in self._page_items:
+            return
+        layout = self.page_layouts[page_num]
+        tile_x, tile_y = tile_box(tile, layout['width'], layout['height'])[:2]
+        photo = ImageTk.PhotoImage(image)
+        shown = self._page_items[page_num]['tiles']
+        if tile in shown:
+            self.canvas.itemconfigure(shown[tile][0], image=photo)
+            shown[tile][1] = exact
+        else:
+            item = self.canvas.create_image(PAGE_MARGIN + tile_x, layout['y_offset'] + tile_y, anchor="nw", image=photo)
+            shown[tile] = [item, exact]
+        self._page_photos[(page_num, tile)] = photo
+    
+    def _place_page_image(self, page_num, display_img):
+        """Show a display-ready page image in place of the page's placeholder."""
+        if page_num not in self.page_layouts:
+            return
+        
+        # Without PyMuPDF the first render of a page is the first time its size is known
+        if not self.page_layouts.is_known(page_num):
+            width, height = display_img.size
+            if self._refine_page_size(page_num, width / self.zoom_level, height / self.zoom_level):
                 self._update_scroll_region()
+                for other_page in self._page_items:
+                    self._position_page_items(other_page)
+        
+        if page_num not in self._page_items:
+            self._position_page_items(page_num)
+        items = self._page_items[page_num]
+        photo = ImageTk.PhotoImage(display_img)
+        
+        # The image covers the placeholder; reuse an image item when one is spare
+        layout = self.page_layouts[page_num]
+        if items['image'] is None:
+            if self._spare_images:
+                items['image'] = self._spare_images.pop()
+                self.canvas.coords(items['image'], PAGE_MARGIN, layout['y_offset'])
+                self.canvas.itemconfigure(items['image'], image=photo, state="normal")
+            else:
+                items['image'] = self.canvas.create_image(PAGE_MARGIN, layout['y_offset'], anchor="nw", image=photo)
+        else:
+            self.canvas.itemconfigure(items['image'], image=photo)
+        self.canvas.itemconfigure(items['placeholder'], state="hidden")
+        self.canvas.tag_raise(items['image'])
+        
+        # Store photo reference to prevent garbage collection
+        self._page_photos[page_num] = photo
     
     def _update_scroll_region(self):
-        """Update the canvas scroll region based on current page layouts."""
+        """Update the canvas scroll region from the page layout."""
         if not self.page_layouts:
             return
-            
-        max_width = 0
-        total_height = 0
-        
-        for page_num in sorted(self.page_layouts.keys()):
-            layout = self.page_layouts[page_num]
-            page_right = 10 + layout['width']  # 10px margin + page width
-            page_bottom = layout['y_offset'] + layout['height']
-            
-            if page_right > max_width:
-                max_width = page_right
-            if page_bottom > total_height:
-                total_height = page_bottom
-                
-        self.total_height = total_height + 10  # Add bottom margin
-        self.canvas.configure(scrollregion=(0, 0, max_width + 10, self.total_height))
+        self.total_height = self.page_layouts.total_height
+        self.canvas.configure(scrollregion=(0, 0, self.page_layouts.max_width + 2 * PAGE_MARGIN, self.total_height))
             
     def _on_canvas_configure(self, event=None):
         """Handle canvas resize events."""
@@ -512,48 +843,12 @@ class PDFPreviewViewer:
         if not self.page_layouts:
             return
             
-        # Get sample page dimensions
-        sample_width, sample_height = self._get_page_dimensions(1)
-        if not sample_width or not sample_height:
-            return
-            
-        # Clear current display
-        self.canvas.delete("all")
+        # Clear current display; placeholders are recreated for the visible pages only
+        self._delete_page_items()
+        self.page_layouts.set_zoom(self.zoom_level)
+        self._update_scroll_region()
         
-        # Update layouts and recreate placeholders
-        y_offset = 10
-        max_width = 0
-        
-        for page_num in range(1, self.total_pages + 1):
-            # Calculate new display dimensions
-            disp_w = int(sample_width * self.zoom_level)
-            disp_h = int(sample_height * self.zoom_level)
-            
-            # Update layout
-            self.page_layouts[page_num].update({
-                'y_offset': y_offset,
-                'height': disp_h,
-                'width': disp_w
-            })
-            
-            # Create placeholder rectangle
-            self.canvas.create_rectangle(
-                10, y_offset, 10 + disp_w, y_offset + disp_h,
-                fill="white", outline="gray", tags=f"page_{page_num}"
-            )
-            
-            y_offset += disp_h + 10
-            if disp_w > max_width:
-                max_width = disp_w
-                
-        # Update scroll region
-        self.total_height = y_offset
-        self.canvas.configure(scrollregion=(0, 0, max_width + 20, self.total_height))
-        
-        # Clear cache of scaled images (they need to be re-rendered at new zoom)
-        self.page_cache.clear()
-        self.dark_mode_cache.clear()
-        self.cache_order.clear()
+        # Cached renders are keyed by scale, so they stay: other zoom levels serve as previews
         self.visible_pages.clear()
         
         # Re-render visible pages
@@ -592,11 +887,7 @@ class PDFPreviewViewer:
         current_y = self.canvas.yview()[0] * self.total_height
         
         # Find current page
-        current_page = 1
-        for page_num, layout in self.page_layouts.items():
-            if layout['y_offset'] <= current_y < layout['y_offset'] + layout['height']:
-                current_page = page_num
-                break
+        current_page = self.page_layouts.page_at(current_y)
                 
         # Scroll to previous page
         if current_page > 1:
@@ -612,10 +903,7 @@ class PDFPreviewViewer:
         current_y = self.canvas.yview()[0] * self.total_height
         
         # Find current page
-        current_page = 1
-        for page_num, layout in self.page_layouts.items():
-            if layout['y_offset'] <= current_y < layout['y_offset'] + layout['height']:
-                current_page = page_num
+        current_page = self.page_layouts.page_at(current_y)
                 
         # Scroll to next page
         if current_page < len(self.page_layouts):
@@ -628,17 +916,16 @@ class PDFPreviewViewer:
             self.load_pdf(self.pdf_path)
             
     def refresh_theme(self):
-        """Refresh the PDF display when theme changes."""
-        
+        """Refresh the PDF display when the theme or the dark mode setting changes."""
+        dark_mode = self._dark_mode()
+        if dark_mode == self.current_dark_mode_state:
+            return
+        self.current_dark_mode_state = dark_mode
         if not self.pdf_path or not self.page_layouts:
             return
             
-        # Clear theme-specific caches and force re-rendering
-        self._clear_theme_caches()
-        
-        # Update the current dark mode state
-        old_dark_mode = self.current_dark_mode_state
-        self.current_dark_mode_state = is_dark_mode_inversion_needed()
+        # Renders of either theme stay cached; visible pages are shown again in the new one
+        self.visible_pages.clear()
         
         # Re-render visible pages with new theme immediately
         self.canvas.after_idle(self._update_visible_pages)
@@ -705,6 +992,15 @@ class PDFPreviewViewer:
             self.magnifier_button.configure(style="secondary.TButton")  # Normal when inactive
             self._destroy_magnifier()
 
+    def _on_focus_button(self):
+        """Forward the focus toggle to the preview manager."""
+        if self.on_focus_toggle:
+            self.on_focus_toggle()
+
+    def set_focus_mode(self, enabled):
+        """Show whether focus preview is active."""
+        self.focus_button.configure(style="primary.TButton" if enabled else "secondary.TButton")
+
     def _create_magnifier(self):
         """Create the magnifier window."""
         if self.magnifier:
@@ -722,6 +1018,7 @@ class PDFPreviewViewer:
         if self.magnifier:
             self.magnifier.destroy()
             self.magnifier = None
+        self._magnifier_target = None
             
         # Unbind mouse events
         self.canvas.unbind("<Motion>")
@@ -740,25 +1037,43 @@ class PDFPreviewViewer:
         self.magnifier.update_position(event.x_root, event.y_root)
         
         # Find which page we're hovering over
-        current_page = None
-        for page_num, layout in self.page_layouts.items():
-            if (layout['y_offset'] <= canvas_y <= layout['y_offset'] + layout['height'] and
-                10 <= canvas_x <= layout['width'] + 10):  # 10px margin
-                current_page = page_num
-                break
+        current_page = self.page_layouts.page_at(canvas_y)
+        layout = self.page_layouts[current_page] if current_page else None
+        if layout and not (layout['y_offset'] <= canvas_y <= layout['y_offset'] + layout['height'] and
+                           PAGE_MARGIN <= canvas_x <= layout['width'] + PAGE_MARGIN):
+            current_page = None
                 
-        if current_page:
-            # Get the original image from cache
-            original_img = self._get_cached_page(current_page)
-            
+        self._magnifier_target = None
+        # Zoomed-in pages are only rendered in tiles, so they get no whole-page image to magnify
+        if current_page and not self._is_tiled(current_page):
             # Calculate the region to magnify
-            # Convert canvas coordinates to image coordinates
-            img_x = int((canvas_x - 10) / self.zoom_level)
-            img_y = int((canvas_y - layout['y_offset']) / self.zoom_level)
+            # The image matches the canvas scale, so only the page offset applies
+            img_x = int(canvas_x - PAGE_MARGIN)
+            img_y = int(canvas_y - layout['y_offset'])
+            
+            if self.render_pool and self.pdf_doc is not None:
+                # A page missing from the cache is rendered on the pool; the lens follows when it arrives
+                key = self._render_key(current_page)
+                original_img = self.render_cache.get(key)
+                if original_img is None:
+                    self._magnifier_target = (current_page, img_x, img_y)
+                    self.render_pool.request(current_page, (PRIORITY_VISIBLE, 0), key.dpi, key.dark)
+                    return
+            else:
+                original_img = self._get_cached_page(current_page)
             
             # Update the magnified view
             self.magnifier.update_view(original_img, img_x, img_y)
 
+    def _update_magnifier_from_render(self, rendered):
+        """Show a page rendered by the pool in the magnifier when the lens is still waiting for it."""
+        if (not self._magnifier_target or not self.magnifier or rendered.tile is not None
+                or rendered.dpi != self._render_dpi() or rendered.page_num != self._magnifier_target[0]):
+            return
+        _, img_x, img_y = self._magnifier_target
+        self._magnifier_target = None
+        self.magnifier.update_view(rendered.image, img_x, img_y)
+
     def _hide_magnifier(self, event):
         """Hide the magnifier when mouse leaves the canvas."""
         if self.magnifier:
@@ -0,0 +1,33 @@
+from pdf_preview.adaptive_debounce import AdaptiveDebounce
+
+
+def test_unknown_document_uses_minimum_delay():
+    decision = AdaptiveDebounce().compute_delay("doc", 0.5)
+
+    assert decision.delay == 0.5
+    assert decision.reason == "minimum delay"
+
+
+def test_slow_compiles_respect_cpu_budget():
+    debounce = AdaptiveDebounce(cpu_budget=0.25)
+    debounce.record_compile("thesis", 2.0)
+
+    decision = debounce.compute_delay("thesis", 0.5)
+
+    # 2 s of compile per 6 s pause keeps compiles at 25% of wall time
+    assert decision.delay == 6.0
+    assert "CPU budget" in decision.reason
+    assert debounce.compute_delay("note", 0.5).delay == 0.5
+
+
+def test_typing_cadence_extends_delay_and_caps():
+    debounce = AdaptiveDebounce(max_delay=1.0)
+    for index in range(5):
+        debounce.record_keystroke("doc", now=index * 0.4)
+
+    decision = debounce.compute_delay("doc", 0.2)
+    assert decision.delay == 0.8
+    assert "typing cadence" in decision.reason
+
+    debounce.record_compile("doc", 30.0)
+    assert debounce.compute_delay("doc", 0.2).delay == 1.0
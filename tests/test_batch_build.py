@@ -0,0 +1,104 @@
+import os
+import stat
+import sys
+import textwrap
+import threading
+
+from latex.batch_build import BatchBuild, expand_roots, format_table
+from latex.project_graph import ProjectGraph
+
+# Stand-in for pdflatex that honours -output-directory and fails on "\fail"
+_FAKE_ENGINE = textwrap.dedent(
+    """\
+    import os, sys
+    args = sys.argv[1:]
+    tex = args[-1]
+    out = "."
+    for arg in args:
+        if arg.startswith("-output-directory="):
+            out = arg.split("=", 1)[1]
+    job = os.path.join(out, os.path.splitext(tex)[0])
+    with open(job + ".aux", "w") as f:
+        f.write("\\\\relax\\n")
+    with open(job + ".log", "w") as f:
+        f.write("log\\n")
+    if "\\\\fail" in open(tex).read():
+        print("! Undefined control sequence.")
+        print("l.2 \\\\fail")
+        sys.exit(1)
+    with open(job + ".pdf", "w") as f:
+        f.write("%PDF " + tex)
+    """
+)
+
+
+def _install_fake_engine(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "pdflatex"
+    script.write_text(f"#!{sys.executable}\n" + _FAKE_ENGINE)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+
+
+def _document(path, body="Text."):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\\documentclass{article}\n" + body + "\n")
+    return str(path)
+
+
+def test_expand_roots_maps_chapters_to_their_root(tmp_path):
+    report = _document(tmp_path / "report" / "main.tex", "\\input{chapter}")
+    (tmp_path / "report" / "chapter.tex").write_text("Chapter text.\n")
+    letter = _document(tmp_path / "letter.tex")
+
+    roots = expand_roots([str(tmp_path / "**" / "*.tex"), letter], graph=ProjectGraph())
+
+    assert roots == [letter, report]
+
+
+def test_each_document_builds_in_its_own_directory(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    roots = [_document(tmp_path / "docs" / f"doc{i}.tex") for i in range(4)]
+    running, peak, lock = set(), [0], threading.Lock()
+
+    def on_progress(job):
+        with lock:
+            (running.add if job.status == "running" else running.discard)(job.root)
+            peak[0] = max(peak[0], len(running))
+
+    jobs = BatchBuild(roots, workers=2, build_root=str(tmp_path / "builds"), on_progress=on_progress).run()
+
+    assert [job.status for job in jobs] == ["ok"] * 4
+    assert len({job.build_dir for job in jobs}) == 4
+    assert peak[0] <= 2
+    for job in jobs:
+        stem = os.path.splitext(job.root)[0]
+        assert job.pdf_path == stem + ".pdf" and os.path.exists(job.pdf_path)
+        assert not os.path.exists(stem + ".aux")
+        assert os.path.exists(os.path.join(job.build_dir, os.path.basename(stem) + ".aux"))
+
+
+def test_failures_are_reported_with_parsed_errors(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    good = _document(tmp_path / "good.tex")
+    bad = _document(tmp_path / "bad.tex", "\\fail")
+
+    jobs = BatchBuild([good, bad], workers=2, build_root=str(tmp_path / "builds"), publish=False).run()
+
+    assert jobs[0].status == "ok" and jobs[0].pdf_path.startswith(str(tmp_path / "builds"))
+    assert jobs[1].status == "failed"
+    assert [(error.line_number, error.message) for error in jobs[1].errors] == [(2, "Undefined control sequence.")]
+    table = format_table(jobs).splitlines()
+    assert table[0].split() == ["Document", "Status", "Time", "Errors", "Detail"]
+    assert table[2].startswith("bad.tex") and "l.2: Undefined control sequence." in table[2]
+
+
+def test_cancelled_batch_skips_queued_documents(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    batch = BatchBuild([_document(tmp_path / "a.tex"), _document(tmp_path / "b.tex")],
+                       build_root=str(tmp_path / "builds"))
+    batch.cancel()
+
+    assert [job.status for job in batch.run()] == ["cancelled", "cancelled"]
+    assert batch.summary() == {"cancelled": 2}
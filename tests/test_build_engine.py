@@ -0,0 +1,165 @@
+import os
+import stat
+import sys
+import textwrap
+
+from latex.build_engine import BuildEngine, mirror_source_directories, needs_rerun, parse_fls
+
+# Minimal stand-in for pdflatex: records its inputs, writes a label to the aux
+# file and only produces a PDF outside draft mode.
+_FAKE_ENGINE = textwrap.dedent(
+    """\
+    import os, sys
+    args = sys.argv[1:]
+    tex = args[-1]
+    job = os.path.splitext(tex)[0]
+    with open("calls.txt", "a") as f:
+        f.write(" ".join(args) + "\\n")
+    with open(job + ".fls", "w") as f:
+        f.write("PWD " + os.getcwd() + "\\nINPUT " + tex + "\\nINPUT " + job + ".aux\\nOUTPUT " + job + ".aux\\n")
+    with open(job + ".aux", "w") as f:
+        f.write("\\\\relax\\n\\\\newlabel{sec}{{1}{1}}\\n")
+    with open(job + ".log", "w") as f:
+        f.write("Output written\\n")
+    if "-draftmode" not in args:
+        with open(job + ".pdf", "w") as f:
+            f.write("%PDF")
+    with open(tex) as f:
+        sys.exit(1 if "undefinedcommand" in f.read() else 0)
+    """
+)
+
+
+def _install_fake_engine(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "pdflatex"
+    script.write_text(f"#!{sys.executable}\n" + _FAKE_ENGINE)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+
+
+def _calls(project):
+    return (project / "calls.txt").read_text().splitlines()
+
+
+def test_needs_rerun_detects_latex_warnings():
+    assert needs_rerun("LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.")
+    assert not needs_rerun("Output written on main.pdf (1 page).")
+
+
+def test_parse_fls_resolves_relative_paths(tmp_path):
+    fls = tmp_path / "main.fls"
+    fls.write_text(f"PWD {tmp_path}\nINPUT ./main.tex\nINPUT /usr/share/article.cls\nOUTPUT main.aux\n")
+
+    inputs, outputs = parse_fls(str(fls))
+
+    assert os.path.join(str(tmp_path), "main.tex") in inputs
+    assert "/usr/share/article.cls" in inputs
+    assert outputs == {os.path.join(str(tmp_path), "main.aux")}
+
+
+def test_source_directories_with_tex_files_are_mirrored(tmp_path):
+    project = tmp_path / "project"
+    (project / "chapters").mkdir(parents=True)
+    (project / "chapters" / "intro.tex").write_text("Intro\n")
+    (project / "figures").mkdir()
+    output = project / "workspaces" / "preview"
+    output.mkdir(parents=True)
+    (output / "preview.tex").write_text("")
+
+    mirror_source_directories(str(project), str(output))
+
+    assert (output / "chapters").is_dir()
+    assert not (output / "figures").exists() and not (output / "workspaces").exists()
+
+
+def test_fresh_build_uses_draft_pass_then_writes_pdf(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("See section~\\ref{sec}.\n")
+
+    result = BuildEngine(str(project), "main.tex").run()
+
+    assert result.returncode == 0
+    calls = _calls(project)
+    assert len(calls) == 2
+    assert "-draftmode" in calls[0] and "-recorder" in calls[0]
+    assert "-draftmode" not in calls[1]
+    assert (project / "main.pdf").exists()
+
+
+def test_failed_draft_pass_still_writes_the_pdf(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("See section~\\ref{sec}. \\undefinedcommand\n")
+
+    result = BuildEngine(str(project), "main.tex").run()
+
+    assert result.returncode == 1
+    calls = _calls(project)
+    assert len(calls) == 2
+    assert "-draftmode" in calls[0] and "-draftmode" not in calls[1]
+    assert (project / "main.pdf").exists()
+
+
+def test_unchanged_inputs_skip_the_build(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("Plain text.\n")
+    BuildEngine(str(project), "main.tex").run()
+    first_calls = len(_calls(project))
+
+    # rewriting identical content must not trigger a pass
+    (project / "main.tex").write_text("Plain text.\n")
+    result = BuildEngine(str(project), "main.tex").run()
+
+    assert result.up_to_date
+    assert len(_calls(project)) == first_calls
+
+    (project / "main.tex").write_text("Changed text.\n")
+    result = BuildEngine(str(project), "main.tex").run()
+
+    assert not result.up_to_date
+    assert len(_calls(project)) > first_calls
+
+
+def test_switching_engine_or_options_rebuilds(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    (tmp_path / "bin" / "xelatex").symlink_to(tmp_path / "bin" / "pdflatex")
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("Plain text.\n")
+    BuildEngine(str(project), "main.tex").run()
+    assert BuildEngine(str(project), "main.tex").run().up_to_date
+
+    result = BuildEngine(str(project), "main.tex", engine="xelatex").run()
+
+    assert not result.up_to_date
+    assert BuildEngine(str(project), "main.tex", engine="xelatex").run().up_to_date
+    assert not BuildEngine(str(project), "main.tex", engine="xelatex", extra_args=["-shell-escape"]).run().up_to_date
+
+
+def test_biblatex_asking_for_biber_is_not_a_tex_rerun(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    script = tmp_path / "bin" / "pdflatex"
+    script.write_text(script.read_text()
+                      .replace('+ ".aux\\nOUTPUT " + job + ".aux\\n"', '+ ".aux\\nOUTPUT " + job + ".aux\\nOUTPUT " + job + ".bcf\\n"')
+                      .replace('f.write("Output written\\n")',
+                               'f.write("Package biblatex Warning: Please (re)run Biber on the file:\\n(biblatex) main\\n")'))
+    biber = tmp_path / "bin" / "biber"
+    biber.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(2)\n")
+    biber.chmod(biber.stat().st_mode | stat.S_IEXEC)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "main.tex").write_text("\\cite{knuth}\n")
+
+    result = BuildEngine(str(project), "main.tex", max_passes=5).run()
+
+    assert not needs_rerun("Package biblatex Warning: Please (re)run Biber on the file:")
+    assert result.returncode != 0 and "biber" in result.abort_reason
+    assert len(_calls(project)) == 2  # the draft pass and one pass writing the PDF
+    assert (project / "main.pdf").exists()
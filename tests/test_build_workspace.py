@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+
+from pdf_preview.build_workspace import (
+    BuildWorkspaceManager,
+    checkpoint_aux_files,
+    restore_aux_files,
+    session_directory,
+)
+
+
+def _write(path, size):
+    with open(path, "wb") as handle:
+        handle.write(b"x" * size)
+
+
+def test_acquire_reuses_directory_per_document(tmp_path):
+    manager = BuildWorkspaceManager(base_dir=str(tmp_path))
+
+    first = manager.acquire("/docs/thesis.tex")
+    _write(os.path.join(first, "preview.aux"), 10)
+    second = manager.acquire("/docs/thesis.tex")
+    other = manager.acquire("/docs/notes.tex")
+
+    assert first == second
+    assert other != first
+    assert os.path.exists(os.path.join(second, "preview.aux"))
+
+
+def test_release_removes_workspace(tmp_path):
+    manager = BuildWorkspaceManager(base_dir=str(tmp_path))
+    path = manager.acquire("/docs/thesis.tex")
+
+    manager.release("/docs/thesis.tex")
+
+    assert not os.path.exists(path)
+
+
+def test_enforce_budget_evicts_least_recently_used(tmp_path):
+    manager = BuildWorkspaceManager(base_dir=str(tmp_path), max_total_bytes=250)
+    old = manager.acquire("old.tex")
+    _write(os.path.join(old, "preview.pdf"), 100)
+    middle = manager.acquire("middle.tex")
+    _write(os.path.join(middle, "preview.pdf"), 100)
+    current = manager.acquire("current.tex")
+    _write(os.path.join(current, "preview.pdf"), 100)
+
+    manager.enforce_budget(keep_key="current.tex")
+
+    assert not os.path.exists(old)
+    assert os.path.exists(middle)
+    assert os.path.exists(current)
+
+
+def test_existing_workspaces_are_adopted(tmp_path):
+    BuildWorkspaceManager(base_dir=str(tmp_path)).acquire("thesis.tex")
+
+    manager = BuildWorkspaceManager(base_dir=str(tmp_path))
+    manager.clear()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_restore_aux_rolls_back_to_last_good(tmp_path):
+    aux = tmp_path / "preview.aux"
+    aux.write_text("\\newlabel{good}{{1}{1}}")
+    checkpoint_aux_files(str(tmp_path), "preview")
+    aux.write_text("\\newlabel{broken")
+    (tmp_path / "preview.toc").write_text("partial")
+
+    restore_aux_files(str(tmp_path), "preview")
+
+    assert aux.read_text() == "\\newlabel{good}{{1}{1}}"
+    assert not (tmp_path / "preview.toc").exists()
+
+
+def test_workspaces_of_an_exited_process_are_adopted_and_running_ones_left_alone(tmp_path):
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead = tmp_path / f"noctern_workspaces-{exited.stdout.strip()}"
+    alive = tmp_path / f"noctern_workspaces-{os.getppid()}"
+    for directory in (dead, alive):
+        (directory / "0123456789abcdef").mkdir(parents=True)
+
+    manager = BuildWorkspaceManager(base_dir=session_directory("noctern_workspaces", str(tmp_path), adopt=True))
+
+    assert manager.base_dir == str(tmp_path / f"noctern_workspaces-{os.getpid()}")
+    assert not dead.exists()
+    assert os.listdir(manager.base_dir) == ["0123456789abcdef"]
+    manager.clear()
+    assert (alive / "0123456789abcdef").exists()
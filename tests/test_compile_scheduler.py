@@ -0,0 +1,75 @@
+import queue
+import threading
+
+from pdf_preview.compile_scheduler import PreviewCompileScheduler
+
+
+class _FakeProcess:
+    def __init__(self):
+        self.killed = threading.Event()
+
+    def kill(self):
+        self.killed.set()
+
+
+class _Harness:
+    """Run compiles that block until killed or released, with a manual main loop."""
+
+    def __init__(self):
+        self.main_queue = queue.Queue()
+        self.compiled = []
+        self.released = {}
+        self.scheduler = PreviewCompileScheduler(self._run_compile, self.main_queue.put)
+
+    def _run_compile(self, request):
+        process = _FakeProcess()
+        release = self.released.setdefault(request.generation, threading.Event())
+        request.attach_process(process)
+        while not (process.killed.is_set() or release.is_set()):
+            release.wait(0.01)
+        if not request.cancelled:
+            self.compiled.append(request.content)
+
+    def release(self, generation):
+        self.released.setdefault(generation, threading.Event()).set()
+
+    def pump(self):
+        """Process one callback posted to the main thread."""
+        self.main_queue.get(timeout=2)()
+
+
+def test_edits_during_compile_coalesce_to_latest_snapshot():
+    harness = _Harness()
+    scheduler = harness.scheduler
+
+    scheduler.submit("v1", None, "doc")
+    scheduler.submit("v2", None, "doc")
+    scheduler.submit("v3", None, "doc")
+
+    assert scheduler.queue_depth == 2
+    harness.pump()  # v1 was killed
+    harness.release(3)
+    harness.pump()  # v3 finished
+
+    assert harness.compiled == ["v3"]
+    assert scheduler.queue_depth == 0
+    metrics = scheduler.get_metrics()
+    assert metrics["wasted"] == 1
+    assert metrics["coalesced"] == 1
+    assert metrics["completed"] == 1
+
+
+def test_compile_near_completion_is_not_cancelled():
+    harness = _Harness()
+    scheduler = harness.scheduler
+    scheduler._expected_duration = 0.000001
+
+    scheduler.submit("v1", None, "doc")
+    scheduler.submit("v2", None, "doc")
+    harness.release(1)
+    harness.pump()
+    harness.release(2)
+    harness.pump()
+
+    assert harness.compiled == ["v1", "v2"]
+    assert scheduler.get_metrics()["wasted"] == 0
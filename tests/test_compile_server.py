@@ -0,0 +1,90 @@
+import io
+import json
+import sys
+import threading
+
+import pytest
+
+from latex import compile_client
+from latex.compile_server import CompileServer
+
+
+@pytest.fixture
+def server_enabled():
+    compile_client.configure_compile_server(1)
+    yield
+    compile_client.configure_compile_server(0)
+
+
+def test_server_reports_output_and_artifacts(tmp_path):
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF")
+    job = {'kind': 'run', 'command': [sys.executable, "-c", "print('page 1')", "doc.tex"], 'cwd': str(tmp_path)}
+    replies = io.StringIO()
+    server = CompileServer(replies, max_workers=1)
+
+    server.handle({'type': 'compile', 'id': 7, 'job': job})
+    server.shutdown(cancel=False)
+
+    messages = [json.loads(line) for line in replies.getvalue().splitlines()]
+    assert {'type': 'line', 'id': 7, 'line': 'page 1'} in messages
+    result = messages[-1]
+    assert result['type'] == 'result' and result['returncode'] == 0
+    assert result['artifacts'] == {'pdf': str(tmp_path / "doc.pdf")}
+
+
+def test_cancelling_a_finished_job_leaves_no_state(tmp_path):
+    server = CompileServer(io.StringIO(), max_workers=1)
+    server.handle({'type': 'compile', 'id': 3, 'job': {'kind': 'run', 'command': [sys.executable, "-c", "pass"],
+                                                        'cwd': str(tmp_path)}})
+    server.shutdown(cancel=False)
+
+    server.handle({'type': 'cancel', 'id': 3})
+    server.handle({'type': 'cancel', 'id': 99})
+
+    assert not server._cancelled and not server._pending
+
+
+def test_shutdown_kills_running_jobs_and_drops_queued_ones(tmp_path):
+    replies = io.StringIO()
+    server = CompileServer(replies, max_workers=1)
+    slow = {'kind': 'run', 'command': [sys.executable, "-c", "print('started', flush=True); import time; time.sleep(30)"],
+            'cwd': str(tmp_path)}
+    queued = {'kind': 'run', 'command': [sys.executable, "-c", "print('queued')"], 'cwd': str(tmp_path)}
+    server.handle({'type': 'compile', 'id': 1, 'job': slow})
+    server.handle({'type': 'compile', 'id': 2, 'job': queued})
+    while 'started' not in replies.getvalue():
+        threading.Event().wait(0.01)
+
+    server.shutdown()
+
+    messages = [json.loads(line) for line in replies.getvalue().splitlines()]
+    assert [message['id'] for message in messages if message['type'] == 'result'] == [1]
+
+
+def test_remote_runner_streams_lines(tmp_path, server_enabled):
+    lines = []
+    runner = compile_client.create_process([sys.executable, "-c", "print('one'); print('two')"], cwd=str(tmp_path))
+    runner.on_line = lines.append
+
+    result = runner.run()
+
+    assert compile_client.get_compile_client() is not None
+    assert result.returncode == 0 and not result.cancelled
+    assert lines == ['one', 'two'] and result.output == "one\ntwo"
+
+
+def test_remote_runner_can_be_killed(tmp_path, server_enabled):
+    runner = compile_client.create_process([sys.executable, "-c", "import time; time.sleep(30)"], cwd=str(tmp_path))
+    threading.Timer(0.5, runner.kill).start()
+
+    result = runner.run()
+
+    assert result.cancelled and result.duration < 10
+
+
+def test_runs_locally_when_server_disabled(tmp_path):
+    compile_client.configure_compile_server(0)
+    runner = compile_client.create_process([sys.executable, "-c", "print('local')"], cwd=str(tmp_path))
+
+    assert runner.run().output.strip() == "local"
+    assert compile_client.get_compile_client() is None
@@ -0,0 +1,71 @@
+from latex.engines import (
+    DRAFT_GRAPHICS_CODE, ENGINES, PREVIEW_FASTEST, get_engine, read_magic_program, save_document_settings,
+    select_engine,
+)
+from latex_debug_system.stream_parser import StreamingLogParser
+
+
+def test_magic_comment_picks_the_engine():
+    content = "% !TEX TS-program = XeTeX\n\\documentclass{article}\n\\usepackage{luacode}\n"
+
+    selection = select_engine(content)
+
+    assert read_magic_program(content) == "XeTeX"
+    assert selection.build is ENGINES['xelatex'] and selection.source == 'magic comment'
+    assert select_engine("\\documentclass{article}\n" * 30 + "% !TEX program = lualatex\n").build.name == 'pdflatex'
+
+
+def test_packages_and_settings_choose_when_there_is_no_magic_comment(tmp_path):
+    tex_path = str(tmp_path / "thesis.tex")
+    content = "\\documentclass{article}\n\\usepackage[no-math]{fontspec}\n"
+
+    assert select_engine(content, tex_path).build.name == 'xelatex'
+    assert select_engine("\\directlua{tex.print(1)}", tex_path).build.name == 'lualatex'
+    assert select_engine("\\documentclass{article}", tex_path, default='lualatex').source == 'default'
+
+    save_document_settings(tex_path, {'program': 'luatex', 'preview_draft': True})
+    selection = select_engine(content, tex_path)
+    assert (selection.build.name, selection.source, selection.preview_draft) == ('lualatex', 'document settings', True)
+
+
+def test_fastest_preview_keeps_engines_the_packages_need():
+    plain = "% !TEX program = lualatex\n\\documentclass{article}\n"
+    unicode = plain + "\\usepackage{fontspec}\n"
+    lua = plain + "\\usepackage{luacode}\n"
+
+    assert select_engine(plain, preview_policy=PREVIEW_FASTEST).preview.name == 'pdflatex'
+    assert select_engine(unicode, preview_policy=PREVIEW_FASTEST).preview.name == 'xelatex'
+    assert select_engine(lua, preview_policy=PREVIEW_FASTEST).preview.name == 'lualatex'
+    assert select_engine(unicode).preview.name == 'lualatex'
+
+
+def test_commands_use_each_engines_flags():
+    assert get_engine('xelatex').command("main.tex", draft=True, synctex=True) == [
+        'xelatex', '-interaction=nonstopmode', '-no-pdf', '-synctex=1', 'main.tex'
+    ]
+    assert get_engine('lualatex').command("main.tex", draft=True)[2] == '--draftmode'
+
+    command = get_engine('pdflatex').command("preview.tex", format_base="/f/abc", preamble_code=DRAFT_GRAPHICS_CODE)
+    assert command[-3:] == ['-fmt=/f/abc', '-jobname=preview', DRAFT_GRAPHICS_CODE + '\\input{preview.tex}']
+
+    assert get_engine('uplatex') is ENGINES['pdflatex']
+
+
+def test_unknown_magic_program_is_never_run():
+    content = "% !TEX program = evil\n\\documentclass{article}\n"
+
+    selection = select_engine(content)
+    assert selection.build is ENGINES['pdflatex'] and selection.source == 'default'
+    assert selection.preview is ENGINES['pdflatex']
+    assert select_engine(content, default='xelatex').build is ENGINES['xelatex']
+    assert select_engine(content + "\\usepackage{fontspec}\n").build is ENGINES['xelatex']
+
+
+def test_engine_fatal_markers_stop_the_parser():
+    line = "! Fatal Package fontspec Error: The fontspec package requires either XeTeX or"
+
+    assert not StreamingLogParser().feed(line)
+
+    parser = StreamingLogParser(fatal_markers=get_engine('pdflatex').fatal_markers)
+    assert parser.feed(line)
+    assert 'xelatex' in parser.fatal_reason
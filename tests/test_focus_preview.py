@@ -0,0 +1,51 @@
+from pdf_preview.focus_preview import build_focus_document, read_aux_labels
+
+DOCUMENT = "\n".join([
+    r"\documentclass{article}",         # 1
+    r"\begin{document}",                # 2
+    r"\maketitle",                      # 3
+    r"\section{Intro}",                 # 4
+    r"Intro text.\label{sec:intro}",    # 5
+    r"\section{Method}",                # 6
+    r"See Section~\ref{sec:intro} and \ref{sec:end}.",  # 7
+    r"\subsection{Details}",            # 8
+    r"\section{End}\label{sec:end}",    # 9
+    r"Bye.",                            # 10
+    r"\end{document}",                  # 11
+])
+
+
+def test_focus_keeps_line_numbers_and_only_the_current_section():
+    focus = build_focus_document(DOCUMENT, cursor_line=8)
+    lines = focus.content.split("\n")
+
+    assert len(lines) == len(DOCUMENT.split("\n"))
+    assert (focus.title, focus.start_line, focus.end_line) == ("Method", 6, 8)
+    assert lines[0] == r"\documentclass{article}"
+    assert lines[5:8] == DOCUMENT.split("\n")[5:8]
+    assert lines[2] == "%" and lines[9] == "%"
+    assert lines[10] == r"\end{document}"
+
+
+def test_focus_stubs_outside_labels_and_section_counter():
+    known = {"sec:intro": r"\newlabel{sec:intro}{{1}{1}}"}
+
+    stub_line = build_focus_document(DOCUMENT, cursor_line=7, known_labels=known).content.split("\n")[4]
+
+    assert r"\setcounter{section}{1}" in stub_line
+    assert r"\newlabel{sec:intro}{{1}{1}}" in stub_line
+    assert r"\newlabel{sec:end}{{?}{?}}" in stub_line
+    assert stub_line.endswith("%")
+
+
+def test_cursor_outside_sections_compiles_everything():
+    assert build_focus_document(DOCUMENT, cursor_line=3) is None
+    assert build_focus_document("no document body", cursor_line=1) is None
+
+
+def test_read_aux_labels(tmp_path):
+    aux = tmp_path / "preview.aux"
+    aux.write_text("\\relax\n\\newlabel{eq:1}{{2}{3}}\n")
+
+    assert read_aux_labels(str(aux)) == {"eq:1": r"\newlabel{eq:1}{{2}{3}}"}
+    assert read_aux_labels(str(tmp_path / "missing.aux")) == {}
@@ -0,0 +1,51 @@
+import pytest
+from PIL import Image, ImageOps
+
+from app import state
+from pdf_preview import image_processor
+
+
+def test_dark_mode_decision_follows_the_editor_background(monkeypatch):
+    calls = []
+
+    def theme_settings(background):
+        def get_theme_settings():
+            calls.append(background)
+            return {'editor_bg': background}
+        return get_theme_settings
+
+    monkeypatch.setattr(image_processor, "_dark_mode_decision", None)
+    monkeypatch.setattr(state, "get_theme_settings", theme_settings("#1E1E1E"))
+    assert image_processor.is_dark_mode_inversion_needed()
+    assert image_processor.is_dark_mode_inversion_needed()
+
+    monkeypatch.setattr(state, "get_theme_settings", theme_settings("#FAFAFA"))
+    assert not image_processor.is_dark_mode_inversion_needed()
+    assert image_processor._dark_mode_decision == ("#FAFAFA", False)
+
+
+def test_pixmap_inversion_matches_the_pil_inversion():
+    fitz = pytest.importorskip("fitz")
+    page = fitz.open().new_page(width=200, height=100)
+    page.insert_text((20, 50), "Inverted in the rasterizer", fontsize=12, color=(0.2, 0.4, 0.8))
+    pixmap = page.get_pixmap(alpha=False)
+    light = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    image_processor.darken_pixmap(pixmap)
+
+    assert pixmap.samples == ImageOps.invert(light).tobytes()
+
+
+def test_smart_mode_keeps_photo_colors():
+    fitz = pytest.importorskip("fitz")
+    page = fitz.open().new_page(width=200, height=200)
+    photo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 10, 10), False)
+    photo.set_rect(photo.irect, (200, 30, 30))
+    page.insert_image(fitz.Rect(100, 100, 180, 180), pixmap=photo)
+    matrix = fitz.Matrix(1, 1)
+    pixmap = page.get_pixmap(matrix=matrix, alpha=False)
+
+    image_processor.darken_pixmap(pixmap, image_processor.photo_areas(page, matrix))
+
+    assert pixmap.pixel(140, 140) == (200, 30, 30)
+    assert pixmap.pixel(20, 20) == (0, 0, 0)
@@ -0,0 +1,68 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from app import state
+from pdf_preview import manager as manager_module
+from pdf_preview.adaptive_debounce import DEFAULT_MIN_DELAY, AdaptiveDebounce
+from pdf_preview.compile_scheduler import CompileRequest
+from pdf_preview.manager import PDFPreviewManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(state, "get_app_config", lambda: {"preview_min_delay": "0.3"})
+    return PDFPreviewManager.__new__(PDFPreviewManager)
+
+
+def test_legacy_compilation_delay_wins_over_the_app_setting(manager, monkeypatch):
+    monkeypatch.setattr(state, "settings_manager", {"compilation_delay": "1.5"}, raising=False)
+
+    assert manager._get_compilation_delay() == 1.5
+
+
+def test_app_setting_is_used_without_a_legacy_delay(manager, monkeypatch):
+    monkeypatch.setattr(state, "settings_manager", {"theme": "dark"}, raising=False)
+    assert manager._get_compilation_delay() == 0.3
+
+    monkeypatch.setattr(state, "settings_manager", None, raising=False)
+    monkeypatch.setattr(state, "get_app_config", lambda: {})
+    assert manager._get_compilation_delay() == DEFAULT_MIN_DELAY
+
+
+def test_invalid_delay_falls_back_to_the_minimum(manager, monkeypatch):
+    monkeypatch.setattr(state, "settings_manager", {"compilation_delay": "soon"}, raising=False)
+
+    assert manager._get_compilation_delay() == DEFAULT_MIN_DELAY
+
+
+def test_chapter_compile_times_set_the_chapter_tabs_delay(manager, monkeypatch, tmp_path):
+    root, chapter = str(tmp_path / "main.tex"), str(tmp_path / "chapter.tex")
+    tab = SimpleNamespace(file_path=chapter, editor=SimpleNamespace(get=lambda *args: "\\section{One}"))
+    submitted = []
+    manager.__dict__.update(
+        get_current_tab=lambda: tab, focus_mode=False, _last_result_key=None, workspaces=None,
+        debounce=AdaptiveDebounce(0.5), scheduler=SimpleNamespace(
+            submit=lambda *args, **kwargs: submitted.append(CompileRequest(*args[:3], 1, *args[3:], **kwargs))),
+    )
+    monkeypatch.setattr(manager_module, "get_project_graph", lambda: SimpleNamespace(read=lambda path: "\\input{chapter}"))
+    monkeypatch.setattr(manager, "_resolve_project", lambda file_path: (root, {}))
+    monkeypatch.setattr(manager, "_check_structure", lambda *args: True)
+    monkeypatch.setattr(manager, "_get_result_cache", lambda: None)
+    manager._compile_document()
+    assert submitted[0].document_key == root
+
+    workspaces = SimpleNamespace(acquire=lambda key: str(tmp_path), enforce_budget=lambda keep_key: None)
+    monkeypatch.setattr(manager, "_get_workspaces", lambda: workspaces)
+    monkeypatch.setattr(manager, "_get_preamble_cache", lambda engine: None)
+    monkeypatch.setattr(manager, "_setup_compilation_files", lambda *args, **kwargs: None)
+    monkeypatch.setattr(manager, "_execute_latex_compilation",
+                        lambda *args, **kwargs: SimpleNamespace(returncode=0, cancelled=False, output=""))
+    monkeypatch.setattr(manager, "_process_compilation_result", lambda *args: None)
+    clock = itertools.count(0, 2.0)
+    monkeypatch.setattr(manager_module, "time", SimpleNamespace(time=lambda: next(clock)))
+    manager._compile_from_memory(submitted[0])
+
+    decision = manager.debounce.compute_delay(manager._get_document_key(tab), DEFAULT_MIN_DELAY)
+    assert decision.delay == 2.0 and "CPU budget" in decision.reason
@@ -0,0 +1,114 @@
+import json
+import os
+
+import pytest
+
+import noctern
+
+MAIN = "\n".join([
+    r"\documentclass{article}",
+    r"\begin{document}",
+    r"\section{Introduction}",
+    r"Some words in the body.",
+    r"\input{chapters/one}",
+    r"\begin{itemize}",
+    r"\end{document}",
+    "",
+])
+
+
+def make_corpus(tmp_path):
+    (tmp_path / "chapters").mkdir()
+    (tmp_path / "main.tex").write_text(MAIN)
+    (tmp_path / "chapters" / "one.tex").write_text("\\subsection{First}\nChapter text here.\n")
+    (tmp_path / "main.cache").mkdir()
+    (tmp_path / "main.cache" / "main_last_successful.tex").write_text(MAIN.replace(r"\begin{itemize}" + "\n", ""))
+    return tmp_path
+
+
+def run(capsys, *argv):
+    code = noctern.main(["--quiet", *argv])
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_directories_expand_to_documents_and_skip_caches(tmp_path):
+    corpus = make_corpus(tmp_path)
+
+    assert noctern.collect_documents([str(corpus), str(corpus / "main.tex")]) == [
+        str(corpus / "main.tex"),
+        str(corpus / "chapters" / "one.tex"),
+    ]
+
+
+def test_outline_and_stats_report_each_document_with_timings(tmp_path, capsys):
+    corpus = make_corpus(tmp_path)
+
+    code, outline = run(capsys, "outline", str(corpus / "main.tex"))
+    assert code == 0
+    assert outline["documents"][0]["sections"] == [{"type": "section", "title": "Introduction", "line": 3}]
+    assert set(outline["timings"]) == {"read", "outline", "total"}
+
+    code, stats = run(capsys, "stats", str(corpus))
+    main_stats = stats["documents"][0]
+    assert (main_stats["lines"], main_stats["words"], main_stats["dependencies"]) == (7, 5, {"input": 1})
+
+
+def test_build_runs_once_per_root(tmp_path, capsys, monkeypatch):
+    corpus = make_corpus(tmp_path)
+    built = []
+
+    def fake_build(path, args, timer):
+        with timer.phase('compile'):
+            built.append(path)
+        return {'ok': True, 'root': path}
+
+    monkeypatch.setitem(noctern.COMMANDS, "build", fake_build)
+
+    code, report = run(capsys, "build", str(corpus))
+
+    assert code == 0
+    assert [os.path.basename(path) for path in built] == ["main.tex"]
+    assert len(report["documents"]) == 1
+
+
+def test_lint_reports_structure_and_changes_since_last_success(tmp_path, capsys):
+    corpus = make_corpus(tmp_path)
+
+    code, report = run(capsys, "lint", "--diff", str(corpus / "main.tex"))
+
+    assert code == 1 and not report["ok"]
+    document = report["documents"][0]
+    assert [issue["line"] for issue in document["issues"]] == [6]
+    assert document["diff"] == {"added": 1, "removed": 0}
+
+
+def test_lint_parses_existing_log(tmp_path, capsys):
+    (tmp_path / "doc.tex").write_text("\\documentclass{article}\n\\begin{document}\nx\n\\end{document}\n")
+    (tmp_path / "doc.log").write_text("! Undefined control sequence.\nl.3 \\foo\n")
+
+    code, report = run(capsys, "lint", "--log", str(tmp_path / "doc.tex"))
+
+    assert code == 1
+    assert report["documents"][0]["log_errors"][0]["line"] == 3
+
+
+def test_repeated_runs_report_min_and_median(tmp_path, capsys):
+    corpus = make_corpus(tmp_path)
+
+    _, report = run(capsys, "stats", "--repeat", "3", str(corpus / "main.tex"))
+
+    assert set(report["documents"][0]["timings"]["analyze"]) == {"min", "median"}
+
+
+def test_render_reports_per_page_cost_of_each_dark_mode(tmp_path, capsys):
+    pymupdf = pytest.importorskip("pymupdf")
+    document = pymupdf.open()
+    for number in range(2):
+        document.new_page(width=200, height=300).insert_text((20, 40), f"page {number}")
+    document.save(tmp_path / "doc.pdf")
+
+    code, report = run(capsys, "render", "--dpi", "72", str(tmp_path / "doc.pdf"))
+
+    assert code == 0
+    assert report["documents"][0]["pages"] == 2
+    assert set(report["documents"][0]["ms_per_page"]) == set(noctern.RENDER_MODES)
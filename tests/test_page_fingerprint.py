@@ -0,0 +1,44 @@
+import io
+
+import pytest
+
+from pdf_preview.page_fingerprint import fingerprint_document, match_pages
+
+fitz = pytest.importorskip("fitz")
+
+
+def _pdf(texts, image_color=(255, 0, 0)):
+    """Build a PDF in memory and reopen it, as the viewer opens each compile's output."""
+    from PIL import Image
+    document = fitz.open()
+    for text in texts:
+        document.new_page().insert_text((72, 72), text)
+    image = io.BytesIO()
+    Image.new("RGB", (8, 8), image_color).save(image, "PNG")
+    document[0].insert_image(fitz.Rect(100, 100, 150, 150), stream=image.getvalue())
+    return fitz.open("pdf", document.tobytes())
+
+
+def test_identical_pages_of_separate_compiles_match():
+    first = fingerprint_document(_pdf(["one", "two", "three"]))
+    second = fingerprint_document(_pdf(["one", "two", "three"]))
+
+    assert first == second
+    assert len(set(first)) == 3
+
+
+def test_edited_text_and_replaced_images_change_only_their_page():
+    base = fingerprint_document(_pdf(["one", "two", "three"]))
+    edited = fingerprint_document(_pdf(["one", "TWO", "three"]))
+    recolored = fingerprint_document(_pdf(["one", "two", "three"], image_color=(0, 0, 255)))
+
+    assert [a == b for a, b in zip(base, edited)] == [True, False, True]
+    assert [a == b for a, b in zip(base, recolored)] == [False, True, True]
+
+
+def test_match_pages_reuses_moved_pages_and_counts_changes():
+    reuse = match_pages(["a", "b", "c"], ["a", "x", "b", "c"])
+
+    assert reuse.mapping == {1: 1, 3: 2, 4: 3}
+    assert (reuse.unchanged, reuse.changed) == (3, 1)
+    assert match_pages(None, ["a"]).changed == 1
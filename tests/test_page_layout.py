@@ -0,0 +1,43 @@
+from pdf_preview.page_layout import VirtualPageLayout
+
+
+def test_unknown_pages_take_the_first_page_size():
+    layout = VirtualPageLayout(400, (100, 200), zoom=1.5)
+
+    assert len(layout) == 400 and 400 in layout and 401 not in layout
+    assert layout[1] == {'y_offset': 10, 'width': 150, 'height': 300}
+    assert layout[3]['y_offset'] == 10 + 2 * 310
+    assert layout.total_height == 10 + 400 * 310
+
+
+def test_refined_pages_move_only_the_pages_below():
+    layout = VirtualPageLayout(10, (100, 200))
+
+    assert layout.refine(4, 300, 100) == -100
+    assert layout.refine(7, 100, 250) == 50
+
+    assert [layout.offset(page) for page in (4, 5, 8)] == [640, 750, 1430]
+    assert layout[4]['width'] == 300 and layout.max_width == 300
+    assert layout.total_height == 10 + 10 * 210 - 50
+
+
+def test_pages_are_found_by_position_without_a_scan():
+    layout = VirtualPageLayout(1000, (100, 200))
+    layout.refine(2, 100, 1000)
+
+    assert layout.page_at(0) == 1 and layout.page_at(215) == 1
+    assert layout.page_at(221) == 2 and layout.page_at(10 ** 9) == 1000
+    assert layout.pages_between(1200, 1500) == [2, 3, 4]
+    assert layout.pages_between(1221, 1229) == []
+
+
+def test_zoom_rescales_positions_and_keeps_refined_sizes():
+    layout = VirtualPageLayout(3, (100, 200))
+    layout.refine(1, 100, 400)
+
+    layout.set_zoom(0.5)
+
+    assert [layout[page]['y_offset'] for page in (1, 2, 3)] == [10, 220, 330]
+    assert layout.is_known(1) and not layout.is_known(2)
+    layout.clear()
+    assert len(layout) == 0 and layout.page_at(5) is None and layout.pages_between(0, 100) == []
@@ -0,0 +1,46 @@
+import pytest
+from PIL import Image
+
+from pdf_preview.page_tiles import crop_backdrop, needs_tiles, tile_box, tiles_in_view
+
+
+def test_only_large_pages_are_tiled():
+    assert not needs_tiles(1488, 2105)  # A4 at 180 DPI
+    assert needs_tiles(4960, 7016)  # A4 at 600 DPI
+
+
+def test_tiles_in_view_are_clipped_to_the_page_and_sorted_from_the_middle():
+    assert tile_box((2, 1), 1200, 700) == (1024, 512, 1200, 700)
+
+    tiles = tiles_in_view(2000, 3000, (400, 900, 1300, 1500))
+
+    assert sorted(tiles) == [(column, row) for column in range(3) for row in (1, 2)]
+    assert tiles[0] == (1, 2)
+    assert tiles_in_view(2000, 3000, (-500, -800, -10, -20)) == []
+    assert tiles_in_view(1000, 1000, (0, 0, 512, 512)) == [(0, 0)]
+
+
+def test_backdrop_stand_in_has_the_tile_size():
+    backdrop = Image.new("RGB", (100, 150), "white")
+    backdrop.paste((0, 0, 0), (50, 0, 100, 150))
+
+    stand_in = crop_backdrop(backdrop, (1, 0), 1000, 1500, tile_size=500)
+
+    assert stand_in.size == (500, 500)
+    assert stand_in.getpixel((250, 250)) == (0, 0, 0)
+
+
+def test_tile_render_matches_the_same_area_of_a_whole_page():
+    fitz = pytest.importorskip("fitz")
+    from pdf_preview.page_tiles import render_tile_image
+    document = fitz.open()
+    page = document.new_page(width=200, height=300)
+    for line in range(30):
+        page.insert_text((10, 15 + line * 9), f"line {line}", fontsize=7)
+    whole = page.get_pixmap(matrix=fitz.Matrix(4, 4), alpha=False)
+    whole = Image.frombytes("RGB", (whole.width, whole.height), whole.samples)
+
+    tile = render_tile_image(document, 1, dpi=288, tile=(1, 2), tile_size=256)
+
+    assert tile.size == (256, 256)
+    assert tile.tobytes() == whole.crop((256, 512, 512, 768)).tobytes()
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+from pdf_preview.build_workspace import session_directory
+from pdf_preview.pdf_handoff import PDFHandoff
+
+
+def compiled(tmp_path, text):
+    pdf = tmp_path / "build" / "preview.pdf"
+    pdf.parent.mkdir(exist_ok=True)
+    pdf.write_bytes(text.encode())
+    return str(pdf)
+
+
+def test_each_publish_is_a_new_immutable_file(tmp_path):
+    handoff = PDFHandoff(str(tmp_path / "out"))
+
+    first = handoff.publish(compiled(tmp_path, "one"))
+    second = handoff.publish(compiled(tmp_path, "two"))
+
+    assert (first.number, second.number) == (1, 2)
+    assert first.pdf_path != second.pdf_path
+    assert open(first.pdf_path).read() == "one" and open(second.pdf_path).read() == "two"
+    assert handoff.latest == second
+    assert not [name for name in os.listdir(tmp_path / "out") if name.endswith(".tmp")]
+
+
+def test_displayed_generation_outlives_newer_ones(tmp_path):
+    handoff = PDFHandoff(str(tmp_path / "out"), keep=1)
+    shown = handoff.publish(compiled(tmp_path, "shown"))
+    handoff.set_displayed(shown)
+
+    skipped = handoff.publish(compiled(tmp_path, "skipped"))
+    newest = handoff.publish(compiled(tmp_path, "newest"))
+
+    assert os.path.exists(shown.pdf_path) and os.path.exists(newest.pdf_path)
+    assert not os.path.exists(skipped.pdf_path)
+
+    handoff.set_displayed(newest)
+    assert not os.path.exists(shown.pdf_path)
+
+
+def test_synctex_travels_with_its_pdf(tmp_path):
+    synctex = tmp_path / "preview.synctex.gz"
+    synctex.write_bytes(b"sync")
+    handoff = PDFHandoff(str(tmp_path / "out"))
+
+    generation = handoff.publish(compiled(tmp_path, "pdf"), str(synctex))
+
+    assert open(generation.synctex_path, "rb").read() == b"sync"
+    assert handoff.find(generation.pdf_path) == generation
+    assert handoff.publish(compiled(tmp_path, "no sync"), str(tmp_path / "missing")).synctex_path is None
+
+
+def test_leftovers_from_a_previous_session_are_removed(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "preview-7.pdf").write_bytes(b"old")
+    (out / "preview-7.pdf.tmp").write_bytes(b"partial")
+
+    PDFHandoff(str(out))
+
+    assert os.listdir(out) == []
+
+
+def test_each_process_gets_its_own_directory_and_only_dead_ones_are_removed(tmp_path):
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead = tmp_path / f"noctern_preview-{exited.stdout.strip()}"
+    alive = tmp_path / f"noctern_preview-{os.getppid()}"
+    for directory in (dead, alive):
+        directory.mkdir()
+        (directory / "preview-3.pdf").write_bytes(b"pdf")
+
+    directory = session_directory("noctern_preview", str(tmp_path))
+    PDFHandoff(directory)
+
+    assert os.path.basename(directory) == f"noctern_preview-{os.getpid()}"
+    assert not dead.exists()
+    assert (alive / "preview-3.pdf").exists()
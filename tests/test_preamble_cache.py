@@ -0,0 +1,98 @@
+import os
+import stat
+import sys
+import textwrap
+
+from pdf_preview.preamble_cache import (
+    PreambleFormatCache,
+    is_format_failure,
+    split_preamble,
+    strip_preamble,
+)
+
+DOCUMENT = "\\documentclass{article}\n\\usepackage{amsmath}\n% \\begin{document} in a comment\n\\begin{document}\nHello\n\\end{document}\n"
+
+
+def test_split_preamble_ignores_commented_begin_document():
+    preamble, line_count = split_preamble(DOCUMENT)
+
+    assert line_count == 3
+    assert preamble.endswith("in a comment\n")
+
+
+def test_split_preamble_without_body():
+    assert split_preamble("\\documentclass{article}\n") == (None, 0)
+
+
+def test_strip_preamble_keeps_line_numbers():
+    _, line_count = split_preamble(DOCUMENT)
+
+    stripped = strip_preamble(DOCUMENT, line_count)
+
+    assert stripped.split("\n")[:4] == ["%", "%", "%", "\\begin{document}"]
+    assert stripped.count("\n") == DOCUMENT.count("\n")
+
+
+def test_is_format_failure():
+    assert is_format_failure("! I can't find the format file `abc.fmt'!")
+    assert not is_format_failure("! Undefined control sequence.")
+
+
+def test_failed_dump_is_not_retried(tmp_path):
+    cache = PreambleFormatCache(str(tmp_path), engine="noctern-missing-engine")
+
+    assert cache.get_format(DOCUMENT) == (None, 0)
+    assert len(cache._failed_keys) == 1
+    assert cache.get_format(DOCUMENT) == (None, 0)
+
+
+def test_existing_format_is_reused(tmp_path):
+    cache = PreambleFormatCache(str(tmp_path), engine="noctern-missing-engine")
+    preamble, _ = split_preamble(DOCUMENT)
+    key = cache._preamble_key(preamble, None)
+    (tmp_path / f"{key}.fmt").write_bytes(b"fmt")
+
+    format_base, line_count = cache.get_format(DOCUMENT)
+
+    assert format_base == str(tmp_path / key)
+    assert line_count == 3
+
+
+def _install_fake_engine(tmp_path, monkeypatch):
+    """A stand-in engine that records TEXINPUTS and writes the format named by -jobname."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "fakelatex"
+    script.write_text(f"#!{sys.executable}\n" + textwrap.dedent(
+        """\
+        import os, sys
+        job = next(arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("-jobname="))
+        with open("texinputs.txt", "w") as f:
+            f.write(os.environ.get("TEXINPUTS", ""))
+        with open(job + ".fmt", "w") as f:
+            f.write("fmt")
+        """
+    ))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+
+
+def test_dump_finds_local_files_through_texinputs(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    cache = PreambleFormatCache(str(tmp_path / "formats"), engine="fakelatex")
+
+    format_base, _ = cache.get_format(DOCUMENT, source_dir=str(tmp_path))
+
+    assert os.path.exists(format_base + ".fmt")
+    assert (tmp_path / "formats" / "texinputs.txt").read_text().startswith(str(tmp_path) + os.pathsep)
+
+
+def test_cancelled_dump_is_retried_later(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    cache = PreambleFormatCache(str(tmp_path / "formats"), engine="fakelatex")
+
+    assert cache.get_format(DOCUMENT, attach_process=lambda process: process.kill()) == (None, 0)
+    assert not cache._failed_keys
+
+    format_base, _ = cache.get_format(DOCUMENT)
+    assert os.path.exists(format_base + ".fmt")
@@ -0,0 +1,60 @@
+from pdf_preview.prefetch import ScrollPrefetcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scrolled(positions, step=0.05, **kwargs):
+    clock = Clock()
+    prefetcher = ScrollPrefetcher(clock=clock, **kwargs)
+    for position in positions:
+        prefetcher.observe(position, viewport_height=800)
+        clock.now += step
+    return prefetcher
+
+
+def test_pages_ahead_follow_direction_and_speed():
+    slow = _scrolled([0, 10, 20, 30])  # 200 px/s
+    fast = _scrolled([0, 150, 300, 450], pages_ahead=4)  # 3000 px/s
+
+    assert slow.plan({2, 3}, 100, page_height=1000) == [4]
+    assert fast.plan({2, 3}, 100, page_height=1000) == [4, 5, 6]
+    assert _scrolled([450, 300, 150, 0]).plan({5, 6}, 100, page_height=1000) == [4, 3, 2]
+    assert fast.plan({99, 100}, 100, page_height=1000) == []
+    assert fast.plan({2, 3}, 100, page_height=1000, max_pages=1) == [4]
+
+
+def test_standing_still_or_jumping_prefetches_nothing():
+    assert _scrolled([0, 0, 1]).plan({1}, 10, page_height=1000) == []
+    assert _scrolled([0, 100, 200, 20000]).plan({20}, 40, page_height=1000) == []
+
+
+def test_reversal_drops_pending_prefetches_as_wasted():
+    prefetcher = _scrolled([0, 150, 300])
+    for page_num in prefetcher.plan({2, 3}, 100, page_height=1000):
+        prefetcher.queued(page_num)
+
+    for position in (150, 0, -150):
+        prefetcher.observe(position, viewport_height=800)
+        prefetcher.clock.now += 0.05
+
+    assert prefetcher.plan({2, 3}, 100, page_height=1000) == [1]
+    assert prefetcher.wasted == 3 and not prefetcher.pending
+
+
+def test_hit_rate_counts_prefetched_pages_only():
+    prefetcher = ScrollPrefetcher()
+    assert prefetcher.hit_rate is None
+    for page_num in (4, 5, 6):
+        prefetcher.queued(page_num)
+
+    prefetcher.page_shown(4, ready=True)
+    prefetcher.page_shown(5, ready=False)
+    prefetcher.page_shown(9, ready=True)
+
+    assert prefetcher.stats() == {'pages_ahead': 3, 'hits': 1, 'misses': 1, 'wasted': 0, 'hit_rate': 0.5}
@@ -0,0 +1,80 @@
+import os
+
+from latex.project_graph import ProjectGraph, overlay_environment, parse_dependencies, write_overlay
+
+MAIN = "\n".join([
+    r"\documentclass{report}",
+    r"\begin{document}",
+    r"\include{chapters/intro}",
+    r"% \input{chapters/old}",
+    r"\input{chapters/method}",
+    r"\bibliography{refs,extra}",
+    r"\end{document}",
+])
+
+
+def make_project(tmp_path):
+    (tmp_path / "chapters").mkdir()
+    (tmp_path / "main.tex").write_text(MAIN)
+    (tmp_path / "chapters" / "intro.tex").write_text("\\chapter{Intro}\n\\includegraphics[width=3cm]{fig/logo}\n")
+    (tmp_path / "chapters" / "method.tex").write_text("\\chapter{Method}\n")
+    (tmp_path / "refs.bib").write_text("")
+    return str(tmp_path / "main.tex"), str(tmp_path / "chapters" / "intro.tex")
+
+
+def test_parse_dependencies_skips_comments_and_splits_bibliographies():
+    found = [(d.kind, d.name, d.line) for d in parse_dependencies(MAIN)]
+
+    assert found == [
+        ("include", "chapters/intro", 3),
+        ("input", "chapters/method", 5),
+        ("bibliography", "refs", 6),
+        ("bibliography", "extra", 6),
+    ]
+
+
+def test_chapter_resolves_to_including_root(tmp_path):
+    main, intro = make_project(tmp_path)
+    graph = ProjectGraph()
+
+    assert graph.find_root(intro) == main
+    assert graph.find_root(main) == main
+    files = graph.project_files(main)
+    assert files[:3] == [main, intro, str(tmp_path / "fig" / "logo.pdf")]
+    assert str(tmp_path / "refs.bib") in files
+
+
+def test_magic_comment_and_subfiles_name_the_root(tmp_path):
+    main, _ = make_project(tmp_path)
+    (tmp_path / "appendix.tex").write_text("% !TeX root = main.tex\nSome text\n")
+    (tmp_path / "chapters" / "sub.tex").write_text("\\documentclass[../main]{subfiles}\n")
+    graph = ProjectGraph()
+
+    assert graph.find_root(str(tmp_path / "appendix.tex")) == main
+    assert graph.find_root(str(tmp_path / "chapters" / "sub.tex")) == main
+
+
+def test_buffer_edits_update_the_graph_and_dirty_state(tmp_path):
+    main, intro = make_project(tmp_path)
+    method = str(tmp_path / "chapters" / "method.tex")
+    graph = ProjectGraph()
+    graph.update_buffer(main, MAIN.replace(r"\input{chapters/method}", ""), dirty=True)
+    graph.update_buffer(intro, "\\chapter{Introduction}\n", dirty=True)
+
+    assert method not in graph.project_files(main)
+    assert graph.dirty_files(main) == {main: 'unsaved', intro: 'unsaved'}
+    assert graph.unsaved_snapshots(main)[os.path.join("chapters", "intro.tex")] == "\\chapter{Introduction}\n"
+
+    graph.sync_buffers({})
+    assert method in graph.project_files(main)
+    assert graph.dirty_files(main) == {}
+
+
+def test_overlay_replaces_previous_snapshots(tmp_path):
+    overlay = str(tmp_path / "overlay")
+    write_overlay(overlay, {os.path.join("chapters", "intro.tex"): "new text"})
+    write_overlay(overlay, {"main.tex": "root"})
+
+    assert not os.path.exists(os.path.join(overlay, "chapters", "intro.tex"))
+    assert open(os.path.join(overlay, "main.tex")).read() == "root"
+    assert overlay_environment(overlay, {})['TEXINPUTS'] == overlay + os.pathsep
@@ -0,0 +1,54 @@
+from PIL import Image
+
+from pdf_preview.render_cache import RenderCache, RenderKey, image_nbytes
+
+
+def _page(width, height=100):
+    return Image.new("RGB", (width, height), "white")
+
+
+def test_size_is_counted_from_image_pixels():
+    cache = RenderCache()
+
+    cache.put(RenderKey(1, 1, 150, False), _page(100))
+    cache.put(RenderKey(1, 1, 150, True), Image.new("L", (100, 100)))
+
+    assert image_nbytes(_page(100)) == 30000
+    assert cache.total_size() == 40000 and len(cache) == 2
+
+
+def test_least_recently_used_renders_are_evicted_past_the_budget():
+    cache = RenderCache(max_total_bytes=100000)
+    first, second, third = (RenderKey(1, page, 150, False) for page in (1, 2, 3))
+    cache.put(first, _page(100))
+    cache.put(second, _page(100))
+
+    assert cache.get(first) is not None
+    cache.put(third, _page(100))
+    cache.put(third, _page(100))
+
+    assert cache.keys() == [second, first, third]
+    cache.put(RenderKey(1, 4, 150, False), _page(200))
+    assert cache.keys() == [third, RenderKey(1, 4, 150, False)]
+    assert cache.evictions == 2 and cache.total_size() == 90000
+
+
+def test_an_image_larger_than_the_budget_is_kept_alone():
+    cache = RenderCache(max_total_bytes=1000)
+    cache.put(RenderKey(1, 1, 72, False), _page(10, 10))
+    cache.put(RenderKey(1, 1, 600, False), _page(100))
+
+    assert cache.keys() == [RenderKey(1, 1, 600, False)]
+    cache.set_budget(0)
+    assert len(cache) == 1
+
+
+def test_hits_and_misses_distinguish_theme_and_scale():
+    cache = RenderCache()
+    cache.put(RenderKey(1, 1, 150, False), _page(100))
+
+    assert cache.get(RenderKey(1, 1, 150, True)) is None
+    assert cache.get(RenderKey(1, 1, 180, False)) is None
+    assert cache.get(RenderKey(2, 1, 150, False)) is None
+    assert cache.get(RenderKey(1, 1, 150, False)) is not None
+    assert cache.stats() == {'entries': 1, 'bytes': 30000, 'hits': 1, 'misses': 3, 'evictions': 0}
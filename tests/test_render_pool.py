@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from pdf_preview.render_pool import PageRenderPool, render_page_image
+
+fitz = pytest.importorskip("fitz")
+
+
+def _pdf(tmp_path, pages=4):
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page(width=200, height=300)
+        for line in range(30):
+            page.insert_text((10, 15 + line * 9), f"Page {number + 1} line {line}", fontsize=7)
+    path = str(tmp_path / "doc.pdf")
+    document.save(path)
+    return path
+
+
+class Collector:
+    def __init__(self, expected, hold_first=False):
+        self.pages = []
+        self.expected = expected
+        self.done = threading.Event()
+        self.release = threading.Event()
+        self.first_arrived = threading.Event()
+        if not hold_first:
+            self.release.set()
+
+    def __call__(self, rendered):
+        self.pages.append(rendered)
+        self.first_arrived.set()
+        self.release.wait(5)
+        if len(self.pages) >= self.expected:
+            self.done.set()
+
+
+def test_banded_render_matches_a_single_pixmap(tmp_path):
+    document = fitz.open(_pdf(tmp_path, pages=1))
+    pixmap = document[0].get_pixmap(matrix=fitz.Matrix(3, 3), alpha=False)
+
+    image = render_page_image(document, 1, dpi=216)
+
+    assert image.size == (pixmap.width, pixmap.height)
+    assert image.tobytes() == pixmap.samples
+
+
+def test_most_urgent_pages_render_first_and_scrolled_past_pages_are_dropped(tmp_path):
+    collector = Collector(expected=3, hold_first=True)
+    pool = PageRenderPool(collector, workers=1)
+    pool.set_document(_pdf(tmp_path))
+
+    pool.request(1, (0, 0), dpi=72, dark=False)
+    assert collector.first_arrived.wait(5)
+    pool.request(4, (1, 50), dpi=72, dark=False)
+    pool.request(2, (1, 10), dpi=72, dark=False)
+    pool.request(3, (0, 5), dpi=72, dark=False)
+    pool.retain({1, 2, 3})
+    collector.release.set()
+
+    assert collector.done.wait(5)
+    assert [page.page_num for page in collector.pages] == [1, 3, 2]
+    assert pool.pending_count() == 0 and pool.cancelled_count == 1
+
+
+def test_pages_render_at_the_requested_scale_and_theme(tmp_path):
+    collector = Collector(expected=1)
+    pool = PageRenderPool(collector)
+    pool.set_document(_pdf(tmp_path))
+
+    pool.request(2, (0, 0), dpi=108, dark=True)
+
+    assert collector.done.wait(5)
+    page = collector.pages[0]
+    assert (page.dpi, page.dark) == (108, True)
+    assert page.image.size == (300, 450)
+    assert page.image.getpixel((0, 0)) == (0, 0, 0)
+
+
+def test_a_new_scale_replaces_the_queued_request_and_old_documents_are_ignored(tmp_path):
+    collector = Collector(expected=2, hold_first=True)
+    pool = PageRenderPool(collector, workers=1)
+    pool.set_document(None)
+
+    assert not pool.request(1, (0, 0), dpi=72, dark=False)
+    pool.set_document(_pdf(tmp_path))
+    pool.request(1, (0, 0), dpi=72, dark=False)
+    assert collector.first_arrived.wait(5)
+    pool.request(2, (0, 0), dpi=72, dark=False)
+    pool.request(2, (0, 0), dpi=144, dark=False)
+    collector.release.set()
+
+    assert collector.done.wait(5)
+    assert [(page.page_num, page.dpi) for page in collector.pages] == [(1, 72), (2, 144)]
+    assert collector.pages[1].image.size == (400, 600)
+    assert pool.set_document(_pdf(tmp_path)) == collector.pages[1].version + 1
+
+
+def test_tiles_are_rendered_separately_and_dropped_once_out_of_view(tmp_path):
+    collector = Collector(expected=2, hold_first=True)
+    pool = PageRenderPool(collector, workers=1)
+    pool.set_document(_pdf(tmp_path))
+
+    pool.request(1, (0, 0), dpi=72, dark=False)
+    assert collector.first_arrived.wait(5)
+    pool.request(1, (0, 1), dpi=288, dark=False, tile=(0, 0))
+    pool.request(1, (0, 2), dpi=288, dark=False, tile=(1, 0))
+    pool.retain({1}, tiles={(1, (1, 0))})
+    collector.release.set()
+
+    assert collector.done.wait(5)
+    assert [page.tile for page in collector.pages] == [None, (1, 0)]
+    assert collector.pages[1].image.size == (288, 512)
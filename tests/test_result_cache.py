@@ -0,0 +1,66 @@
+import os
+
+from pdf_preview import build_workspace
+from pdf_preview.result_cache import PreviewResultCache, compute_cache_key, normalize_source
+
+
+def _write(path, size):
+    with open(path, "wb") as handle:
+        handle.write(b"x" * size)
+
+
+def test_normalize_ignores_comments_and_trailing_whitespace():
+    original = "Hello world.   \n% a note\nText\\% kept % dropped\n"
+    edited = "Hello world.\n% another note\nText\\% kept % changed\n"
+
+    assert normalize_source(original) == normalize_source(edited)
+    assert normalize_source(original).count("\n") == original.count("\n")
+
+
+def test_normalize_keeps_comment_marker_and_verbatim_content():
+    assert normalize_source("foo% joined") != normalize_source("foo")
+
+    verbatim = "\\begin{verbatim}\n50% off\n\\end{verbatim}"
+    changed = "\\begin{verbatim}\n50% on\n\\end{verbatim}"
+    assert compute_cache_key(verbatim) != compute_cache_key(changed)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = PreviewResultCache(str(tmp_path / "cache"))
+    pdf = tmp_path / "preview.pdf"
+    _write(pdf, 10)
+
+    cache.put("abc", str(pdf))
+    hit = cache.get("abc")
+
+    assert hit is not None
+    assert os.path.exists(hit[0])
+    assert hit[1] is None
+    assert cache.get("missing") is None
+
+
+def test_budget_evicts_least_recently_used(tmp_path):
+    cache = PreviewResultCache(str(tmp_path / "cache"), max_total_bytes=250)
+    pdf = tmp_path / "preview.pdf"
+    _write(pdf, 100)
+
+    cache.put("old", str(pdf))
+    cache.put("recent", str(pdf))
+    cache.get("old")
+    cache.put("new", str(pdf))
+
+    assert cache.get("recent") is None
+    assert cache.get("old") is not None
+    assert cache.total_size() <= 250
+
+
+def test_each_process_keeps_its_own_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_workspace, "get_temp_base", lambda: str(tmp_path))
+    other = tmp_path / f"noctern_results-{os.getppid()}"
+    other.mkdir()
+    _write(other / "abc.pdf", 10)
+
+    cache = PreviewResultCache()
+
+    assert cache.cache_dir == str(tmp_path / f"noctern_results-{os.getpid()}")
+    assert (other / "abc.pdf").exists()
@@ -0,0 +1,134 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from pdf_preview import build_workspace
+from pdf_preview.snippet_preview import (
+    SnippetRenderer, build_snippet_document, find_snippet, snippet_preamble,
+)
+
+DOCUMENT = "\n".join([
+    r"\documentclass[11pt]{article}",
+    r"\usepackage[margin=1in]{geometry}",
+    r"\usepackage{amsmath,hyperref,amssymb} % math",
+    r"\newcommand{\R}{\mathbb{R}}",
+    r"\title{A {nested} title}",
+    r"\hypersetup{",
+    r"  colorlinks=true,",
+    r"}",
+    r"\begin{document}",
+    r"Costs \$5 and $x \in \R$ here.",
+    r"\begin{align}",
+    r"  a &= b \\[2pt]",
+    r"  c &= d % $ not math",
+    r"\end{align}",
+    r"\begin{tikzpicture}",
+    r"\node {$\alpha$};",
+    r"\end{tikzpicture}",
+    r"\end{document}",
+])
+
+# Stand-in for pdflatex: writes a one-page PDF, counts its runs and fails on "\fail"
+_FAKE_ENGINE = textwrap.dedent(
+    """\
+    import os, sys
+    import fitz
+    if "-ini" in sys.argv:
+        sys.exit(1)
+    with open(os.environ["FAKE_TEX_COUNT"], "a") as f:
+        f.write("run\\n")
+    tex = sys.argv[-1]
+    if "\\\\fail" in open(tex).read():
+        print("! Undefined control sequence.")
+        sys.exit(1)
+    document = fitz.open()
+    document.new_page(width=40, height=20)
+    document.save(os.path.splitext(tex)[0] + ".pdf")
+    """
+)
+
+
+def _install_fake_engine(tmp_path, monkeypatch):
+    pytest.importorskip("fitz")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "pdflatex"
+    script.write_text(f"#!{sys.executable}\n" + _FAKE_ENGINE)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+    count = tmp_path / "count"
+    monkeypatch.setenv("FAKE_TEX_COUNT", str(count))
+    return lambda: len(count.read_text().splitlines()) if count.exists() else 0
+
+
+def test_find_snippet_returns_the_outermost_formula_or_picture():
+    at = DOCUMENT.index
+
+    assert find_snippet(DOCUMENT, at(r"\in")).source == r"$x \in \R$"
+    assert find_snippet(DOCUMENT, at("not math")).source.startswith(r"\begin{align}")
+    assert find_snippet(DOCUMENT, at(r"\alpha")).kind == "tikz"
+    assert find_snippet(DOCUMENT, at("Costs")) is None
+    assert find_snippet(DOCUMENT, at(r"\mathbb")) is None
+    assert find_snippet("$a$ text $b", 9) is None
+
+
+def test_snippet_preamble_keeps_packages_and_macros_only():
+    preamble = snippet_preamble(DOCUMENT)
+
+    assert preamble.split("\n") == [r"\usepackage{amsmath,amssymb}", r"\newcommand{\R}{\mathbb{R}}"]
+    assert snippet_preamble("$x$") == ""
+
+
+def test_snippet_document_loads_what_the_snippet_needs():
+    tikz = build_snippet_document(find_snippet(DOCUMENT, DOCUMENT.index(r"\alpha")), snippet_preamble(DOCUMENT))
+    math = build_snippet_document(find_snippet(DOCUMENT, DOCUMENT.index(r"\in")), snippet_preamble(DOCUMENT))
+
+    assert tikz.startswith("\\documentclass[border=2pt]{standalone}\n\\usepackage{tikz}\n")
+    assert "varwidth" in math and math.count("amsmath") == 1
+    assert "\\begin{document}\n$x \\in \\R$\n\\end{document}" in math
+
+
+def test_renderer_compiles_each_snippet_once(tmp_path, monkeypatch):
+    runs = _install_fake_engine(tmp_path, monkeypatch)
+    renderer = SnippetRenderer(str(tmp_path / "snippets"))
+    document = build_snippet_document(find_snippet(DOCUMENT, DOCUMENT.index(r"\in")))
+
+    first = renderer.render(document)
+    again = renderer.render(document)
+
+    assert first.ok and not first.cached and os.path.getsize(first.png_path) > 0
+    assert again.cached and again.png_path == first.png_path
+    assert runs() == 1
+
+    broken = document.replace(r"\in", r"\fail")
+    assert renderer.render(broken).error == "Undefined control sequence."
+    assert renderer.render(broken).cached
+    assert runs() == 2
+
+
+def test_renderer_evicts_least_recently_used_images(tmp_path, monkeypatch):
+    _install_fake_engine(tmp_path, monkeypatch)
+    renderer = SnippetRenderer(str(tmp_path / "snippets"), max_entries=2)
+    documents = [build_snippet_document(find_snippet(f"${n}$", 1)) for n in range(3)]
+
+    first = renderer.render(documents[0])
+    renderer.render(documents[1])
+    renderer.render(documents[2])
+
+    assert renderer.cached(documents[0]) is None and not os.path.exists(first.png_path)
+    assert renderer.cached(documents[2]).ok
+
+
+def test_each_process_keeps_its_own_snippet_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_workspace, "get_temp_base", lambda: str(tmp_path))
+    other = tmp_path / f"noctern_snippets-{os.getppid()}"
+    (other / "work").mkdir(parents=True)
+    (other / "abc.png").write_bytes(b"png")
+
+    renderer = SnippetRenderer()
+
+    assert renderer.cache_dir == str(tmp_path / f"noctern_snippets-{os.getpid()}")
+    assert (other / "abc.png").exists()
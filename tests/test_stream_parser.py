@@ -0,0 +1,132 @@
+import sys
+
+from latex.process_runner import ProcessResult, StreamingProcess
+from latex_debug_system.stream_parser import StreamingLogParser
+
+UNDEFINED_CONTROL_SEQUENCE_LOG = r"""This is pdfTeX, Version 3.141592653-2.6-1.40.25 (TeX Live 2023) (preloaded format=pdflatex)
+ restricted \write18 enabled.
+entering extended mode
+(./preview.tex
+LaTeX2e <2022-11-01> patch level 1
+(/usr/share/texlive/texmf-dist/tex/latex/base/article.cls
+Document Class: article 2022/07/02 v1.4n Standard LaTeX document class
+) (./preview.aux)
+! Undefined control sequence.
+l.7 Some \foo
+              text.
+[1{/var/lib/texmf/fonts/map/pdftex/updmap/pdftex.map}] (./preview.aux) )
+Output written on preview.pdf (1 page, 12345 bytes).
+Transcript written on preview.log.
+"""
+
+MISSING_DOLLAR_LOOP = "\n".join(
+    ["(./preview.tex"]
+    + [line for n in range(10, 30) for line in (
+        "! Missing $ inserted.",
+        "<inserted text> ",
+        "                $",
+        f"l.{n} x^",
+        "     2",
+    )]
+)
+
+EMERGENCY_STOP_LOG = r"""(./preview.tex
+! LaTeX Error: File `missing.sty' not found.
+
+Type X to quit or <RETURN> to proceed,
+or enter new name. (Default extension: sty)
+
+Enter file name:
+! Emergency stop.
+<read *>
+
+l.3 \usepackage
+               {missing}^^M
+No pages of output.
+"""
+
+
+def replay(parser, log):
+    """Feed a recorded log and return the index of the line that triggered an abort."""
+    for index, line in enumerate(log.splitlines()):
+        if parser.feed(line):
+            return index
+    parser.finish()
+    return None
+
+
+def test_errors_are_reported_with_location():
+    reported = []
+    parser = StreamingLogParser(on_error=reported.append)
+
+    assert replay(parser, UNDEFINED_CONTROL_SEQUENCE_LOG) is None
+
+    assert not parser.is_fatal
+    assert [(e.line_number, e.message, e.context) for e in reported] == [
+        (7, "Undefined control sequence.", "Some \\foo"),
+    ]
+
+
+def test_repeated_error_loop_is_fatal():
+    parser = StreamingLogParser(max_repeated_errors=5)
+
+    aborted_at = replay(parser, MISSING_DOLLAR_LOOP)
+
+    assert aborted_at == 21  # the fifth "! Missing $ inserted."
+    assert parser.fatal_reason == "'Missing $ inserted.' repeated 5 times"
+    assert [e.line_number for e in parser.errors] == [10, 11, 12, 13, 0]
+    assert not parser.feed("! Missing $ inserted.")
+
+
+def test_emergency_stop_is_fatal_and_keeps_the_cause():
+    parser = StreamingLogParser()
+
+    replay(parser, EMERGENCY_STOP_LOG)
+
+    assert parser.fatal_reason == "Emergency stop"
+    assert parser.errors[0].message == "LaTeX Error: File `missing.sty' not found."
+
+
+def test_file_line_error_format():
+    parser = StreamingLogParser()
+
+    replay(parser, "./chapter.tex:42: Undefined control sequence.\nl.42 \\bar\n")
+
+    assert [(e.line_number, e.message) for e in parser.errors] == [(42, "Undefined control sequence.")]
+
+
+def test_aborted_result_is_a_failure_not_a_cancellation():
+    parser = StreamingLogParser()
+    cancelled = ProcessResult(returncode=-9, output="", duration=1.0, cancelled=True)
+
+    assert parser.aborted_result(cancelled) is cancelled
+    replay(parser, EMERGENCY_STOP_LOG)
+    aborted = parser.aborted_result(cancelled)
+
+    assert not aborted.cancelled and aborted.returncode == -9
+    assert aborted.abort_reason == "Emergency stop"
+
+
+def test_fatal_error_kills_a_streaming_process():
+    script = "import sys, time\nfor n in range(10):\n    print('! Missing $ inserted.'); print(f'l.{n} x'); sys.stdout.flush()\ntime.sleep(30)"
+    parser = StreamingLogParser()
+    process = StreamingProcess([sys.executable, "-c", script], timeout=60)
+    process.on_line = lambda line: parser.feed(line) and process.kill()
+
+    result = parser.aborted_result(process.run())
+
+    assert result.duration < 10
+    assert result.abort_reason.startswith("'Missing $ inserted.' repeated")
+
+
+def test_same_error_in_separate_places_is_not_a_loop():
+    blocks = []
+    for n in range(6):
+        blocks += ["! Undefined control sequence.", f"l.{10 + n} Some \\foo{n}", "              text."]
+        blocks += ["! Missing number, treated as zero.", f"l.{11 + n} \\vspace{{}}"] if n % 2 else [f"[{n + 1}]"]
+    parser = StreamingLogParser(max_repeated_errors=5)
+
+    assert replay(parser, "\n".join(["(./preview.tex"] + blocks)) is None
+
+    assert not parser.is_fatal
+    assert [e.message for e in parser.errors].count("Undefined control sequence.") == 6
@@ -0,0 +1,76 @@
+from latex.structure_validator import StructureValidator, validate_structure
+
+VALID_DOCUMENT = r"""\documentclass{article}
+\newcommand{\R}{\mathbb{R}}
+\newenvironment{boxed}{\begin{center}}{\end{center}}
+\begin{document}
+Price: 50\% off, see \url{http://example.com/a%20b}.
+% an unbalanced { in a comment
+Inline $x \in \R$ and $a$$b$ and \(y\), display \[ z = \text{if $w$} \]
+\verb|{$|
+\begin{verbatim}
+{ $ \begin{itemize}
+\end{verbatim}
+\begin{boxed}Text\end{boxed}
+\end{document}
+"""
+
+
+def test_valid_document_has_no_issues():
+    assert validate_structure(VALID_DOCUMENT) == []
+
+
+def test_reports_unclosed_environment_and_mismatched_end():
+    issues = validate_structure("\\begin{document}\n\\begin{itemize}\n\\item x\n\\end{enumerate}\n\\end{document}\n")
+
+    assert len(issues) == 1
+    assert issues[0].line == 4
+    assert "does not match \\begin{itemize}" in issues[0].message
+
+
+def test_reports_inner_environment_closed_by_outer_end():
+    issues = validate_structure("\\begin{document}\n\\begin{itemize}\n\\end{document}\n")
+
+    assert [(issue.line, "itemize" in issue.message) for issue in issues] == [(2, True)]
+
+
+def test_reports_brace_locations():
+    issues = validate_structure("\\textbf{bold\n\nmore }}\n")
+
+    assert [(issue.line, issue.column) for issue in issues] == [(3, 6)]
+    issues = validate_structure("\\section{Intro\n")
+    assert [(issue.line, issue.column) for issue in issues] == [(1, 8)]
+
+
+def test_dangling_dollar_is_reported_at_paragraph_end():
+    issues = validate_structure("Cost is $5 today.\n\nNext paragraph.\n")
+
+    assert len(issues) == 1
+    assert issues[0].line == 1 and issues[0].column == 8
+    assert "paragraph" in issues[0].message
+
+
+def test_incremental_validation_tracks_edits():
+    validator = StructureValidator()
+    text = "\\begin{document}\nHello\n\\end{document}\n"
+
+    assert validator.validate(text) == []
+    assert validator.validate(text.replace("Hello", "Hello {")) != []
+    assert validator.validate(text) == []
+
+
+def test_brace_idioms_are_not_reported():
+    assert validate_structure("\\iffalse { \\fi\n") == []
+    assert validate_structure("\\def\\x{{\\iffalse}\\fi}\n") == []
+    assert validate_structure("\\let\\ifdraft\\iffalse\n\\textbf{x}\n") == []
+    assert validate_structure("\\let\\bgroup={\n\\let\\egroup=}\n") == []
+    # nested conditionals inside a skipped block, and a real error after it
+    issues = validate_structure("\\iffalse\n\\begin{itemize}\n\\ifx\\a\\b $ \\fi\n\\fi\n\\textbf{x\n")
+    assert [(issue.line, issue.column) for issue in issues] == [(5, 7)]
+
+
+def test_definition_bodies_count_braces_inside_conditionals():
+    # TeX does not skip \iffalse text while reading a definition body, so the first "}" ends it
+    issues = validate_structure("\\def\\x{\\iffalse}\\fi}\n")
+
+    assert [(issue.line, issue.column) for issue in issues] == [(1, 19)]
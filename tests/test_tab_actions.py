@@ -1,4 +1,6 @@
-﻿import pytest
+﻿from types import SimpleNamespace
+
+import pytest
 
 from app import state
 from app import tab_actions
@@ -63,6 +65,48 @@ def test_close_current_tab_delegates(monkeypatch):
     assert stack is state._closed_tabs_stack
 
 
+def test_close_current_tab_releases_preview_workspace(monkeypatch):
+    closing = DummyTab("chapter.tex")
+    kept = DummyTab("main.tex")
+    state.tabs = {"tab1": closing, "tab2": kept}
+    state.get_current_tab = lambda: closing
+
+    def fake_close(get_tab, root, notebook, save_cb, create_cb, tabs, stack):
+        del tabs["tab1"]
+
+    released = []
+    monkeypatch.setattr(tab_actions.interface_tabops, "close_current_tab", fake_close)
+    monkeypatch.setattr(
+        state,
+        "pdf_preview_interface",
+        SimpleNamespace(on_tab_closed=released.append),
+        raising=False,
+    )
+
+    tab_actions.close_current_tab(lambda: True, lambda **_: None)
+
+    assert released == [closing]
+
+
+def test_close_current_tab_cancelled_keeps_preview_workspace(monkeypatch):
+    tab = DummyTab("chapter.tex")
+    state.tabs = {"tab1": tab}
+    state.get_current_tab = lambda: tab
+
+    released = []
+    monkeypatch.setattr(tab_actions.interface_tabops, "close_current_tab", lambda *args: None)
+    monkeypatch.setattr(
+        state,
+        "pdf_preview_interface",
+        SimpleNamespace(on_tab_closed=released.append),
+        raising=False,
+    )
+
+    tab_actions.close_current_tab(lambda: True, lambda **_: None)
+
+    assert released == []
+
+
 def test_create_new_tab_passes_dependencies(monkeypatch):
     state.notebook = object()
     state.tabs = {}
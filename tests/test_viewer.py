@@ -0,0 +1,199 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pdf_preview import viewer as viewer_module
+from pdf_preview.page_fingerprint import fingerprint_document
+from pdf_preview.render_pool import RenderedPage
+
+
+class FakeCanvas:
+    """Just enough of a Tk canvas to lay pages out and track the image items."""
+
+    def __init__(self, width=800, height=600):
+        self.width, self.height = width, height
+        self.items = {}
+        self._ids = itertools.count(1)
+
+    def _create(self, kind, coords, **options):
+        item = next(self._ids)
+        self.items[item] = {'kind': kind, 'coords': coords, 'state': 'normal', **options}
+        return item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, **options)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, **options)
+
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = coords
+
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+
+    def delete(self, item):
+        if item == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item, None)
+
+    def tag_raise(self, item):
+        pass
+
+    def configure(self, **options):
+        pass
+
+    def bind(self, *args):
+        pass
+
+    def after_idle(self, func):
+        func()
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        return y
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def visible_images(self):
+        return [item for item in self.items.values()
+                if item['kind'] == 'image' and item['state'] == 'normal' and item.get('image')]
+
+
+class IdlePool:
+    """Render pool whose workers never finish, as right after a reload."""
+
+    def __init__(self):
+        self.version = 0
+        self.requests = []
+        self.discarded = set()
+
+    def set_document(self, pdf_path):
+        self.version += 1
+
+    def request(self, page_num, priority, dpi, dark, tile=None):
+        self.requests.append(page_num)
+        return True
+
+    def retain(self, page_nums, tiles=None):
+        pass
+
+    def discard(self, page_nums):
+        self.discarded |= set(page_nums)
+
+    def cancel_all(self):
+        pass
+
+
+def make_document(fitz, text):
+    document = fitz.open()
+    for number in range(3):
+        document.new_page(width=200, height=150).insert_text((20, 40), f"{text} {number}")
+    return document
+
+
+@pytest.fixture
+def viewer(monkeypatch):
+    monkeypatch.setattr(viewer_module.ImageTk, "PhotoImage", lambda image: object())
+    preview = viewer_module.PDFPreviewViewer.__new__(viewer_module.PDFPreviewViewer)
+    preview.__dict__.update(
+        zoom_level=1.0, RENDER_DPI=72, render_cache=viewer_module.RenderCache(), document_version=0,
+        page_layouts=viewer_module.VirtualPageLayout(), _page_items={}, _spare_placeholders=[], _spare_images=[],
+        _page_photos={}, _previous_renders={}, current_dark_mode_state=False, total_height=0, pdf_doc=None,
+        pdf_path=None, total_pages=0, visible_pages=set(), page_fingerprints=None, last_reload_stats=None,
+        render_pool=IdlePool(), prefetcher=viewer_module.ScrollPrefetcher(0), _load_token=1,
+        displayed_generation=None, on_generation_displayed=None, canvas=FakeCanvas(),
+    )
+    preview._enable_toolbar = preview._update_status_label = lambda: None
+    return preview
+
+
+def show(preview, fitz, document):
+    preview._swap_document(1, "preview.pdf", None, None, document, len(document))
+    preview._apply_fingerprints(1, fingerprint_document(document))
+
+
+def test_changed_visible_pages_keep_the_old_render_until_the_new_one_arrives(viewer):
+    fitz = pytest.importorskip("fitz")
+    show(viewer, fitz, make_document(fitz, "first"))
+    for page_num in sorted(viewer.visible_pages):
+        viewer.render_cache.put(viewer._render_key(page_num), Image.new("RGB", (200, 150), "white"))
+        viewer._render_visible_page(page_num)
+    assert len(viewer.canvas.visible_images()) == 3
+
+    show(viewer, fitz, make_document(fitz, "second"))
+
+    assert sorted(viewer.render_pool.requests[-3:]) == [1, 2, 3]
+    assert len(viewer.canvas.visible_images()) == 3
+
+
+def test_cached_tiles_stay_tiles_when_carried_to_the_next_document(viewer):
+    fitz = pytest.importorskip("fitz")
+    show(viewer, fitz, make_document(fitz, "same"))
+    viewer.render_cache.put(viewer._render_key(1, tile=(0, 0)), Image.new("RGB", (64, 64), "white"))
+
+    show(viewer, fitz, make_document(fitz, "same"))
+
+    assert viewer.render_cache.get(viewer._render_key(1, tile=(0, 0))) is not None
+    assert viewer._nearest_cached_render(1, viewer._render_dpi()) is None
+
+
+def test_pages_are_shown_before_fingerprints_and_reused_once_they_arrive(viewer):
+    fitz = pytest.importorskip("fitz")
+    show(viewer, fitz, make_document(fitz, "same"))
+    for page_num in sorted(viewer.visible_pages):
+        viewer.render_cache.put(viewer._render_key(page_num), Image.new("RGB", (200, 150), "white"))
+    document = make_document(fitz, "same")
+
+    viewer._swap_document(1, "preview.pdf", None, None, document, len(document))
+
+    assert viewer.page_fingerprints is None and len(viewer.canvas.visible_images()) == 3
+    assert viewer._render_key(1) not in viewer.render_cache
+
+    viewer._apply_fingerprints(1, fingerprint_document(document))
+
+    assert viewer.render_pool.discarded == {1, 2, 3}
+    assert all(viewer._render_key(page_num) in viewer.render_cache for page_num in (1, 2, 3))
+    assert viewer.last_reload_stats.unchanged == 3
+
+
+def test_magnifier_renders_missing_pages_on_the_pool(viewer):
+    fitz = pytest.importorskip("fitz")
+    show(viewer, fitz, make_document(fitz, "first"))
+    views = []
+    viewer.__dict__.update(magnifier_active=True, _magnifier_target=None, magnifier=SimpleNamespace(
+        update_position=lambda x, y: None, update_view=lambda image, x, y: views.append((image, x, y))))
+    requests = len(viewer.render_pool.requests)
+
+    viewer._update_magnifier(SimpleNamespace(x=60, y=70, x_root=0, y_root=0))
+
+    assert views == [] and viewer.render_pool.requests[requests:] == [1]
+    image = Image.new("RGB", (200, 150), "white")
+    viewer._show_rendered_page(RenderedPage(1, image, viewer._render_dpi(), False, viewer.render_pool.version))
+    assert views == [(image, 60 - viewer_module.PAGE_MARGIN, 70 - viewer.page_layouts[1]['y_offset'])]
+
+
+def test_dark_mode_is_decided_on_theme_changes_only(viewer, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    checks = []
+    monkeypatch.setattr(viewer_module, "is_dark_mode_inversion_needed", lambda: checks.append(1) or True)
+    show(viewer, fitz, make_document(fitz, "first"))
+    viewer._render_key(1)
+    assert checks == [] and viewer.current_dark_mode_state is False
+
+    viewer.refresh_theme()
+
+    assert len(checks) == 1 and viewer.current_dark_mode_state == viewer_module.DARK_MODE_INVERT
+    assert viewer._render_key(1).dark == viewer_module.DARK_MODE_INVERT and len(checks) == 1